@@ -402,8 +402,8 @@ def compute_confidence(
 
     # ---- Criterion 8: No Friday/Month-End ----
     from core.session import is_friday_blackout, is_month_end_blackout
-    friday_blocked, friday_reason = is_friday_blackout(upcoming_events)
-    monthend_blocked, monthend_reason = is_month_end_blackout()
+    friday_blocked, friday_reason = is_friday_blackout(upcoming_events, now_utc)
+    monthend_blocked, monthend_reason = is_month_end_blackout(now_utc)
     c8 = not friday_blocked and not monthend_blocked
     if not c8:
         reasons["no_friday_monthend"] = friday_reason or monthend_reason
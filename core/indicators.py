@@ -8,6 +8,8 @@ Output: dicts with calculated values
 """
 import logging
 import math
+from dataclasses import dataclass
+from operator import itemgetter
 from datetime import datetime, timezone, timedelta
 from typing import Optional
 from config.settings import (
@@ -24,6 +26,15 @@ from config.settings import (
 
 logger = logging.getLogger(__name__)
 
+# Candle dict -> (open, high, low, close), used to split candles into columns in one pass
+_OHLC = itemgetter("open", "high", "low", "close")
+
+# Fibonacci retracement levels reported by analyze_timeframe(), as (name, ratio from swing high)
+_FIB_RATIOS = (
+    ("fib_236", 0.236), ("fib_382", 0.382), ("fib_500", 0.500),
+    ("fib_618", 0.618), ("fib_786", 0.786),
+)
+
 
 def ema(prices: list[float], period: int) -> list[float]:
     """
@@ -47,14 +58,84 @@ def ema(prices: list[float], period: int) -> list[float]:
     return result
 
 
+def ema_last(prices: list[float], *periods: int) -> dict[int, Optional[float]]:
+    """
+    Latest EMA value for each period, computed in a single pass over prices.
+    Same SMA seed and recurrence as ema(), but keeps one running value per
+    period instead of building a full-length list for each.
+    Periods with fewer than `period` prices map to None.
+    """
+    n = len(prices)
+    state = {}
+    mult = {}
+    for p in periods:
+        if n >= p:
+            state[p] = sum(prices[:p]) / p
+            mult[p] = 2 / (p + 1)
+
+    if state:
+        active = sorted(state)
+        for i in range(active[0], n):
+            price = prices[i]
+            for p in active:
+                if i < p:
+                    break
+                prev = state[p]
+                state[p] = (price - prev) * mult[p] + prev
+
+    return {p: state.get(p) for p in periods}
+
+
+@dataclass
+class EmaState:
+    """EMA over a window of completed candles, identified by its first and last timestamps."""
+    first_ts: object
+    last_ts: object
+    value: float
+
+
+# EMA state per caller-supplied key, e.g. ("15m", 50). See ema_update().
+_EMA_CACHE: dict[tuple, EmaState] = {}
+
+
+def ema_update(
+    cache_key: tuple, prices: list[float], timestamps: list, period: int
+) -> Optional[float]:
+    """
+    Latest EMA value, equal to ema(prices, period)[-1].
+
+    prices[-1] is the forming candle, so the cached state covers prices[:-1]
+    and the forming close is applied as one extra step on every call. While
+    the completed candles are unchanged (same first and last timestamp) a poll
+    costs one multiply-add; once the window moves, the state is rebuilt from
+    the window with ema_last(), seeded from prices[0] exactly as ema() is, so
+    the result never depends on how long the process has been running.
+    Without timestamps nothing is cached.
+    """
+    n = len(prices)
+    if n <= period or len(timestamps) != n or None in (timestamps[0], timestamps[-2]):
+        return ema_last(prices, period)[period]
+
+    state = _EMA_CACHE.get(cache_key)
+    if state is None or (state.first_ts, state.last_ts) != (timestamps[0], timestamps[-2]):
+        value = ema_last(prices[:-1], period)[period]
+        state = _EMA_CACHE[cache_key] = EmaState(timestamps[0], timestamps[-2], value)
+
+    multiplier = 2 / (period + 1)
+    return (prices[-1] - state.value) * multiplier + state.value
+
+
 def sma(prices: list[float], period: int) -> list[float]:
     """Simple Moving Average."""
     if len(prices) < period:
         return []
     result = [None] * (period - 1)
+    # Rolling window sum: O(N) instead of re-summing each window
+    window_sum = sum(prices[:period - 1])
     for i in range(period - 1, len(prices)):
-        window = prices[i - period + 1 : i + 1]
-        result.append(sum(window) / period)
+        window_sum += prices[i]
+        result.append(window_sum / period)
+        window_sum -= prices[i - period + 1]
     return result
 
 
@@ -64,21 +145,39 @@ def bollinger_bands(
     """
     Bollinger Bands: midband (SMA), upper, lower.
     Returns dict with 'upper', 'mid', 'lower' lists.
+
+    O(N): one rolling sum and sum of squares, updated as each bar enters and
+    the oldest leaves the window. Values are shifted by the first close so the
+    squares stay small at index price levels (no cancellation in S2/n - mean^2).
     """
-    mid = sma(closes, period)
-    upper = []
-    lower = []
-    
-    for i in range(len(closes)):
-        if mid[i] is None:
-            upper.append(None)
-            lower.append(None)
-            continue
-        window = closes[i - period + 1 : i + 1]
-        std = _std_dev(window)
-        upper.append(mid[i] + num_std * std)
-        lower.append(mid[i] - num_std * std)
-    
+    n = len(closes)
+    if n < period:
+        return {"upper": [], "mid": [], "lower": []}
+
+    shift = closes[0]
+    s = 0.0
+    s2 = 0.0
+    for x in closes[:period]:
+        d = x - shift
+        s += d
+        s2 += d * d
+
+    upper = [None] * (period - 1)
+    mid = [None] * (period - 1)
+    lower = [None] * (period - 1)
+    for i in range(period - 1, n):
+        if i >= period:
+            d_in = closes[i] - shift
+            d_out = closes[i - period] - shift
+            s += d_in - d_out
+            s2 += d_in * d_in - d_out * d_out
+        mean = s / period
+        std = math.sqrt(max(0.0, s2 / period - mean * mean))
+        m = mean + shift
+        mid.append(m)
+        upper.append(m + num_std * std)
+        lower.append(m - num_std * std)
+
     return {"upper": upper, "mid": mid, "lower": lower}
 
 
@@ -90,13 +189,18 @@ def rsi(closes: list[float], period: int = 14) -> list[float]:
     if len(closes) < period + 1:
         return []
     
-    deltas = [closes[i] - closes[i - 1] for i in range(1, len(closes))]
-    gains = [max(d, 0) for d in deltas]
-    losses = [abs(min(d, 0)) for d in deltas]
-    
+    # Gains/losses are split from each delta inline — no deltas/gains/losses lists.
     # First average: simple average of first `period` values
-    avg_gain = sum(gains[:period]) / period
-    avg_loss = sum(losses[:period]) / period
+    gain_sum = 0.0
+    loss_sum = 0.0
+    for prev, cur in zip(closes[:period], closes[1:period + 1]):
+        delta = cur - prev
+        if delta > 0:
+            gain_sum += delta
+        elif delta < 0:
+            loss_sum -= delta
+    avg_gain = gain_sum / period
+    avg_loss = loss_sum / period
     
     result = [None] * period
     
@@ -106,16 +210,22 @@ def rsi(closes: list[float], period: int = 14) -> list[float]:
         rs = avg_gain / avg_loss
         result.append(100 - (100 / (1 + rs)))
     
-    # Subsequent values: Wilder's smoothing
-    for i in range(period, len(deltas)):
-        avg_gain = (avg_gain * (period - 1) + gains[i]) / period
-        avg_loss = (avg_loss * (period - 1) + losses[i]) / period
+    # Subsequent values: Wilder's smoothing (hot loop — locals only, no indexing)
+    keep = period - 1
+    append = result.append
+    for prev, cur in zip(closes[period:], closes[period + 1:]):
+        delta = cur - prev
+        if delta > 0:
+            avg_gain = (avg_gain * keep + delta) / period
+            avg_loss = avg_loss * keep / period
+        else:
+            avg_gain = avg_gain * keep / period
+            avg_loss = (avg_loss * keep - delta) / period
         
         if avg_loss == 0:
-            result.append(100.0)
+            append(100.0)
         else:
-            rs = avg_gain / avg_loss
-            result.append(100 - (100 / (1 + rs)))
+            append(100 - (100 / (1 + avg_gain / avg_loss)))
     
     return result
 
@@ -134,18 +244,20 @@ def vwap(
         return []
     
     result = []
+    append = result.append
     cumulative_tp_vol = 0.0
     cumulative_vol = 0.0
     
-    for i in range(len(highs)):
-        typical_price = (highs[i] + lows[i] + closes[i]) / 3
-        cumulative_tp_vol += typical_price * volumes[i]
-        cumulative_vol += volumes[i]
+    # Walk the four columns in lockstep — no per-bar list indexing
+    for high, low, close, volume in zip(highs, lows, closes, volumes):
+        typical_price = (high + low + close) / 3
+        cumulative_tp_vol += typical_price * volume
+        cumulative_vol += volume
         
         if cumulative_vol == 0:
-            result.append(typical_price)
+            append(typical_price)
         else:
-            result.append(cumulative_tp_vol / cumulative_vol)
+            append(cumulative_tp_vol / cumulative_vol)
     
     return result
 
@@ -165,22 +277,23 @@ def heiken_ashi(
     if n < 1:
         return [], [], [], []
 
-    ha_open  = [None] * n
-    ha_high  = [None] * n
-    ha_low   = [None] * n
-    ha_close = [None] * n
+    ha_open  = []
+    ha_high  = []
+    ha_low   = []
+    ha_close = []
 
-    # Seed first candle
-    ha_close[0] = (opens[0] + highs[0] + lows[0] + closes[0]) / 4
-    ha_open[0]  = (opens[0] + closes[0]) / 2
-    ha_high[0]  = max(highs[0], ha_open[0], ha_close[0])
-    ha_low[0]   = min(lows[0],  ha_open[0], ha_close[0])
+    # Seed first candle; the prior HA open/close are carried as scalars
+    c = (opens[0] + highs[0] + lows[0] + closes[0]) / 4
+    o = (opens[0] + closes[0]) / 2
 
-    for i in range(1, n):
-        ha_close[i] = (opens[i] + highs[i] + lows[i] + closes[i]) / 4
-        ha_open[i]  = (ha_open[i - 1] + ha_close[i - 1]) / 2
-        ha_high[i]  = max(highs[i], ha_open[i], ha_close[i])
-        ha_low[i]   = min(lows[i],  ha_open[i], ha_close[i])
+    for i in range(n):
+        if i:
+            o = (o + c) / 2
+            c = (opens[i] + highs[i] + lows[i] + closes[i]) / 4
+        ha_open.append(o)
+        ha_close.append(c)
+        ha_high.append(max(highs[i], o, c))
+        ha_low.append(min(lows[i], o, c))
 
     return ha_open, ha_high, ha_low, ha_close
 
@@ -384,7 +497,7 @@ def analyze_body_trend(candles: list[dict], lookback: int = 5) -> dict:
     return result
 
 
-def analyze_timeframe(candles: list[dict]) -> dict:
+def analyze_timeframe(candles: list[dict], ema_key: Optional[str] = None) -> dict:
     """
     Full indicator analysis for a single timeframe.
     
@@ -392,6 +505,10 @@ def analyze_timeframe(candles: list[dict]) -> dict:
         'open', 'high', 'low', 'close', 'volume', 'timestamp'
     
     Output: dict with all indicator values for the latest candle.
+
+    ema_key (e.g. "15m") names a live candle stream whose EMAs are cached via
+    ema_update() between polls of the same completed candles. The values are
+    the same as without it. Leave it None for one-off or backtest windows.
     """
     if len(candles) < 200:
         logger.debug(
@@ -399,19 +516,21 @@ def analyze_timeframe(candles: list[dict]) -> dict:
             f"Using EMA50 fallback."
         )
     
-    closes  = [c["close"]  for c in candles]
-    highs   = [c["high"]   for c in candles]
-    lows    = [c["low"]    for c in candles]
-    opens   = [c["open"]   for c in candles]
+    # One C-level pass over the candle dicts for the OHLC columns
+    opens, highs, lows, closes = map(list, zip(*map(_OHLC, candles)))
     volumes = [c.get("volume", 0) for c in candles]
+    # One scan for "any real volume" — reused by VWAP, volume ratio and volume profile
+    has_vol = any(v > 0 for v in volumes)
     
     # Calculate all indicators
     bb = bollinger_bands(closes, 20, 2.0)
-    ema9 = ema(closes, 9)
-    ema50 = ema(closes, 50)
-    ema200 = ema(closes, 200)
+    if ema_key is None:
+        emas = ema_last(closes, 9, 50, 200)
+    else:
+        timestamps = [c.get("timestamp") for c in candles]
+        emas = {p: ema_update((ema_key, p), closes, timestamps, p) for p in (9, 50, 200)}
     rsi_vals = rsi(closes, 14)
-    vwap_vals = vwap(highs, lows, closes, volumes) if any(v > 0 for v in volumes) else []
+    vwap_vals = vwap(highs, lows, closes, volumes) if has_vol else []
     
     # Get latest values (last element)
     current_price = closes[-1]
@@ -421,14 +540,14 @@ def analyze_timeframe(candles: list[dict]) -> dict:
         "open": candles[-1]["open"],
         "high": candles[-1]["high"],
         "low": candles[-1]["low"],
-        "bollinger_upper": _last(bb["upper"]),
-        "bollinger_mid": _last(bb["mid"]),
-        "bollinger_lower": _last(bb["lower"]),
-        "ema9": _last(ema9),
-        "ema50": _last(ema50),
-        "ema200": _last(ema200),
-        "rsi": _last(rsi_vals),
-        "vwap": _last(vwap_vals) if vwap_vals else None,
+        "bollinger_upper": _latest(bb["upper"]),
+        "bollinger_mid": _latest(bb["mid"]),
+        "bollinger_lower": _latest(bb["lower"]),
+        "ema9": emas[9],
+        "ema50": emas[50],
+        "ema200": emas[200],
+        "rsi": _latest(rsi_vals),
+        "vwap": _latest(vwap_vals),
     }
     
     # Price position analysis
@@ -461,17 +580,27 @@ def analyze_timeframe(candles: list[dict]) -> dict:
     # Volume analysis — is this a high-conviction or thin signal?
     # Always use the LAST COMPLETED candle (volumes[-2]), never the current forming one.
     # The latest candle (volumes[-1]) is almost always partial — its volume is meaningless.
-    if any(v > 0 for v in volumes):
-        recent_vols = [v for v in volumes[-20:] if v > 0]
-        avg_vol = sum(recent_vols) / len(recent_vols) if recent_vols else 0
+    if has_vol:
+        vol_sum = 0.0
+        vol_n = 0
+        for v in volumes[-20:]:
+            if v > 0:
+                vol_sum += v
+                vol_n += 1
+        avg_vol = vol_sum / vol_n if vol_n else 0
         vol_completed = volumes[-2] if len(volumes) >= 2 else volumes[-1]
         vol_ratio = vol_completed / avg_vol if avg_vol > 0 else None
-        result["volume_ratio"] = round(vol_ratio, 2) if vol_ratio is not None else None
-        result["volume_signal"] = (
-            "HIGH"   if vol_ratio and vol_ratio > 1.5 else
-            "LOW"    if vol_ratio and vol_ratio < 0.7 else
-            "NORMAL"
-        ) if vol_ratio is not None else None
+        if vol_ratio is None:
+            result["volume_ratio"] = None
+            result["volume_signal"] = None
+        else:
+            result["volume_ratio"] = vol_ratio
+            if vol_ratio > 1.5:
+                result["volume_signal"] = "HIGH"
+            elif 0 < vol_ratio < 0.7:
+                result["volume_signal"] = "LOW"
+            else:
+                result["volume_signal"] = "NORMAL"  # includes a zero-volume completed candle
     else:
         result["volume_ratio"] = None
         result["volume_signal"] = None
@@ -496,28 +625,25 @@ def analyze_timeframe(candles: list[dict]) -> dict:
             if recent_pivot_high is not None and recent_pivot_low is not None:
                 break
     if recent_pivot_high is not None:
-        result["pivot_high"] = round(recent_pivot_high, 1)
+        result["pivot_high"] = recent_pivot_high
         result["pivot_high_age"] = recent_pivot_high_age
-        result["dist_to_pivot_high"] = round(recent_pivot_high - current_price, 1)
+        result["dist_to_pivot_high"] = recent_pivot_high - current_price
     if recent_pivot_low is not None:
-        result["pivot_low"] = round(recent_pivot_low, 1)
+        result["pivot_low"] = recent_pivot_low
         result["pivot_low_age"] = recent_pivot_low_age
-        result["dist_to_pivot_low"] = round(current_price - recent_pivot_low, 1)
+        result["dist_to_pivot_low"] = current_price - recent_pivot_low
 
     # ── Heiken Ashi ───────────────────────────────────────────────────────────
     ha_open_v, ha_high_v, ha_low_v, ha_close_v = heiken_ashi(opens, highs, lows, closes)
-    if ha_close_v and ha_close_v[-1] is not None:
+    if ha_close_v:
         ha_bull = ha_close_v[-1] > ha_open_v[-1]
         result["ha_bullish"] = ha_bull
         # Count consecutive HA candles in same direction (positive=bullish, negative=bearish)
         streak = 0
-        for i in range(len(ha_close_v) - 1, -1, -1):
-            if ha_close_v[i] is None:
-                break
-            if (ha_close_v[i] > ha_open_v[i]) == ha_bull:
-                streak += 1
-            else:
+        for ha_c, ha_o in zip(reversed(ha_close_v), reversed(ha_open_v)):
+            if (ha_c > ha_o) != ha_bull:
                 break
+            streak += 1
         result["ha_streak"] = streak if ha_bull else -streak
     else:
         result["ha_bullish"] = None
@@ -534,11 +660,11 @@ def analyze_timeframe(candles: list[dict]) -> dict:
         for i in range(n_c - 1, max(n_c - 6, 2), -1):
             if highs[i - 2] < lows[i]:
                 result["fvg_bullish"] = True
-                result["fvg_level"]   = round((highs[i - 2] + lows[i]) / 2, 1)
+                result["fvg_level"]   = (highs[i - 2] + lows[i]) / 2
                 break
             if lows[i - 2] > highs[i]:
                 result["fvg_bearish"] = True
-                result["fvg_level"]   = round((lows[i - 2] + highs[i]) / 2, 1)
+                result["fvg_level"]   = (lows[i - 2] + highs[i]) / 2
                 break
 
     # ── Fibonacci Retracement ─────────────────────────────────────────────────
@@ -546,22 +672,18 @@ def analyze_timeframe(candles: list[dict]) -> dict:
         sh = result["swing_high_20"]
         sl_f = result["swing_low_20"]
         rng = sh - sl_f
-        fib_levels = {
-            "fib_236": round(sh - 0.236 * rng, 1),
-            "fib_382": round(sh - 0.382 * rng, 1),
-            "fib_500": round(sh - 0.500 * rng, 1),
-            "fib_618": round(sh - 0.618 * rng, 1),
-            "fib_786": round(sh - 0.786 * rng, 1),
-        }
-        result["fibonacci"] = fib_levels
-        # Nearest fib level within 50pts of current price
+        # Levels and the nearest one within 50pts, built in the same loop
+        fib_levels = {}
         fib_near = None
         min_dist = float("inf")
-        for name, level in fib_levels.items():
+        for name, ratio in _FIB_RATIOS:
+            level = sh - ratio * rng
+            fib_levels[name] = level
             dist = abs(current_price - level)
             if dist <= 50 and dist < min_dist:
                 min_dist = dist
                 fib_near = name
+        result["fibonacci"] = fib_levels
         result["fib_near"] = fib_near
     else:
         result["fibonacci"] = {}
@@ -579,8 +701,8 @@ def analyze_timeframe(candles: list[dict]) -> dict:
     # Previous 20-period swing excluding current candle, then check if current candle
     # swept past it intrabar but closed on the other side (reversal signal).
     if len(highs) >= 21:
-        prev_swing_high = max(highs[-21:-1])
-        prev_swing_low  = min(lows[-21:-1])
+        # Swing high and low of the 20 bars before the current one, in one pass
+        prev_swing_high, prev_swing_low = _high_low(highs, lows, len(highs) - 21, len(highs) - 1)
         # Bullish sweep: low dips below prev swing low but close is above it
         result["swept_low"]  = lows[-1] < prev_swing_low  and closes[-1] > prev_swing_low
         # Bearish sweep: high pushes above prev swing high but close is below it
@@ -610,23 +732,23 @@ def analyze_timeframe(candles: list[dict]) -> dict:
     # ── Pre-entry Context (trade quality filters) ────────────────────────
     # Pullback depth: price change over last 5 candles (negative = price fell)
     if len(closes) >= 6:
-        result["pullback_depth"] = round(closes[-1] - closes[-6], 1)
+        result["pullback_depth"] = closes[-1] - closes[-6]
     else:
         result["pullback_depth"] = 0.0
 
     # Average candle range (volatility proxy) — last 5 completed candles
     n_vol = min(5, len(candles))
     recent_ranges = [candles[-(i+1)]["high"] - candles[-(i+1)]["low"] for i in range(n_vol)]
-    result["avg_candle_range"] = round(sum(recent_ranges) / len(recent_ranges), 1) if recent_ranges else 0.0
+    result["avg_candle_range"] = sum(recent_ranges) / len(recent_ranges) if recent_ranges else 0.0
 
     # Bollinger Band width (market regime: narrow=squeeze, wide=trending)
     if result["bollinger_upper"] and result["bollinger_lower"]:
-        result["bb_width"] = round(result["bollinger_upper"] - result["bollinger_lower"], 1)
+        result["bb_width"] = result["bollinger_upper"] - result["bollinger_lower"]
     else:
         result["bb_width"] = None
 
     # ATR(14) — true volatility per candle, used by AI to set appropriate SL/TP width
-    result["atr"] = round(compute_atr(candles, period=14), 1)
+    result["atr"] = compute_atr(candles, period=14)
 
     # ── Anchored VWAPs (requires timestamp field in candles) ─────────────────
     try:
@@ -645,7 +767,7 @@ def analyze_timeframe(candles: list[dict]) -> dict:
         result["anchored_vwap_weekly"] = None
 
     # ── Volume Profile (POC / VAH / VAL) ──────────────────────────────────────
-    if any(c.get("volume", 0) > 0 for c in candles):
+    if has_vol:
         vp = compute_volume_profile(candles, lookback=50, bucket_size=25)
         result["volume_poc"] = vp["poc"]
         result["volume_vah"] = vp["vah"]
@@ -660,8 +782,7 @@ def analyze_timeframe(candles: list[dict]) -> dict:
     result["equal_highs_zones"] = eq["equal_highs_zones"]
     result["equal_lows_zones"]  = eq["equal_lows_zones"]
 
-    return result
-
+    return _round_for_output(result)
 
 
 def detect_higher_lows(prices: list[float], lookback: int = 5) -> bool:
@@ -669,18 +790,20 @@ def detect_higher_lows(prices: list[float], lookback: int = 5) -> bool:
     if len(prices) < lookback * 2:
         return False
     
-    lows = []
-    for i in range(2, len(prices) - 2):
-        if prices[i] < prices[i - 1] and prices[i] < prices[i - 2]:
-            if prices[i] < prices[i + 1] and prices[i] < prices[i + 2]:
-                lows.append(prices[i])
+    # Only the last 2-3 swing lows matter: scan back from the end, stop at 3
+    lows = []  # newest first
+    for i in range(len(prices) - 3, 1, -1):
+        p = prices[i]
+        if p < prices[i - 1] and p < prices[i - 2] and p < prices[i + 1] and p < prices[i + 2]:
+            lows.append(p)
+            if len(lows) == 3:
+                break
     
     if len(lows) < 2:
         return False
     
-    # Check last 2-3 swing lows are ascending
-    recent_lows = lows[-3:]
-    return all(recent_lows[i] > recent_lows[i - 1] for i in range(1, len(recent_lows)))
+    # Ascending in time == strictly descending newest-first
+    return all(lows[i] < lows[i - 1] for i in range(1, len(lows)))
 
 
 def anchored_vwap(candles: list[dict], anchor_isodate: str) -> float | None:
@@ -690,13 +813,16 @@ def anchored_vwap(candles: list[dict], anchor_isodate: str) -> float | None:
     Requires candles to have 'timestamp' and 'volume' fields.
     """
     try:
-        filtered = [c for c in candles if str(c.get("timestamp", ""))[:10] >= anchor_isodate and c.get("volume", 0) > 0]
-        if not filtered:
-            return None
-        total_vol = sum(c["volume"] for c in filtered)
+        # One pass: filter and accumulate volume / typical-price*volume together
+        total_vol = 0.0
+        tpv = 0.0
+        for c in candles:
+            vol = c.get("volume", 0)
+            if vol > 0 and str(c.get("timestamp", ""))[:10] >= anchor_isodate:
+                total_vol += vol
+                tpv += ((c["high"] + c["low"] + c["close"]) / 3) * vol
         if total_vol <= 0:
             return None
-        tpv = sum(((c["high"] + c["low"] + c["close"]) / 3) * c["volume"] for c in filtered)
         return round(tpv / total_vol, 1)
     except Exception:
         return None
@@ -1028,6 +1154,40 @@ def _build_confluence(tf_15m: dict, direction: str, pivots: dict = None) -> tupl
     return conf, counter
 
 
+def _default_bracket(entry: float, direction: str) -> tuple[float, float]:
+    """Default (sl, tp) around entry for a LONG or SHORT setup."""
+    if direction == "LONG":
+        return entry - DEFAULT_SL_DISTANCE, entry + DEFAULT_TP_DISTANCE
+    return entry + DEFAULT_SL_DISTANCE, entry - DEFAULT_TP_DISTANCE
+
+
+def _confluence_text(conf_list: list[str], counter_list: list[str]) -> str:
+    """Reasoning suffix listing confluence and caution signals (empty if none)."""
+    text = ""
+    if conf_list:
+        text += f" Confluence: {', '.join(conf_list)}."
+    if counter_list:
+        text += f" Caution: {', '.join(counter_list)}."
+    return text
+
+
+def _setup_found(
+    result: dict, setup_type: str, direction: str,
+    entry: float, sl: float, tp: float, reasoning: str,
+) -> dict:
+    """Mark result as a detected setup (levels rounded to 1dp) and return it."""
+    result.update({
+        "found": True,
+        "type": setup_type,
+        "direction": direction,
+        "entry": round(entry, 1),
+        "sl": round(sl, 1),
+        "tp": round(tp, 1),
+        "reasoning": reasoning,
+    })
+    return result
+
+
 def detect_setup(
     tf_daily: dict,
     tf_4h: dict,
@@ -1072,6 +1232,32 @@ def detect_setup(
     ema50_15m = tf_15m.get("ema50")
     rsi_4h = tf_4h.get("rsi")
 
+    # Bind the 15M fields read by several setups once, instead of a dict
+    # lookup per setup block.
+    candle_open = tf_15m.get("open")
+    candle_high = tf_15m.get("high")
+    candle_low = tf_15m.get("low")
+    prev_close = tf_15m.get("prev_close")
+    ema9_15m = tf_15m.get("ema9")
+    above_ema9 = tf_15m.get("above_ema9")
+    above_ema50 = tf_15m.get("above_ema50")
+    above_ema200_15m = tf_15m.get("above_ema200")
+    vwap_15m = tf_15m.get("vwap")
+    above_vwap = tf_15m.get("above_vwap")
+    ha_bullish = tf_15m.get("ha_bullish")
+    ha_streak = tf_15m.get("ha_streak")
+    vol_signal = tf_15m.get("volume_signal", "NORMAL")
+    vol_signal_raw = tf_15m.get("volume_signal")
+    cp_direction = tf_15m.get("candlestick_direction")
+    candle_patterns = tf_15m.get("candlestick_patterns", [])
+    swept_low = tf_15m.get("swept_low", False)
+    swept_high = tf_15m.get("swept_high", False)
+    fvg_bearish = tf_15m.get("fvg_bearish", False)
+    swing_high_20 = tf_15m.get("swing_high_20")
+    swing_low_20 = tf_15m.get("swing_low_20")
+    swing_low_20_prev = tf_15m.get("swing_low_20_prev")
+    lows_15m = tf_15m.get("lows", [])
+
     # Use EMA200 with fallback to EMA50 for trend determination
     daily_bullish = tf_daily.get("above_ema200_fallback")
 
@@ -1093,17 +1279,17 @@ def detect_setup(
         "daily_bullish": daily_bullish,
         "rsi_4h": rsi_4h,
         # Market structure context — fed directly to Sonnet/Opus
-        "volume_signal": tf_15m.get("volume_signal"),
+        "volume_signal": vol_signal_raw,
         "volume_ratio": tf_15m.get("volume_ratio"),
-        "swing_high_20": tf_15m.get("swing_high_20"),
-        "swing_low_20": tf_15m.get("swing_low_20"),
+        "swing_high_20": swing_high_20,
+        "swing_low_20": swing_low_20,
         "dist_to_swing_high": tf_15m.get("dist_to_swing_high"),
         "dist_to_swing_low": tf_15m.get("dist_to_swing_low"),
         # Phase 1 indicators
-        "vwap": tf_15m.get("vwap"),
-        "above_vwap": tf_15m.get("above_vwap"),
-        "ha_bullish": tf_15m.get("ha_bullish"),
-        "ha_streak": tf_15m.get("ha_streak"),
+        "vwap": vwap_15m,
+        "above_vwap": above_vwap,
+        "ha_bullish": ha_bullish,
+        "ha_streak": ha_streak,
         "fib_near": tf_15m.get("fib_near"),
         "fibonacci": tf_15m.get("fibonacci", {}),
         "fvg_bullish": tf_15m.get("fvg_bullish"),
@@ -1116,9 +1302,9 @@ def detect_setup(
         # Phase 2 indicators
         "pivots": pivots,
         "candlestick_pattern": tf_15m.get("candlestick_pattern"),
-        "candlestick_direction": tf_15m.get("candlestick_direction"),
+        "candlestick_direction": cp_direction,
         "candlestick_strength": tf_15m.get("candlestick_strength"),
-        "candlestick_patterns": tf_15m.get("candlestick_patterns", []),
+        "candlestick_patterns": candle_patterns,
         "body_trend": tf_15m.get("body_trend"),
         "consecutive_direction": tf_15m.get("consecutive_direction"),
         "avg_body_size": tf_15m.get("avg_body_size"),
@@ -1128,9 +1314,9 @@ def detect_setup(
         "avg_candle_range": tf_15m.get("avg_candle_range"),
         "bb_width": tf_15m.get("bb_width"),
         # Momentum setup context
-        "ema9_15m": tf_15m.get("ema9"),
-        "above_ema9": tf_15m.get("above_ema9"),
-        "above_ema200": tf_15m.get("above_ema200"),
+        "ema9_15m": ema9_15m,
+        "above_ema9": above_ema9,
+        "above_ema200": above_ema200_15m,
         # New market structure fields
         "anchored_vwap_daily":  tf_15m.get("anchored_vwap_daily"),
         "anchored_vwap_weekly": tf_15m.get("anchored_vwap_weekly"),
@@ -1173,14 +1359,12 @@ def detect_setup(
     # When HA streak <= -2 AND price making new lows, bounces are likely fakeouts.
     # Let SHORT setups handle it instead.
     # ============================================================
-    _ha_streak_filter = tf_15m.get("ha_streak")
-    _prev_close_filter = tf_15m.get("prev_close")
     # Bearish momentum filter: skip LONG bounce setups during freefall (HA streak ≤-2 + price falling).
     # EXCEPTION: when RSI < 35 (deeply oversold), bounces are valid mean-reversion — let them through.
     # AI still makes the final call on whether the bounce has enough confirmation.
     _strong_bearish_momentum = (
-        _ha_streak_filter is not None and _ha_streak_filter <= -2
-        and _prev_close_filter is not None and price < _prev_close_filter
+        ha_streak is not None and ha_streak <= -2
+        and prev_close is not None and price < prev_close
         and (rsi_15m is None or rsi_15m >= 35)  # bypass when deeply oversold
     )
 
@@ -1195,28 +1379,21 @@ def detect_setup(
     if not _skip_long and bb_mid and rsi_15m:
         near_mid_pts = abs(price - bb_mid) <= 80  # tightened from 150: higher WR, fewer marginal entries
         rsi_ok_long = 30 <= rsi_15m <= RSI_ENTRY_HIGH_BOUNCE  # widened from 35 to 30 (captures RSI 30-35 near BB mid)
-        above_ema50 = tf_15m.get("above_ema50")
-        prev_close = tf_15m.get("prev_close")
-        swept_low_bm = tf_15m.get("swept_low", False)  # bullish liquidity sweep: dipped below level, closed back above
+        swept_low_bm = swept_low  # bullish liquidity sweep: dipped below level, closed back above
         bounce_starting = prev_close is not None and price > prev_close
         # Relaxed bounce gate for oversold: if RSI<40, accept alternative reversal signals
         if not bounce_starting and rsi_15m < 40:
-            candle_open_b = tf_15m.get("open")
-            candle_low_b  = tf_15m.get("low")
-            lower_wick_b = (min(candle_open_b, price) - candle_low_b) if (candle_open_b is not None and candle_low_b is not None) else 0
-            ha_bull = tf_15m.get("ha_bullish")
-            candle_patterns = tf_15m.get("candlestick_patterns", [])
+            lower_wick_b = (min(candle_open, price) - candle_low) if (candle_open is not None and candle_low is not None) else 0
             bullish_pattern = any(p.get("direction") == "bullish" for p in candle_patterns) if candle_patterns else False
-            bounce_starting = lower_wick_b >= 20 or ha_bull or bullish_pattern
+            bounce_starting = lower_wick_b >= 20 or ha_bullish or bullish_pattern
         # Liquidity sweep counts as strongest bounce confirmation (price swept below BB mid and closed back above)
         bounce_confirmed = bounce_starting or swept_low_bm
 
         if near_mid_pts and rsi_ok_long and bounce_confirmed and not _strong_bearish_momentum:
             entry = price
-            sl = entry - DEFAULT_SL_DISTANCE
+            sl, tp = _default_bracket(entry, "LONG")
             if ema50_15m:
                 sl = max(sl, ema50_15m - 20)
-            tp = entry + DEFAULT_TP_DISTANCE
 
             ema50_note = "above EMA50" if above_ema50 else "below EMA50 (AI to evaluate)"
             conf_list, counter_list = _build_confluence(tf_15m, "LONG", pivots=pivots)
@@ -1225,20 +1402,8 @@ def detect_setup(
                 f"Price {abs(price - bb_mid):.0f}pts from mid ({bb_mid:.0f}). "
                 f"RSI {rsi_15m:.1f} in zone. {ema50_note}. {daily_str}."
             )
-            if conf_list:
-                reasoning += f" Confluence: {', '.join(conf_list)}."
-            if counter_list:
-                reasoning += f" Caution: {', '.join(counter_list)}."
-            result.update({
-                "found": True,
-                "type": "bollinger_mid_bounce",
-                "direction": "LONG",
-                "entry": round(entry, 1),
-                "sl": round(sl, 1),
-                "tp": round(tp, 1),
-                "reasoning": reasoning,
-            })
-            return result
+            reasoning += _confluence_text(conf_list, counter_list)
+            return _setup_found(result, "bollinger_mid_bounce", "LONG", entry, sl, tp, reasoning)
 
     # --- LONG Setup 2: Bollinger Lower Band Bounce ---
     # Deeply oversold — strongest mean-reversion signal.
@@ -1248,18 +1413,14 @@ def detect_setup(
     if not _skip_long and bb_lower and rsi_15m:
         near_lower_pts = abs(price - bb_lower) <= 80  # tightened: must be genuinely near the band
         rsi_ok_lower = 20 <= rsi_15m <= 40
-        candle_open_l = tf_15m.get("open")
-        candle_low_l  = tf_15m.get("low")
-        swept_low_bl = tf_15m.get("swept_low", False)
         # BB lower sweep: wick actually touched or pierced the band (within 10pts), close back above
         # This is the post-hunt entry — the sweep below the band already happened this candle
-        bb_lower_wick_test = candle_low_l is not None and candle_low_l <= bb_lower + 10
-        rejection_l = bb_lower_wick_test or swept_low_bl  # band wick OR broader swing-low sweep
+        bb_lower_wick_test = candle_low is not None and candle_low <= bb_lower + 10
+        rejection_l = bb_lower_wick_test or swept_low  # band wick OR broader swing-low sweep
 
         if near_lower_pts and rsi_ok_lower and rejection_l and not _strong_bearish_momentum:
             entry = price
-            sl = entry - DEFAULT_SL_DISTANCE
-            tp = entry + DEFAULT_TP_DISTANCE
+            sl, tp = _default_bracket(entry, "LONG")
             macro_note = (
                 f" 4H RSI {rsi_4h:.1f} — multi-TF oversold confluence."
                 if rsi_4h and rsi_4h < 40 else ""
@@ -1269,69 +1430,41 @@ def detect_setup(
                 f"LONG: BB lower band bounce on 15M. "
                 f"Price {abs(price - bb_lower):.0f}pts from lower ({bb_lower:.0f}). "
                 f"RSI {rsi_15m:.1f} deeply oversold. "
-                f"{'Swing-low sweep' if swept_low_bl else 'BB lower band wick'} rejection. "
+                f"{'Swing-low sweep' if swept_low else 'BB lower band wick'} rejection. "
                 f"{daily_str}.{macro_note}"
             )
-            if conf_list:
-                reasoning += f" Confluence: {', '.join(conf_list)}."
-            if counter_list:
-                reasoning += f" Caution: {', '.join(counter_list)}."
-            result.update({
-                "found": True,
-                "type": "bollinger_lower_bounce",
-                "direction": "LONG",
-                "entry": round(entry, 1),
-                "sl": round(sl, 1),
-                "tp": round(tp, 1),
-                "reasoning": reasoning,
-            })
-            return result
+            reasoning += _confluence_text(conf_list, counter_list)
+            return _setup_found(result, "bollinger_lower_bounce", "LONG", entry, sl, tp, reasoning)
 
     # --- LONG Setup 3: EMA50 Bounce (disabled until validated — see ENABLE_EMA50_BOUNCE_SETUP) ---
     if not _skip_long and ENABLE_EMA50_BOUNCE_SETUP and ema50_15m and rsi_15m:
         dist_ema50 = abs(price - ema50_15m)
         if dist_ema50 <= 150 and rsi_15m < 55 and price >= ema50_15m - 10:
             entry = price
-            sl = entry - DEFAULT_SL_DISTANCE
-            tp = entry + DEFAULT_TP_DISTANCE
-
-            result.update({
-                "found": True,
-                "type": "ema50_bounce",
-                "direction": "LONG",
-                "entry": round(entry, 1),
-                "sl": round(sl, 1),
-                "tp": round(tp, 1),
-                "reasoning": (
-                    f"LONG: EMA50 bounce on 15M. Price {dist_ema50:.0f}pts from EMA50 ({ema50_15m:.0f}). "
-                    f"RSI {rsi_15m:.1f}. {daily_str}."
-                ),
-            })
-            return result
+            sl, tp = _default_bracket(entry, "LONG")
+            reasoning = (
+                f"LONG: EMA50 bounce on 15M. Price {dist_ema50:.0f}pts from EMA50 ({ema50_15m:.0f}). "
+                f"RSI {rsi_15m:.1f}. {daily_str}."
+            )
+            return _setup_found(result, "ema50_bounce", "LONG", entry, sl, tp, reasoning)
 
     # --- LONG Setup 4: Oversold Reversal (extreme mean-reversion) ---
     # Fires when RSI < 30 and daily is bullish — textbook oversold reversal in uptrend.
     # Weaker reversal confirmation: any wick, HA turn, or candle pattern suffices.
     if not _skip_long and rsi_15m and rsi_15m < 30 and daily_bullish and not _strong_bearish_momentum:
-        candle_open_os = tf_15m.get("open")
-        candle_low_os  = tf_15m.get("low")
-        lower_wick_os = (min(candle_open_os, price) - candle_low_os) if (candle_open_os is not None and candle_low_os is not None) else 0
-        ha_bull_os = tf_15m.get("ha_bullish")
-        swept_low = tf_15m.get("swept_low", False)
-        candle_patterns_os = tf_15m.get("candlestick_patterns", [])
-        bullish_pattern_os = any(p.get("direction") == "bullish" for p in candle_patterns_os) if candle_patterns_os else False
-        reversal_confirm = lower_wick_os >= 10 or ha_bull_os or bullish_pattern_os or swept_low
+        lower_wick_os = (min(candle_open, price) - candle_low) if (candle_open is not None and candle_low is not None) else 0
+        bullish_pattern_os = any(p.get("direction") == "bullish" for p in candle_patterns) if candle_patterns else False
+        reversal_confirm = lower_wick_os >= 10 or ha_bullish or bullish_pattern_os or swept_low
 
         if reversal_confirm:
             entry = price
-            sl = entry - DEFAULT_SL_DISTANCE
-            tp = entry + DEFAULT_TP_DISTANCE
+            sl, tp = _default_bracket(entry, "LONG")
             rsi_4h_note = f" 4H RSI {rsi_4h:.1f} — multi-TF oversold." if rsi_4h and rsi_4h < 40 else ""
             conf_list, counter_list = _build_confluence(tf_15m, "LONG", pivots=pivots)
             confirm_str = []
             if lower_wick_os >= 10:
                 confirm_str.append(f"wick {lower_wick_os:.0f}pts")
-            if ha_bull_os:
+            if ha_bullish:
                 confirm_str.append("HA bullish")
             if bullish_pattern_os:
                 confirm_str.append("bullish candle pattern")
@@ -1343,20 +1476,8 @@ def detect_setup(
                 f"Reversal: {', '.join(confirm_str)}. "
                 f"{daily_str}.{rsi_4h_note}"
             )
-            if conf_list:
-                reasoning += f" Confluence: {', '.join(conf_list)}."
-            if counter_list:
-                reasoning += f" Caution: {', '.join(counter_list)}."
-            result.update({
-                "found": True,
-                "type": "oversold_reversal",
-                "direction": "LONG",
-                "entry": round(entry, 1),
-                "sl": round(sl, 1),
-                "tp": round(tp, 1),
-                "reasoning": reasoning,
-            })
-            return result
+            reasoning += _confluence_text(conf_list, counter_list)
+            return _setup_found(result, "oversold_reversal", "LONG", entry, sl, tp, reasoning)
 
     # --- LONG Setup 5: Extreme Oversold Reversal (bear market snap-back) ---
     # RSI < 28 — extreme oversold, even in a bear market a snap-back is likely.
@@ -1377,19 +1498,13 @@ def detect_setup(
         _4h_oversold_ok = near_4h_bb_lower or rsi_4h_extreme or (_4h_not_available and rsi_15m < 25)
 
         if _4h_oversold_ok:
-            candle_open_ext = tf_15m.get("open")
-            candle_low_ext  = tf_15m.get("low")
-            lower_wick_ext = (min(candle_open_ext, price) - candle_low_ext) if (candle_open_ext is not None and candle_low_ext is not None) else 0
-            ha_bull_ext = tf_15m.get("ha_bullish")
-            swept_low_ext = tf_15m.get("swept_low", False)
-            candle_patterns_ext = tf_15m.get("candlestick_patterns", [])
-            bullish_pattern_ext = any(p.get("direction") == "bullish" for p in candle_patterns_ext) if candle_patterns_ext else False
-            reversal_confirm_ext = lower_wick_ext >= 10 or ha_bull_ext or swept_low_ext or bullish_pattern_ext
+            lower_wick_ext = (min(candle_open, price) - candle_low) if (candle_open is not None and candle_low is not None) else 0
+            bullish_pattern_ext = any(p.get("direction") == "bullish" for p in candle_patterns) if candle_patterns else False
+            reversal_confirm_ext = lower_wick_ext >= 10 or ha_bullish or swept_low or bullish_pattern_ext
 
             if reversal_confirm_ext:
                 entry = price
-                sl = entry - DEFAULT_SL_DISTANCE
-                tp = entry + DEFAULT_TP_DISTANCE
+                sl, tp = _default_bracket(entry, "LONG")
                 _4h_note_parts = []
                 if rsi_4h_extreme:
                     _4h_note_parts.append(f"4H RSI {rsi_4h:.1f}")
@@ -1400,11 +1515,11 @@ def detect_setup(
                 confirm_ext_str = []
                 if lower_wick_ext >= 10:
                     confirm_ext_str.append(f"wick {lower_wick_ext:.0f}pts")
-                if ha_bull_ext:
+                if ha_bullish:
                     confirm_ext_str.append("HA bullish")
                 if bullish_pattern_ext:
                     confirm_ext_str.append("bullish candle pattern")
-                if swept_low_ext:
+                if swept_low:
                     confirm_ext_str.append("liquidity sweep")
                 reasoning = (
                     f"LONG: Extreme oversold reversal on 15M. "
@@ -1413,20 +1528,8 @@ def detect_setup(
                     f"{daily_str}.{rsi_4h_note} "
                     f"HIGH-RISK: counter-trend in bear conditions — size down."
                 )
-                if conf_list:
-                    reasoning += f" Confluence: {', '.join(conf_list)}."
-                if counter_list:
-                    reasoning += f" Caution: {', '.join(counter_list)}."
-                result.update({
-                    "found": True,
-                    "type": "extreme_oversold_reversal",
-                    "direction": "LONG",
-                    "entry": round(entry, 1),
-                    "sl": round(sl, 1),
-                    "tp": round(tp, 1),
-                    "reasoning": reasoning,
-                })
-                return result
+                reasoning += _confluence_text(conf_list, counter_list)
+                return _setup_found(result, "extreme_oversold_reversal", "LONG", entry, sl, tp, reasoning)
 
     # ============================================================
     # MOMENTUM / TREND-FOLLOWING LONG SETUPS
@@ -1434,15 +1537,6 @@ def detect_setup(
     # setups (above) don't apply because price is NOT near BB lower/mid.
     # Ordered: most specific (breakout) → most general (momentum continuation).
     # ============================================================
-    ema9_15m = tf_15m.get("ema9")
-    above_ema9 = tf_15m.get("above_ema9")
-    above_ema50 = tf_15m.get("above_ema50")
-    above_ema200_15m = tf_15m.get("above_ema200")
-    above_vwap = tf_15m.get("above_vwap")
-    vwap_15m = tf_15m.get("vwap")
-    ha_bullish = tf_15m.get("ha_bullish")
-    ha_streak = tf_15m.get("ha_streak")
-    vol_signal = tf_15m.get("volume_signal", "NORMAL")
     vol_ratio = tf_15m.get("volume_ratio", 1.0) or 1.0
     above_ema50_4h = tf_4h.get("above_ema50")
 
@@ -1451,42 +1545,28 @@ def detect_setup(
     # Catches breakout moves with institutional participation.
     if not _skip_long and bb_upper and rsi_15m and ema50_15m and above_ema50:
         near_bb_upper = abs(price - bb_upper) <= BB_UPPER_PROXIMITY_PTS
-        swing_high = tf_15m.get("swing_high_20")
-        near_swing_high = swing_high is not None and abs(price - swing_high) <= SWING_HIGH_PROXIMITY_PTS
+        near_swing_high = swing_high_20 is not None and abs(price - swing_high_20) <= SWING_HIGH_PROXIMITY_PTS
         rsi_ok_breakout = BREAKOUT_RSI_LOW <= rsi_15m <= BREAKOUT_RSI_HIGH
         vol_ok_breakout = vol_ratio >= BREAKOUT_VOL_RATIO_MIN
         ha_ok_breakout = ha_bullish is True
 
         if (near_bb_upper or near_swing_high) and rsi_ok_breakout and vol_ok_breakout and ha_ok_breakout:
             entry = price
-            sl = entry - DEFAULT_SL_DISTANCE
-            tp = entry + DEFAULT_TP_DISTANCE
+            sl, tp = _default_bracket(entry, "LONG")
             conf_list, counter_list = _build_confluence(tf_15m, "LONG", pivots=pivots)
             level_str = []
             if near_bb_upper:
                 level_str.append(f"BB upper ({bb_upper:.0f}, {abs(price - bb_upper):.0f}pts)")
             if near_swing_high:
-                level_str.append(f"swing high ({swing_high:.0f}, {abs(price - swing_high):.0f}pts)")
+                level_str.append(f"swing high ({swing_high_20:.0f}, {abs(price - swing_high_20):.0f}pts)")
             reasoning = (
                 f"LONG: Breakout on 15M. "
                 f"Near {', '.join(level_str)}. "
                 f"RSI {rsi_15m:.1f}, vol {vol_ratio:.1f}x, HA bullish. "
                 f"Above EMA50. {daily_str}."
             )
-            if conf_list:
-                reasoning += f" Confluence: {', '.join(conf_list)}."
-            if counter_list:
-                reasoning += f" Caution: {', '.join(counter_list)}."
-            result.update({
-                "found": True,
-                "type": "breakout_long",
-                "direction": "LONG",
-                "entry": round(entry, 1),
-                "sl": round(sl, 1),
-                "tp": round(tp, 1),
-                "reasoning": reasoning,
-            })
-            return result
+            reasoning += _confluence_text(conf_list, counter_list)
+            return _setup_found(result, "breakout_long", "LONG", entry, sl, tp, reasoning)
 
     # --- LONG Setup 7: VWAP Bounce Long ---
     # Price pulled back to VWAP in an uptrend and bouncing — intraday fair value re-entry.
@@ -1494,18 +1574,14 @@ def detect_setup(
         near_vwap = abs(price - vwap_15m) <= VWAP_PROXIMITY_PTS
         rsi_ok_vwap = VWAP_BOUNCE_RSI_LOW <= rsi_15m <= VWAP_BOUNCE_RSI_HIGH
         # Bounce confirmation: HA bullish/turning, or candle pattern, or lower wick, or liquidity sweep
-        swept_low_vb = tf_15m.get("swept_low", False)  # price dipped through VWAP and closed back above
-        candle_open_vb = tf_15m.get("open")
-        candle_low_vb = tf_15m.get("low")
-        lower_wick_vb = (min(candle_open_vb, price) - candle_low_vb) if (candle_open_vb is not None and candle_low_vb is not None) else 0
-        candle_patterns_vb = tf_15m.get("candlestick_patterns", [])
-        bullish_pattern_vb = any(p.get("direction") == "bullish" for p in candle_patterns_vb) if candle_patterns_vb else False
+        swept_low_vb = swept_low  # price dipped through VWAP and closed back above
+        lower_wick_vb = (min(candle_open, price) - candle_low) if (candle_open is not None and candle_low is not None) else 0
+        bullish_pattern_vb = any(p.get("direction") == "bullish" for p in candle_patterns) if candle_patterns else False
         bounce_confirm_vb = ha_bullish is True or lower_wick_vb >= 25 or bullish_pattern_vb or swept_low_vb  # wick tightened 15→25pts
 
         if near_vwap and rsi_ok_vwap and bounce_confirm_vb:
             entry = price
-            sl = entry - DEFAULT_SL_DISTANCE
-            tp = entry + DEFAULT_TP_DISTANCE
+            sl, tp = _default_bracket(entry, "LONG")
             conf_list, counter_list = _build_confluence(tf_15m, "LONG", pivots=pivots)
             confirm_str_vb = []
             if ha_bullish:
@@ -1520,20 +1596,8 @@ def detect_setup(
                 f"RSI {rsi_15m:.1f}. Bounce: {', '.join(confirm_str_vb)}. "
                 f"Above EMA50. {daily_str}."
             )
-            if conf_list:
-                reasoning += f" Confluence: {', '.join(conf_list)}."
-            if counter_list:
-                reasoning += f" Caution: {', '.join(counter_list)}."
-            result.update({
-                "found": True,
-                "type": "vwap_bounce_long",
-                "direction": "LONG",
-                "entry": round(entry, 1),
-                "sl": round(sl, 1),
-                "tp": round(tp, 1),
-                "reasoning": reasoning,
-            })
-            return result
+            reasoning += _confluence_text(conf_list, counter_list)
+            return _setup_found(result, "vwap_bounce_long", "LONG", entry, sl, tp, reasoning)
 
     # --- LONG Setup 8: EMA9 Pullback Long ---
     # Price pulled back to fast EMA9 in a strong uptrend — shallow dip re-entry.
@@ -1542,13 +1606,12 @@ def detect_setup(
     if not _skip_long and ema9_15m and rsi_15m and ema50_15m and above_ema50:
         near_ema9 = abs(price - ema9_15m) <= EMA9_PROXIMITY_PTS
         rsi_ok_ema9 = EMA9_PULLBACK_RSI_LOW <= rsi_15m <= EMA9_PULLBACK_RSI_HIGH
-        swept_low_e9 = tf_15m.get("swept_low", False)  # price swept below EMA9 and closed back above = post-sweep entry
+        swept_low_e9 = swept_low  # price swept below EMA9 and closed back above = post-sweep entry
         ha_ok_ema9 = (ha_bullish is True) or swept_low_e9  # tightened: HA must be bullish OR sweep confirmed
 
         if near_ema9 and rsi_ok_ema9 and ha_ok_ema9:
             entry = price
-            sl = entry - DEFAULT_SL_DISTANCE
-            tp = entry + DEFAULT_TP_DISTANCE
+            sl, tp = _default_bracket(entry, "LONG")
             conf_list, counter_list = _build_confluence(tf_15m, "LONG", pivots=pivots)
             reasoning = (
                 f"LONG: EMA9 pullback on 15M. "
@@ -1556,20 +1619,8 @@ def detect_setup(
                 f"RSI {rsi_15m:.1f}. HA {'bullish' if ha_bullish else f'streak {ha_streak}'}. "
                 f"Above EMA50. {daily_str}."
             )
-            if conf_list:
-                reasoning += f" Confluence: {', '.join(conf_list)}."
-            if counter_list:
-                reasoning += f" Caution: {', '.join(counter_list)}."
-            result.update({
-                "found": True,
-                "type": "ema9_pullback_long",
-                "direction": "LONG",
-                "entry": round(entry, 1),
-                "sl": round(sl, 1),
-                "tp": round(tp, 1),
-                "reasoning": reasoning,
-            })
-            return result
+            reasoning += _confluence_text(conf_list, counter_list)
+            return _setup_found(result, "ema9_pullback_long", "LONG", entry, sl, tp, reasoning)
 
     # --- LONG Setup 9: Momentum Continuation Long ---
     # Broadest catch-all for trending markets. Above EMA50 + VWAP + HA bullish streak.
@@ -1584,8 +1635,7 @@ def detect_setup(
 
         if rsi_ok_mom and above_vwap_ok and ha_streak_ok and vol_ok_mom:
             entry = price
-            sl = entry - DEFAULT_SL_DISTANCE
-            tp = entry + DEFAULT_TP_DISTANCE
+            sl, tp = _default_bracket(entry, "LONG")
             conf_list, counter_list = _build_confluence(tf_15m, "LONG", pivots=pivots)
             reasoning = (
                 f"LONG: Momentum continuation on 15M. "
@@ -1593,20 +1643,8 @@ def detect_setup(
                 f"Vol={vol_signal}. {daily_str}. "
                 f"Trend-following — RSI 45-70 is healthy, not overbought."
             )
-            if conf_list:
-                reasoning += f" Confluence: {', '.join(conf_list)}."
-            if counter_list:
-                reasoning += f" Caution: {', '.join(counter_list)}."
-            result.update({
-                "found": True,
-                "type": "momentum_continuation_long",
-                "direction": "LONG",
-                "entry": round(entry, 1),
-                "sl": round(sl, 1),
-                "tp": round(tp, 1),
-                "reasoning": reasoning,
-            })
-            return result
+            reasoning += _confluence_text(conf_list, counter_list)
+            return _setup_found(result, "momentum_continuation_long", "LONG", entry, sl, tp, reasoning)
 
     # ============================================================
     # SHORT SETUPS (bidirectional — no daily gate, C1 in confidence penalizes counter-trend)
@@ -1617,12 +1655,11 @@ def detect_setup(
     if not _skip_short and bb_upper and bb_mid and rsi_15m:
         near_upper_pts = abs(price - bb_upper) <= 150
         rsi_ok_short = 55 <= rsi_15m <= 75
-        below_ema50 = not tf_15m.get("above_ema50")
+        below_ema50 = not above_ema50
 
         if near_upper_pts and rsi_ok_short and below_ema50:
             entry = price
-            sl = entry + DEFAULT_SL_DISTANCE
-            tp = entry - DEFAULT_TP_DISTANCE
+            sl, tp = _default_bracket(entry, "SHORT")
 
             conf_list, counter_list = _build_confluence(tf_15m, "SHORT", pivots=pivots)
             reasoning = (
@@ -1630,20 +1667,8 @@ def detect_setup(
                 f"Price {abs(price - bb_upper):.0f}pts from upper ({bb_upper:.0f}). "
                 f"RSI {rsi_15m:.1f} in zone. Below EMA50. {short_daily_str}."
             )
-            if conf_list:
-                reasoning += f" Confluence: {', '.join(conf_list)}."
-            if counter_list:
-                reasoning += f" Caution: {', '.join(counter_list)}."
-            result.update({
-                "found": True,
-                "type": "bollinger_upper_rejection",
-                "direction": "SHORT",
-                "entry": round(entry, 1),
-                "sl": round(sl, 1),
-                "tp": round(tp, 1),
-                "reasoning": reasoning,
-            })
-            return result
+            reasoning += _confluence_text(conf_list, counter_list)
+            return _setup_found(result, "bollinger_upper_rejection", "SHORT", entry, sl, tp, reasoning)
 
     # --- SHORT Setup 2: EMA50 Rejection (rallied up to EMA50, getting turned away) ---
     if "ema50_rejection" not in DISABLED_SETUP_TYPES and not _skip_short and ema50_15m and rsi_15m:
@@ -1651,52 +1676,34 @@ def detect_setup(
         at_ema50_from_below = price <= ema50_15m + 2 and dist_ema50 <= 150
         if at_ema50_from_below and 50 <= rsi_15m <= 70:
             entry = price
-            sl = entry + DEFAULT_SL_DISTANCE
-            tp = entry - DEFAULT_TP_DISTANCE
+            sl, tp = _default_bracket(entry, "SHORT")
 
             conf_list, counter_list = _build_confluence(tf_15m, "SHORT", pivots=pivots)
             reasoning = (
                 f"SHORT: EMA50 rejection on 15M. Price {dist_ema50:.0f}pts from EMA50 ({ema50_15m:.0f}), "
                 f"testing from below. RSI {rsi_15m:.1f}. {short_daily_str}."
             )
-            if conf_list:
-                reasoning += f" Confluence: {', '.join(conf_list)}."
-            if counter_list:
-                reasoning += f" Caution: {', '.join(counter_list)}."
-            result.update({
-                "found": True,
-                "type": "ema50_rejection",
-                "direction": "SHORT",
-                "entry": round(entry, 1),
-                "sl": round(sl, 1),
-                "tp": round(tp, 1),
-                "reasoning": reasoning,
-            })
-            return result
+            reasoning += _confluence_text(conf_list, counter_list)
+            return _setup_found(result, "ema50_rejection", "SHORT", entry, sl, tp, reasoning)
 
     # --- SHORT Setup 3: BB Mid Rejection (mirror of bb_mid_bounce LONG) ---
     # Price rallied up to BB mid as resistance and got rejected — heading back down.
     if "bb_mid_rejection" not in DISABLED_SETUP_TYPES and not _skip_short and bb_mid and rsi_15m:
         near_mid_pts = abs(price - bb_mid) <= 150
         rsi_ok_short_mid = 40 <= rsi_15m <= 65
-        prev_close_s = tf_15m.get("prev_close")
-        rejection_starting = prev_close_s is not None and price < prev_close_s
+        rejection_starting = prev_close is not None and price < prev_close
         # Relaxed rejection gate: accept alternative reversal signals
         if not rejection_starting and rsi_15m > 50:
-            candle_open_r = tf_15m.get("open")
-            candle_high_r = tf_15m.get("high")
-            upper_wick_r = (candle_high_r - max(candle_open_r, price)) if (candle_open_r is not None and candle_high_r is not None) else 0
-            ha_bear = tf_15m.get("ha_bullish") is False
-            cp_dir_r = tf_15m.get("candlestick_direction")
-            bearish_pattern_r = cp_dir_r == "bearish"
+            upper_wick_r = (candle_high - max(candle_open, price)) if (candle_open is not None and candle_high is not None) else 0
+            ha_bear = ha_bullish is False
+            bearish_pattern_r = cp_direction == "bearish"
             rejection_starting = upper_wick_r >= 20 or ha_bear or bearish_pattern_r
 
         if near_mid_pts and rsi_ok_short_mid and rejection_starting:
             entry = price
-            sl = entry + DEFAULT_SL_DISTANCE
-            tp = entry - DEFAULT_TP_DISTANCE
+            sl, tp = _default_bracket(entry, "SHORT")
 
-            below_ema50_s = not tf_15m.get("above_ema50")
+            below_ema50_s = not above_ema50
             ema50_note_s = "below EMA50" if below_ema50_s else "above EMA50 (AI to evaluate)"
             conf_list, counter_list = _build_confluence(tf_15m, "SHORT", pivots=pivots)
             reasoning = (
@@ -1704,37 +1711,20 @@ def detect_setup(
                 f"Price {abs(price - bb_mid):.0f}pts from mid ({bb_mid:.0f}). "
                 f"RSI {rsi_15m:.1f} in zone. {ema50_note_s}. {short_daily_str}."
             )
-            if conf_list:
-                reasoning += f" Confluence: {', '.join(conf_list)}."
-            if counter_list:
-                reasoning += f" Caution: {', '.join(counter_list)}."
-            result.update({
-                "found": True,
-                "type": "bb_mid_rejection",
-                "direction": "SHORT",
-                "entry": round(entry, 1),
-                "sl": round(sl, 1),
-                "tp": round(tp, 1),
-                "reasoning": reasoning,
-            })
-            return result
+            reasoning += _confluence_text(conf_list, counter_list)
+            return _setup_found(result, "bb_mid_rejection", "SHORT", entry, sl, tp, reasoning)
 
     # --- SHORT Setup 4: Overbought Reversal (mirror of oversold_reversal LONG) ---
     # RSI > 70 = extremely overbought. If daily bearish → textbook mean-reversion short.
     if not _skip_short and rsi_15m and rsi_15m > 70 and daily_bullish is False:
-        candle_open_ob = tf_15m.get("open")
-        candle_high_ob = tf_15m.get("high")
-        upper_wick_ob = (candle_high_ob - max(candle_open_ob, price)) if (candle_open_ob is not None and candle_high_ob is not None) else 0
-        ha_bear_ob = tf_15m.get("ha_bullish") is False
-        swept_high_ob = tf_15m.get("swept_high", False)
-        cp_dir_ob = tf_15m.get("candlestick_direction")
-        bearish_pattern_ob = cp_dir_ob == "bearish"
-        reversal_confirm_ob = upper_wick_ob >= 10 or ha_bear_ob or bearish_pattern_ob or swept_high_ob
+        upper_wick_ob = (candle_high - max(candle_open, price)) if (candle_open is not None and candle_high is not None) else 0
+        ha_bear_ob = ha_bullish is False
+        bearish_pattern_ob = cp_direction == "bearish"
+        reversal_confirm_ob = upper_wick_ob >= 10 or ha_bear_ob or bearish_pattern_ob or swept_high
 
         if reversal_confirm_ob:
             entry = price
-            sl = entry + DEFAULT_SL_DISTANCE
-            tp = entry - DEFAULT_TP_DISTANCE
+            sl, tp = _default_bracket(entry, "SHORT")
             rsi_4h_note_ob = f" 4H RSI {rsi_4h:.1f} — multi-TF overbought." if rsi_4h and rsi_4h > 60 else ""
             conf_list, counter_list = _build_confluence(tf_15m, "SHORT", pivots=pivots)
             confirm_str_ob = []
@@ -1744,7 +1734,7 @@ def detect_setup(
                 confirm_str_ob.append("HA bearish")
             if bearish_pattern_ob:
                 confirm_str_ob.append("bearish candle pattern")
-            if swept_high_ob:
+            if swept_high:
                 confirm_str_ob.append("liquidity sweep")
             reasoning = (
                 f"SHORT: Overbought reversal on 15M. "
@@ -1752,20 +1742,8 @@ def detect_setup(
                 f"Reversal: {', '.join(confirm_str_ob)}. "
                 f"{short_daily_str}.{rsi_4h_note_ob}"
             )
-            if conf_list:
-                reasoning += f" Confluence: {', '.join(conf_list)}."
-            if counter_list:
-                reasoning += f" Caution: {', '.join(counter_list)}."
-            result.update({
-                "found": True,
-                "type": "overbought_reversal",
-                "direction": "SHORT",
-                "entry": round(entry, 1),
-                "sl": round(sl, 1),
-                "tp": round(tp, 1),
-                "reasoning": reasoning,
-            })
-            return result
+            reasoning += _confluence_text(conf_list, counter_list)
+            return _setup_found(result, "overbought_reversal", "SHORT", entry, sl, tp, reasoning)
 
     # --- SHORT Setup 5: Breakdown Continuation (trend-following short) ---
     # Price already broke below key levels and keeps falling with momentum.
@@ -1774,76 +1752,55 @@ def detect_setup(
         dist_below_mid = price - bb_mid  # negative when below mid
         below_mid_significant = dist_below_mid < -100
         rsi_ok_breakdown = 25 <= rsi_15m <= 45
-        below_ema50_bd = not tf_15m.get("above_ema50")
-        ha_streak_bd = tf_15m.get("ha_streak")
-        ha_bearish_momentum = ha_streak_bd is not None and ha_streak_bd <= -2
-        vol_signal_bd = tf_15m.get("volume_signal", "NORMAL")
-        vol_ok_bd = vol_signal_bd != "LOW"
+        below_ema50_bd = not above_ema50
+        ha_bearish_momentum = ha_streak is not None and ha_streak <= -2
+        vol_ok_bd = vol_signal != "LOW"
 
         # Require bearish liquidity sweep: price spiked above a swing high (fake move) then closed back below.
         # Without this, the setup fires mid-move and gets caught in short-covering rallies.
-        swept_high_bd = tf_15m.get("swept_high", False)
 
-        if below_mid_significant and rsi_ok_breakdown and below_ema50_bd and ha_bearish_momentum and vol_ok_bd and swept_high_bd:
+        if below_mid_significant and rsi_ok_breakdown and below_ema50_bd and ha_bearish_momentum and vol_ok_bd and swept_high:
             entry = price
-            sl = entry + DEFAULT_SL_DISTANCE
-            tp = entry - DEFAULT_TP_DISTANCE
+            sl, tp = _default_bracket(entry, "SHORT")
 
             conf_list, counter_list = _build_confluence(tf_15m, "SHORT", pivots=pivots)
             reasoning = (
                 f"SHORT: Breakdown continuation on 15M. "
                 f"Price {abs(dist_below_mid):.0f}pts below BB mid ({bb_mid:.0f}). "
-                f"RSI {rsi_15m:.1f}, HA streak {ha_streak_bd}. "
-                f"Below EMA50, vol={vol_signal_bd}. Bearish sweep confirmed. {short_daily_str}."
+                f"RSI {rsi_15m:.1f}, HA streak {ha_streak}. "
+                f"Below EMA50, vol={vol_signal}. Bearish sweep confirmed. {short_daily_str}."
             )
-            if conf_list:
-                reasoning += f" Confluence: {', '.join(conf_list)}."
-            if counter_list:
-                reasoning += f" Caution: {', '.join(counter_list)}."
-            result.update({
-                "found": True,
-                "type": "breakdown_continuation",
-                "direction": "SHORT",
-                "entry": round(entry, 1),
-                "sl": round(sl, 1),
-                "tp": round(tp, 1),
-                "reasoning": reasoning,
-            })
-            return result
+            reasoning += _confluence_text(conf_list, counter_list)
+            return _setup_found(result, "breakdown_continuation", "SHORT", entry, sl, tp, reasoning)
 
     # --- SHORT Setup 6: Dead Cat Bounce Short ---
     # Bear market sell-the-rally: price bounced from oversold back up to resistance
     # (BB mid or EMA9), HA turned bearish again. Classic bear trap continuation.
     # Fires when daily is bearish OR when locally bearish structure is clear
     # (below EMA50 + HA streak <= -2) — catches medium-term bears while daily EMA200 still bullish.
-    ema9_15m = tf_15m.get("ema9")
     if not _skip_short and bb_mid and rsi_15m:
         rsi_ok_dcb = 43 <= rsi_15m <= 62
-        ha_bearish_dcb = tf_15m.get("ha_bullish") is False
-        ha_streak_dcb = tf_15m.get("ha_streak")
-        ha_turning_bear = ha_streak_dcb is not None and ha_streak_dcb <= -1
-        below_ema50_dcb = not tf_15m.get("above_ema50")
-        locally_bearish_dcb = below_ema50_dcb and ha_streak_dcb is not None and ha_streak_dcb <= -2
+        ha_bearish_dcb = ha_bullish is False
+        ha_turning_bear = ha_streak is not None and ha_streak <= -1
+        below_ema50_dcb = not above_ema50
+        locally_bearish_dcb = below_ema50_dcb and ha_streak is not None and ha_streak <= -2
         near_bb_mid_dcb = abs(price - bb_mid) <= 150
         near_ema9_dcb = ema9_15m is not None and abs(price - ema9_15m) <= 100
         at_resistance = near_bb_mid_dcb or near_ema9_dcb
-        cp_dir_dcb = tf_15m.get("candlestick_direction")
-        bearish_candle_dcb = cp_dir_dcb == "bearish"
-        fvg_bear_dcb = tf_15m.get("fvg_bearish", False)
-        rejection_confirm_dcb = ha_bearish_dcb or ha_turning_bear or bearish_candle_dcb or fvg_bear_dcb
+        bearish_candle_dcb = cp_direction == "bearish"
+        rejection_confirm_dcb = ha_bearish_dcb or ha_turning_bear or bearish_candle_dcb or fvg_bearish
         bias_allows_dcb = (daily_bullish is False) or locally_bearish_dcb
 
         if bias_allows_dcb and rsi_ok_dcb and below_ema50_dcb and at_resistance and rejection_confirm_dcb:
             entry = price
-            sl = entry + DEFAULT_SL_DISTANCE
-            tp = entry - DEFAULT_TP_DISTANCE
+            sl, tp = _default_bracket(entry, "SHORT")
             res_str = f"BB mid ({bb_mid:.0f})" if near_bb_mid_dcb else f"EMA9 ({ema9_15m:.0f})"
             confirm_parts_dcb = []
             if ha_bearish_dcb or ha_turning_bear:
-                confirm_parts_dcb.append(f"HA streak {ha_streak_dcb}")
+                confirm_parts_dcb.append(f"HA streak {ha_streak}")
             if bearish_candle_dcb:
                 confirm_parts_dcb.append("bearish candle")
-            if fvg_bear_dcb:
+            if fvg_bearish:
                 confirm_parts_dcb.append("bearish FVG overhead")
             conf_list, counter_list = _build_confluence(tf_15m, "SHORT", pivots=pivots)
             reasoning = (
@@ -1851,93 +1808,59 @@ def detect_setup(
                 f"RSI {rsi_15m:.1f} (bounced but failing). Below EMA50. "
                 f"Rejection: {', '.join(confirm_parts_dcb)}. {short_daily_str}."
             )
-            if conf_list:
-                reasoning += f" Confluence: {', '.join(conf_list)}."
-            if counter_list:
-                reasoning += f" Caution: {', '.join(counter_list)}."
-            result.update({
-                "found": True,
-                "type": "dead_cat_bounce_short",
-                "direction": "SHORT",
-                "entry": round(entry, 1),
-                "sl": round(sl, 1),
-                "tp": round(tp, 1),
-                "reasoning": reasoning,
-            })
-            return result
+            reasoning += _confluence_text(conf_list, counter_list)
+            return _setup_found(result, "dead_cat_bounce_short", "SHORT", entry, sl, tp, reasoning)
 
     # --- SHORT Setup 7: Bear Flag Breakdown ---
     # Low-volume consolidation after a sharp drop, then momentum resumes down.
     # Price coiling between BB lower and BB mid — the "flag". HA turning negative.
     if not _skip_short and bb_mid and bb_lower and rsi_15m:
         rsi_ok_flag = 28 <= rsi_15m <= 52
-        ha_streak_flag = tf_15m.get("ha_streak")
-        ha_neg_flag = ha_streak_flag is not None and ha_streak_flag <= -1
-        vol_signal_flag = tf_15m.get("volume_signal", "NORMAL")
-        vol_low_flag = vol_signal_flag in ("LOW", "NORMAL")  # flag = low/normal volume consolidation
+        ha_neg_flag = ha_streak is not None and ha_streak <= -1
+        vol_low_flag = vol_signal in ("LOW", "NORMAL")  # flag = low/normal volume consolidation
         in_flag_zone = bb_lower <= price <= bb_mid  # between lower and mid band
-        below_ema50_flag = not tf_15m.get("above_ema50")
-        below_vwap_flag = tf_15m.get("above_vwap") is False
-        fvg_bear_flag = tf_15m.get("fvg_bearish", False)
-        bearish_overhead = below_ema50_flag or fvg_bear_flag or below_vwap_flag
+        below_ema50_flag = not above_ema50
+        below_vwap_flag = above_vwap is False
+        bearish_overhead = below_ema50_flag or fvg_bearish or below_vwap_flag
 
         if rsi_ok_flag and ha_neg_flag and vol_low_flag and in_flag_zone and bearish_overhead:
             entry = price
-            sl = entry + DEFAULT_SL_DISTANCE
-            tp = entry - DEFAULT_TP_DISTANCE
+            sl, tp = _default_bracket(entry, "SHORT")
             conf_list, counter_list = _build_confluence(tf_15m, "SHORT", pivots=pivots)
             overhead_str = []
             if below_ema50_flag:
                 overhead_str.append("below EMA50")
-            if fvg_bear_flag:
+            if fvg_bearish:
                 overhead_str.append("bearish FVG overhead")
             if below_vwap_flag:
                 overhead_str.append("below VWAP")
             reasoning = (
                 f"SHORT: Bear flag breakdown on 15M. "
                 f"Price in flag zone ({bb_lower:.0f}–{bb_mid:.0f}). "
-                f"RSI {rsi_15m:.1f}, HA streak {ha_streak_flag}, vol={vol_signal_flag}. "
+                f"RSI {rsi_15m:.1f}, HA streak {ha_streak}, vol={vol_signal}. "
                 f"{', '.join(overhead_str)}. {short_daily_str}."
             )
-            if conf_list:
-                reasoning += f" Confluence: {', '.join(conf_list)}."
-            if counter_list:
-                reasoning += f" Caution: {', '.join(counter_list)}."
-            result.update({
-                "found": True,
-                "type": "bear_flag_breakdown",
-                "direction": "SHORT",
-                "entry": round(entry, 1),
-                "sl": round(sl, 1),
-                "tp": round(tp, 1),
-                "reasoning": reasoning,
-            })
-            return result
+            reasoning += _confluence_text(conf_list, counter_list)
+            return _setup_found(result, "bear_flag_breakdown", "SHORT", entry, sl, tp, reasoning)
 
     # --- SHORT Setup 8: VWAP Rejection Short ---
     # In a downtrend, price rallies back to VWAP (intraday fair value) and fails.
     # No daily requirement — VWAP is intraday, useful in any bear session.
-    vwap_15m = tf_15m.get("vwap")
     if "vwap_rejection_short" not in DISABLED_SETUP_TYPES and not _skip_short and vwap_15m and rsi_15m and ema50_15m:
         near_vwap_short = abs(price - vwap_15m) <= 120
         rsi_ok_vwap = 43 <= rsi_15m <= 60
-        below_ema50_vwap = not tf_15m.get("above_ema50")
-        below_vwap_short = tf_15m.get("above_vwap") is False  # currently below VWAP
+        below_ema50_vwap = not above_ema50
+        below_vwap_short = above_vwap is False  # currently below VWAP
         # Price must have just tested VWAP from below: prev_close < vwap, current near vwap
-        prev_close_vwap = tf_15m.get("prev_close")
-        tested_vwap = prev_close_vwap is not None and prev_close_vwap < vwap_15m and near_vwap_short
-        ha_bear_vwap = tf_15m.get("ha_bullish") is False
-        cp_dir_vwap = tf_15m.get("candlestick_direction")
-        bearish_candle_vwap = cp_dir_vwap == "bearish"
-        candle_high_vwap = tf_15m.get("high")
-        candle_open_vwap = tf_15m.get("open")
-        wick_vwap = (candle_high_vwap - max(candle_open_vwap or price, price)) if candle_high_vwap else 0
+        tested_vwap = prev_close is not None and prev_close < vwap_15m and near_vwap_short
+        ha_bear_vwap = ha_bullish is False
+        bearish_candle_vwap = cp_direction == "bearish"
+        wick_vwap = (candle_high - max(candle_open or price, price)) if candle_high else 0
         rejection_vwap = ha_bear_vwap or bearish_candle_vwap or wick_vwap >= 15
 
         if near_vwap_short and rsi_ok_vwap and below_ema50_vwap and tested_vwap and rejection_vwap:
             entry = price
-            sl = entry + DEFAULT_SL_DISTANCE
-            tp = entry - DEFAULT_TP_DISTANCE
+            sl, tp = _default_bracket(entry, "SHORT")
             conf_list, counter_list = _build_confluence(tf_15m, "SHORT", pivots=pivots)
             confirm_parts_vwap = []
             if ha_bear_vwap:
@@ -1952,20 +1875,8 @@ def detect_setup(
                 f"RSI {rsi_15m:.1f}. Below EMA50. "
                 f"Rejection: {', '.join(confirm_parts_vwap) or 'HA/candle'}. {short_daily_str}."
             )
-            if conf_list:
-                reasoning += f" Confluence: {', '.join(conf_list)}."
-            if counter_list:
-                reasoning += f" Caution: {', '.join(counter_list)}."
-            result.update({
-                "found": True,
-                "type": "vwap_rejection_short",
-                "direction": "SHORT",
-                "entry": round(entry, 1),
-                "sl": round(sl, 1),
-                "tp": round(tp, 1),
-                "reasoning": reasoning,
-            })
-            return result
+            reasoning += _confluence_text(conf_list, counter_list)
+            return _setup_found(result, "vwap_rejection_short", "SHORT", entry, sl, tp, reasoning)
 
     # --- SHORT Setup 9: High-Volume Distribution Short ---
     # Institutional selling at resistance: heavy volume + upper band rejection.
@@ -1974,22 +1885,17 @@ def detect_setup(
         near_upper_hv = abs(price - bb_upper) <= 200
         rsi_ok_hv = 55 <= rsi_15m <= 75
         vol_ratio_hv = tf_15m.get("volume_ratio", 1.0) or 1.0
-        vol_high_hv = vol_ratio_hv >= 1.4 or tf_15m.get("volume_signal") in ("HIGH", "VERY_HIGH")
-        swept_high_hv = tf_15m.get("swept_high", False)
-        at_supply_hv = near_upper_hv or swept_high_hv
-        cp_dir_hv = tf_15m.get("candlestick_direction")
-        bearish_candle_hv = cp_dir_hv == "bearish"
-        candle_open_hv = tf_15m.get("open")
-        candle_high_hv = tf_15m.get("high")
-        upper_wick_hv = (candle_high_hv - max(candle_open_hv, price)) if (candle_open_hv and candle_high_hv) else 0
+        vol_high_hv = vol_ratio_hv >= 1.4 or vol_signal_raw in ("HIGH", "VERY_HIGH")
+        at_supply_hv = near_upper_hv or swept_high
+        bearish_candle_hv = cp_direction == "bearish"
+        upper_wick_hv = (candle_high - max(candle_open, price)) if (candle_open and candle_high) else 0
         large_wick_hv = upper_wick_hv >= 20
-        ha_bear_hv = tf_15m.get("ha_bullish") is False
+        ha_bear_hv = ha_bullish is False
         rejection_hv = bearish_candle_hv or large_wick_hv or ha_bear_hv
 
         if at_supply_hv and rsi_ok_hv and vol_high_hv and rejection_hv:
             entry = price
-            sl = entry + DEFAULT_SL_DISTANCE
-            tp = entry - DEFAULT_TP_DISTANCE
+            sl, tp = _default_bracket(entry, "SHORT")
             confirm_hv = []
             if bearish_candle_hv:
                 confirm_hv.append("bearish candle")
@@ -1997,7 +1903,7 @@ def detect_setup(
                 confirm_hv.append(f"wick {upper_wick_hv:.0f}pts")
             if ha_bear_hv:
                 confirm_hv.append("HA bearish")
-            if swept_high_hv:
+            if swept_high:
                 confirm_hv.append("liquidity sweep")
             conf_list, counter_list = _build_confluence(tf_15m, "SHORT", pivots=pivots)
             reasoning = (
@@ -2005,20 +1911,8 @@ def detect_setup(
                 f"RSI {rsi_15m:.1f}, vol ratio {vol_ratio_hv:.2f}x. "
                 f"Rejection: {', '.join(confirm_hv)}. {short_daily_str}."
             )
-            if conf_list:
-                reasoning += f" Confluence: {', '.join(conf_list)}."
-            if counter_list:
-                reasoning += f" Caution: {', '.join(counter_list)}."
-            result.update({
-                "found": True,
-                "type": "high_volume_distribution",
-                "direction": "SHORT",
-                "entry": round(entry, 1),
-                "sl": round(sl, 1),
-                "tp": round(tp, 1),
-                "reasoning": reasoning,
-            })
-            return result
+            reasoning += _confluence_text(conf_list, counter_list)
+            return _setup_found(result, "high_volume_distribution", "SHORT", entry, sl, tp, reasoning)
 
     # --- SHORT Setup 10: Multi-Timeframe Bearish Alignment ---
     # All timeframes pointing down simultaneously — bear market momentum confirmation.
@@ -2028,10 +1922,9 @@ def detect_setup(
         rsi_15m_bear = rsi_15m < 48
         rsi_4h_bear = rsi_4h is not None and rsi_4h < 48
         daily_bear_mta = daily_bullish is False
-        below_ema50_mta = not tf_15m.get("above_ema50")
-        below_vwap_mta = tf_15m.get("above_vwap") is False
-        ha_bear_mta = tf_15m.get("ha_bullish") is False
-        ha_streak_mta = tf_15m.get("ha_streak")
+        below_ema50_mta = not above_ema50
+        below_vwap_mta = above_vwap is False
+        ha_bear_mta = ha_bullish is False
         # Score local factors (always available): rsi_15m, daily, ema50, vwap
         local_score = sum([rsi_15m_bear, daily_bear_mta, below_ema50_mta, below_vwap_mta])
         alignment_score = local_score + (1 if rsi_4h_bear else 0)
@@ -2041,8 +1934,7 @@ def detect_setup(
 
         if strong_alignment:
             entry = price
-            sl = entry + DEFAULT_SL_DISTANCE
-            tp = entry - DEFAULT_TP_DISTANCE
+            sl, tp = _default_bracket(entry, "SHORT")
             align_parts = []
             if rsi_15m_bear:
                 align_parts.append(f"15M RSI {rsi_15m:.1f}")
@@ -2058,23 +1950,11 @@ def detect_setup(
             total_factors = 5 if rsi_4h is not None else 4
             reasoning = (
                 f"SHORT: Multi-TF bearish alignment ({alignment_score}/{total_factors} factors). "
-                f"HA streak {ha_streak_mta}. "
+                f"HA streak {ha_streak}. "
                 f"Aligned: {', '.join(align_parts)}."
             )
-            if conf_list:
-                reasoning += f" Confluence: {', '.join(conf_list)}."
-            if counter_list:
-                reasoning += f" Caution: {', '.join(counter_list)}."
-            result.update({
-                "found": True,
-                "type": "multi_tf_bearish",
-                "direction": "SHORT",
-                "entry": round(entry, 1),
-                "sl": round(sl, 1),
-                "tp": round(tp, 1),
-                "reasoning": reasoning,
-            })
-            return result
+            reasoning += _confluence_text(conf_list, counter_list)
+            return _setup_found(result, "multi_tf_bearish", "SHORT", entry, sl, tp, reasoning)
 
     # --- SHORT Setup 11: EMA200 Rejection (major support → resistance) ---
     # Price rallies up to EMA200 from below and gets rejected — turn of tide signal.
@@ -2084,92 +1964,58 @@ def detect_setup(
         near_ema200 = abs(price - ema200_15m) <= 200
         rsi_ok_e200 = 50 <= rsi_15m <= 70
         approaching_from_below = price < ema200_15m and tf_15m.get("prev_close", price) <= ema200_15m
-        candle_open_e200 = tf_15m.get("open")
-        candle_high_e200 = tf_15m.get("high")
-        wick_e200 = (candle_high_e200 - max(candle_open_e200, price)) if (candle_open_e200 and candle_high_e200) else 0
-        ha_bear_e200 = tf_15m.get("ha_bullish") is False
-        fvg_bear_e200 = tf_15m.get("fvg_bearish", False)
-        rejection_e200 = wick_e200 >= 15 or ha_bear_e200 or fvg_bear_e200
+        wick_e200 = (candle_high - max(candle_open, price)) if (candle_open and candle_high) else 0
+        ha_bear_e200 = ha_bullish is False
+        rejection_e200 = wick_e200 >= 15 or ha_bear_e200 or fvg_bearish
 
         if near_ema200 and rsi_ok_e200 and approaching_from_below and rejection_e200 and daily_bullish is False:
             entry = price
-            sl = entry + DEFAULT_SL_DISTANCE
-            tp = entry - DEFAULT_TP_DISTANCE
+            sl, tp = _default_bracket(entry, "SHORT")
             conf_list, counter_list = _build_confluence(tf_15m, "SHORT", pivots=pivots)
             confirm_parts_e200 = []
             if wick_e200 >= 15:
                 confirm_parts_e200.append(f"wick {wick_e200:.0f}pts")
             if ha_bear_e200:
                 confirm_parts_e200.append("HA bearish")
-            if fvg_bear_e200:
+            if fvg_bearish:
                 confirm_parts_e200.append("bearish FVG")
             reasoning = (
                 f"SHORT: EMA200 rejection on 15M ({ema200_15m:.0f}). "
                 f"Price {abs(price - ema200_15m):.0f}pts from EMA200 (approached from below). "
                 f"RSI {rsi_15m:.1f}. Rejection: {', '.join(confirm_parts_e200)}. {short_daily_str}."
             )
-            if conf_list:
-                reasoning += f" Confluence: {', '.join(conf_list)}."
-            if counter_list:
-                reasoning += f" Caution: {', '.join(counter_list)}."
-            result.update({
-                "found": True,
-                "type": "ema200_rejection",
-                "direction": "SHORT",
-                "entry": round(entry, 1),
-                "sl": round(sl, 1),
-                "tp": round(tp, 1),
-                "reasoning": reasoning,
-            })
-            return result
+            reasoning += _confluence_text(conf_list, counter_list)
+            return _setup_found(result, "ema200_rejection", "SHORT", entry, sl, tp, reasoning)
 
     # --- SHORT Setup 12: Lower Lows Bearish Momentum ---
     # Swing deterioration: new swing_low_20 < previous swing_low.
     # Combined with bearish momentum (HA streak, RSI) → trend confirmation.
-    swing_low_20_curr = tf_15m.get("swing_low_20")
-    swing_low_20_prev = tf_15m.get("swing_low_20_prev")  # will check if available
-    if not _skip_short and swing_low_20_curr and rsi_15m:
+    if not _skip_short and swing_low_20 and rsi_15m:
         # If no prev available, compare to current low vs 20-bar low trend
-        prev_swing_low = tf_15m.get("swing_low_20_prev")
-        is_lower_low = prev_swing_low is not None and swing_low_20_curr < prev_swing_low
-        if not is_lower_low and len(tf_15m.get("lows", [])) >= 20:
+        is_lower_low = swing_low_20_prev is not None and swing_low_20 < swing_low_20_prev
+        if not is_lower_low and len(lows_15m) >= 20:
             # Fallback: check if current is at least 50pts below BB mid (deep pullback)
-            lows_recent = tf_15m.get("lows", [])[-20:]
+            lows_recent = lows_15m[-20:]
             if lows_recent:
                 is_lower_low = min(lows_recent[-5:]) < min(lows_recent[-20:-10])
 
         rsi_ok_ll = 20 <= rsi_15m <= 50
-        ha_streak_ll = tf_15m.get("ha_streak")
-        ha_bearish_ll = ha_streak_ll is not None and ha_streak_ll <= -2
-        below_ema50_ll = not tf_15m.get("above_ema50")
-        vol_signal_ll = tf_15m.get("volume_signal", "NORMAL")
-        vol_ok_ll = vol_signal_ll != "LOW"
+        ha_bearish_ll = ha_streak is not None and ha_streak <= -2
+        below_ema50_ll = not above_ema50
+        vol_ok_ll = vol_signal != "LOW"
 
         if is_lower_low and rsi_ok_ll and ha_bearish_ll and below_ema50_ll and vol_ok_ll:
             entry = price
-            sl = entry + DEFAULT_SL_DISTANCE
-            tp = entry - DEFAULT_TP_DISTANCE
+            sl, tp = _default_bracket(entry, "SHORT")
             conf_list, counter_list = _build_confluence(tf_15m, "SHORT", pivots=pivots)
             reasoning = (
                 f"SHORT: Lower lows bearish momentum on 15M. "
-                f"Swing deterioration: new low {swing_low_20_curr:.0f}. "
-                f"RSI {rsi_15m:.1f}, HA streak {ha_streak_ll}, vol={vol_signal_ll}. "
+                f"Swing deterioration: new low {swing_low_20:.0f}. "
+                f"RSI {rsi_15m:.1f}, HA streak {ha_streak}, vol={vol_signal}. "
                 f"Below EMA50. {short_daily_str}."
             )
-            if conf_list:
-                reasoning += f" Confluence: {', '.join(conf_list)}."
-            if counter_list:
-                reasoning += f" Caution: {', '.join(counter_list)}."
-            result.update({
-                "found": True,
-                "type": "lower_lows_bearish",
-                "direction": "SHORT",
-                "entry": round(entry, 1),
-                "sl": round(sl, 1),
-                "tp": round(tp, 1),
-                "reasoning": reasoning,
-            })
-            return result
+            reasoning += _confluence_text(conf_list, counter_list)
+            return _setup_found(result, "lower_lows_bearish", "SHORT", entry, sl, tp, reasoning)
 
     # --- SHORT Setup 13: Pivot Point Resistance Rejection ---
     # Price tests Pivot Resistance (R1) and gets rejected with bearish confirmation.
@@ -2179,18 +2025,14 @@ def detect_setup(
         if pivot_r1:
             near_r1 = abs(price - pivot_r1) <= 150
             rsi_ok_pr = 55 <= rsi_15m <= 75
-            candle_open_pr = tf_15m.get("open")
-            candle_high_pr = tf_15m.get("high")
-            wick_pr = (candle_high_pr - max(candle_open_pr, price)) if (candle_open_pr and candle_high_pr) else 0
-            ha_bear_pr = tf_15m.get("ha_bullish") is False
-            cp_dir_pr = tf_15m.get("candlestick_direction")
-            bearish_candle_pr = cp_dir_pr == "bearish"
+            wick_pr = (candle_high - max(candle_open, price)) if (candle_open and candle_high) else 0
+            ha_bear_pr = ha_bullish is False
+            bearish_candle_pr = cp_direction == "bearish"
             rejection_pr = wick_pr >= 15 or ha_bear_pr or bearish_candle_pr
 
             if near_r1 and rsi_ok_pr and rejection_pr and daily_bullish is False:
                 entry = price
-                sl = entry + DEFAULT_SL_DISTANCE
-                tp = entry - DEFAULT_TP_DISTANCE
+                sl, tp = _default_bracket(entry, "SHORT")
                 conf_list, counter_list = _build_confluence(tf_15m, "SHORT", pivots=pivots)
                 confirm_parts_pr = []
                 if wick_pr >= 15:
@@ -2204,20 +2046,8 @@ def detect_setup(
                     f"Price {abs(price - pivot_r1):.0f}pts from R1 (institutional resistance). "
                     f"RSI {rsi_15m:.1f}. Rejection: {', '.join(confirm_parts_pr)}. {short_daily_str}."
                 )
-                if conf_list:
-                    reasoning += f" Confluence: {', '.join(conf_list)}."
-                if counter_list:
-                    reasoning += f" Caution: {', '.join(counter_list)}."
-                result.update({
-                    "found": True,
-                    "type": "pivot_r1_rejection",
-                    "direction": "SHORT",
-                    "entry": round(entry, 1),
-                    "sl": round(sl, 1),
-                    "tp": round(tp, 1),
-                    "reasoning": reasoning,
-                })
-                return result
+                reasoning += _confluence_text(conf_list, counter_list)
+                return _setup_found(result, "pivot_r1_rejection", "SHORT", entry, sl, tp, reasoning)
 
     # ============================================================
     # MOMENTUM / TREND-FOLLOWING SHORT SETUPS
@@ -2228,21 +2058,18 @@ def detect_setup(
     # Mirror of ema9_pullback_long. Price bounced to EMA9 in a confirmed downtrend — shallow dead-cat rejection.
     # Entry requires HA bearish OR a bearish sweep (price spiked above EMA9, closed back below).
     # Placed BEFORE momentum_continuation_short so near-EMA9 bounces are captured with tight entry.
-    below_ema50_s = not tf_15m.get("above_ema50")
-    ha_streak_s = tf_15m.get("ha_streak")
-    vol_signal_s = tf_15m.get("volume_signal", "NORMAL")
+    below_ema50_s = not above_ema50
 
     if "ema9_pullback_short" not in DISABLED_SETUP_TYPES and not _skip_short and ema9_15m and rsi_15m and ema50_15m and below_ema50_s:
         near_ema9_s = abs(price - ema9_15m) <= EMA9_PROXIMITY_PTS
         ema9_below_ema50_s = ema9_15m < ema50_15m  # EMA9 < EMA50 confirms downtrend alignment
         rsi_ok_e9s = 35 <= rsi_15m <= 60  # bearish momentum: wide enough to catch pullback RSI
-        swept_high_e9s = tf_15m.get("swept_high", False)  # price spiked above EMA9, closed back below
+        swept_high_e9s = swept_high  # price spiked above EMA9, closed back below
         ha_ok_e9s = (ha_bullish is False) or swept_high_e9s  # HA must be bearish OR sweep confirmed
 
         if near_ema9_s and ema9_below_ema50_s and rsi_ok_e9s and ha_ok_e9s:
             entry = price
-            sl = entry + DEFAULT_SL_DISTANCE
-            tp = entry - DEFAULT_TP_DISTANCE
+            sl, tp = _default_bracket(entry, "SHORT")
             conf_list, counter_list = _build_confluence(tf_15m, "SHORT", pivots=pivots)
             reasoning = (
                 f"SHORT: EMA9 pullback on 15M. "
@@ -2250,60 +2077,33 @@ def detect_setup(
                 f"RSI {rsi_15m:.1f}. {'Bearish sweep rejection' if swept_high_e9s else 'HA bearish'}. "
                 f"Below EMA50. {short_daily_str}."
             )
-            if conf_list:
-                reasoning += f" Confluence: {', '.join(conf_list)}."
-            if counter_list:
-                reasoning += f" Caution: {', '.join(counter_list)}."
-            result.update({
-                "found": True,
-                "type": "ema9_pullback_short",
-                "direction": "SHORT",
-                "entry": round(entry, 1),
-                "sl": round(sl, 1),
-                "tp": round(tp, 1),
-                "reasoning": reasoning,
-            })
-            return result
+            reasoning += _confluence_text(conf_list, counter_list)
+            return _setup_found(result, "ema9_pullback_short", "SHORT", entry, sl, tp, reasoning)
 
     # --- SHORT Momentum: Momentum Continuation Short ---
     # Broadest catch-all for trending SHORT markets. Below EMA50 + below VWAP + HA bearish streak.
-    below_ema50_s = not tf_15m.get("above_ema50")
-    below_vwap_s = tf_15m.get("above_vwap") is False
-    ha_bearish_s = tf_15m.get("ha_bullish") is False
-    ha_streak_s = tf_15m.get("ha_streak")
-    vol_signal_s = tf_15m.get("volume_signal", "NORMAL")
+    below_ema50_s = not above_ema50
+    below_vwap_s = above_vwap is False
+    ha_bearish_s = ha_bullish is False
 
     if "momentum_continuation_short" not in DISABLED_SETUP_TYPES and not _skip_short and ema50_15m and rsi_15m and below_ema50_s:
         rsi_ok_mom_s = 30 <= rsi_15m <= 55
-        ha_streak_ok_s = ha_streak_s is not None and ha_streak_s <= -MOMENTUM_HA_STREAK_MIN
+        ha_streak_ok_s = ha_streak is not None and ha_streak <= -MOMENTUM_HA_STREAK_MIN
         # Volume: IG CFD volume unreliable. Lenient when HA streak confirms strong trend (<=−4).
-        vol_ok_mom_s = vol_signal_s != "LOW" or (ha_streak_s is not None and ha_streak_s <= -4)
+        vol_ok_mom_s = vol_signal != "LOW" or (ha_streak is not None and ha_streak <= -4)
 
         if rsi_ok_mom_s and below_vwap_s and ha_streak_ok_s and vol_ok_mom_s:
             entry = price
-            sl = entry + DEFAULT_SL_DISTANCE
-            tp = entry - DEFAULT_TP_DISTANCE
+            sl, tp = _default_bracket(entry, "SHORT")
             conf_list, counter_list = _build_confluence(tf_15m, "SHORT", pivots=pivots)
             reasoning = (
                 f"SHORT: Momentum continuation on 15M. "
-                f"RSI {rsi_15m:.1f}, HA streak {ha_streak_s}, below VWAP+EMA50. "
-                f"Vol={vol_signal_s}. {short_daily_str}. "
+                f"RSI {rsi_15m:.1f}, HA streak {ha_streak}, below VWAP+EMA50. "
+                f"Vol={vol_signal}. {short_daily_str}. "
                 f"Trend-following — RSI 30-55 is healthy bearish, not oversold."
             )
-            if conf_list:
-                reasoning += f" Confluence: {', '.join(conf_list)}."
-            if counter_list:
-                reasoning += f" Caution: {', '.join(counter_list)}."
-            result.update({
-                "found": True,
-                "type": "momentum_continuation_short",
-                "direction": "SHORT",
-                "entry": round(entry, 1),
-                "sl": round(sl, 1),
-                "tp": round(tp, 1),
-                "reasoning": reasoning,
-            })
-            return result
+            reasoning += _confluence_text(conf_list, counter_list)
+            return _setup_found(result, "momentum_continuation_short", "SHORT", entry, sl, tp, reasoning)
 
     # --- SHORT Momentum: VWAP Rejection Short ---
     # Price rallied to VWAP from below in a downtrend and got rejected.
@@ -2311,17 +2111,13 @@ def detect_setup(
         near_vwap_s = abs(price - vwap_15m) <= VWAP_PROXIMITY_PTS
         rsi_ok_vwap_s = 35 <= rsi_15m <= 60
         # Rejection confirmation: HA bearish/turning, or bearish candle pattern, or upper wick
-        candle_open_vs = tf_15m.get("open")
-        candle_high_vs = tf_15m.get("high")
-        upper_wick_vs = (candle_high_vs - max(candle_open_vs, price)) if (candle_open_vs is not None and candle_high_vs is not None) else 0
-        candle_patterns_vs = tf_15m.get("candlestick_patterns", [])
-        bearish_pattern_vs = any(p.get("direction") == "bearish" for p in candle_patterns_vs) if candle_patterns_vs else False
+        upper_wick_vs = (candle_high - max(candle_open, price)) if (candle_open is not None and candle_high is not None) else 0
+        bearish_pattern_vs = any(p.get("direction") == "bearish" for p in candle_patterns) if candle_patterns else False
         reject_confirm_vs = ha_bearish_s or upper_wick_vs >= 15 or bearish_pattern_vs
 
         if near_vwap_s and rsi_ok_vwap_s and reject_confirm_vs:
             entry = price
-            sl = entry + DEFAULT_SL_DISTANCE
-            tp = entry - DEFAULT_TP_DISTANCE
+            sl, tp = _default_bracket(entry, "SHORT")
             conf_list, counter_list = _build_confluence(tf_15m, "SHORT", pivots=pivots)
             confirm_str_vs = []
             if ha_bearish_s:
@@ -2336,20 +2132,8 @@ def detect_setup(
                 f"RSI {rsi_15m:.1f}. Rejection: {', '.join(confirm_str_vs)}. "
                 f"Below EMA50. {short_daily_str}."
             )
-            if conf_list:
-                reasoning += f" Confluence: {', '.join(conf_list)}."
-            if counter_list:
-                reasoning += f" Caution: {', '.join(counter_list)}."
-            result.update({
-                "found": True,
-                "type": "vwap_rejection_short_momentum",
-                "direction": "SHORT",
-                "entry": round(entry, 1),
-                "sl": round(sl, 1),
-                "tp": round(tp, 1),
-                "reasoning": reasoning,
-            })
-            return result
+            reasoning += _confluence_text(conf_list, counter_list)
+            return _setup_found(result, "vwap_rejection_short_momentum", "SHORT", entry, sl, tp, reasoning)
 
     # ============================================================
     # SESSION-SPECIFIC SETUPS (require session context: gap_pts, asia range)
@@ -2367,30 +2151,20 @@ def detect_setup(
             if 0 <= _now_utc.hour < 2:
                 if not _skip_long and gap_pts_sc < -100 and 30 <= rsi_15m <= 62:
                     entry = price
-                    sl = round(entry - DEFAULT_SL_DISTANCE, 1)
-                    tp = round(entry + DEFAULT_TP_DISTANCE, 1)
-                    result.update({
-                        "found": True, "type": "tokyo_gap_fill", "direction": "LONG",
-                        "entry": entry, "sl": sl, "tp": tp,
-                        "reasoning": (
-                            f"LONG: Tokyo gap fill. {gap_pts_sc:.0f}pt gap down from prev close. "
-                            f"RSI {rsi_15m:.1f}. Price expected to retrace toward yesterday's close. {daily_str}."
-                        ),
-                    })
-                    return result
+                    sl, tp = _default_bracket(entry, "LONG")
+                    reasoning = (
+                        f"LONG: Tokyo gap fill. {gap_pts_sc:.0f}pt gap down from prev close. "
+                        f"RSI {rsi_15m:.1f}. Price expected to retrace toward yesterday's close. {daily_str}."
+                    )
+                    return _setup_found(result, "tokyo_gap_fill", "LONG", entry, sl, tp, reasoning)
                 elif not _skip_short and gap_pts_sc > 100 and 42 <= rsi_15m <= 70:
                     entry = price
-                    sl = round(entry + DEFAULT_SL_DISTANCE, 1)
-                    tp = round(entry - DEFAULT_TP_DISTANCE, 1)
-                    result.update({
-                        "found": True, "type": "tokyo_gap_fill", "direction": "SHORT",
-                        "entry": entry, "sl": sl, "tp": tp,
-                        "reasoning": (
-                            f"SHORT: Tokyo gap fill. +{gap_pts_sc:.0f}pt gap up from prev close. "
-                            f"RSI {rsi_15m:.1f}. Price expected to retrace toward yesterday's close. {daily_str}."
-                        ),
-                    })
-                    return result
+                    sl, tp = _default_bracket(entry, "SHORT")
+                    reasoning = (
+                        f"SHORT: Tokyo gap fill. +{gap_pts_sc:.0f}pt gap up from prev close. "
+                        f"RSI {rsi_15m:.1f}. Price expected to retrace toward yesterday's close. {daily_str}."
+                    )
+                    return _setup_found(result, "tokyo_gap_fill", "SHORT", entry, sl, tp, reasoning)
 
         # --- London Opening Range Breakout (ORB) ---
         # Uses Tokyo/Asia session range (00:00–05:59 UTC) as the pre-open reference.
@@ -2399,7 +2173,7 @@ def detect_setup(
             if 8 <= _now_utc.hour < 10:
                 asia_range_sc = asia_high_sc - asia_low_sc
                 if asia_range_sc >= 50:
-                    vol_ok_orb = tf_15m.get("volume_signal") != "LOW"
+                    vol_ok_orb = vol_signal_raw != "LOW"
                     conf_list_orb, counter_list_orb = _build_confluence(tf_15m, "LONG", pivots=pivots)
                     if not _skip_long and price > asia_high_sc and 45 <= rsi_15m <= 72 and vol_ok_orb:
                         entry = price
@@ -2412,12 +2186,7 @@ def detect_setup(
                         )
                         if conf_list_orb:
                             reasoning += f" Confluence: {', '.join(conf_list_orb)}."
-                        result.update({
-                            "found": True, "type": "london_orb", "direction": "LONG",
-                            "entry": round(entry, 1), "sl": sl, "tp": tp,
-                            "reasoning": reasoning,
-                        })
-                        return result
+                        return _setup_found(result, "london_orb", "LONG", entry, sl, tp, reasoning)
                     elif not _skip_short and price < asia_low_sc and 32 <= rsi_15m <= 58 and vol_ok_orb:
                         entry = price
                         sl = round(asia_high_sc)
@@ -2430,12 +2199,7 @@ def detect_setup(
                         )
                         if conf_list_orb_s:
                             reasoning += f" Confluence: {', '.join(conf_list_orb_s)}."
-                        result.update({
-                            "found": True, "type": "london_orb", "direction": "SHORT",
-                            "entry": round(entry, 1), "sl": sl, "tp": tp,
-                            "reasoning": reasoning,
-                        })
-                        return result
+                        return _setup_found(result, "london_orb", "SHORT", entry, sl, tp, reasoning)
 
     diag_parts = []
     if bb_mid is not None:
@@ -2443,19 +2207,15 @@ def detect_setup(
         diag_parts.append(f"BB_mid={mid_dist:.0f}pts({'OK' if mid_dist <= 150 else 'FAR'})")
     if rsi_15m is not None:
         diag_parts.append(f"RSI={rsi_15m:.1f}({'OK' if 30 <= rsi_15m <= RSI_ENTRY_HIGH_BOUNCE else 'OUT'})")
-    prev_close = tf_15m.get("prev_close")
     if prev_close is not None:
         diag_parts.append(f"bounce={'OK' if price > prev_close else 'NO'}")
     daily_str = "bullish" if daily_bullish else ("bearish" if daily_bullish is not None else "N/A")
     # Momentum diagnostic — shows why momentum setups didn't fire
     mom_flags = []
-    _ae50 = tf_15m.get("above_ema50")
-    _avw = tf_15m.get("above_vwap")
-    _hs = tf_15m.get("ha_streak")
     _vs = tf_15m.get("volume_signal", "?")
-    mom_flags.append(f"EMA50={'above' if _ae50 else 'below'}")
-    mom_flags.append(f"VWAP={'above' if _avw else 'below'}")
-    mom_flags.append(f"HA={_hs}")
+    mom_flags.append(f"EMA50={'above' if above_ema50 else 'below'}")
+    mom_flags.append(f"VWAP={'above' if above_vwap else 'below'}")
+    mom_flags.append(f"HA={ha_streak}")
     mom_flags.append(f"vol={_vs}")
     diag = " | ".join(diag_parts)
     result["reasoning"] = f"No setup. {diag} | Daily={daily_str} | Mom: {' '.join(mom_flags)}"
@@ -2466,24 +2226,51 @@ def detect_setup(
 # HELPER FUNCTIONS
 # ============================================
 
-def _std_dev(values: list[float]) -> float:
-    """Population standard deviation."""
-    n = len(values)
-    if n < 2:
-        return 0.0
-    mean = sum(values) / n
-    variance = sum((x - mean) ** 2 for x in values) / n
-    return math.sqrt(variance)
+def _high_low(highs: list[float], lows: list[float], start: int, stop: int) -> tuple[float, float]:
+    """Max of highs[start:stop] and min of lows[start:stop] in a single pass."""
+    hi = highs[start]
+    lo = lows[start]
+    for i in range(start + 1, stop):
+        if highs[i] > hi:
+            hi = highs[i]
+        if lows[i] < lo:
+            lo = lows[i]
+    return hi, lo
+
+
+# Output precision for analyze_timeframe() fields. Internal comparisons use full
+# precision; rounding happens once, on the way out.
+_OUTPUT_DECIMALS = {
+    "bollinger_upper": 2, "bollinger_mid": 2, "bollinger_lower": 2,
+    "ema9": 2, "ema50": 2, "ema200": 2, "rsi": 2, "vwap": 2,
+    "volume_ratio": 2,
+    "pivot_high": 1, "dist_to_pivot_high": 1, "pivot_low": 1, "dist_to_pivot_low": 1,
+    "fvg_level": 1, "pullback_depth": 1, "avg_candle_range": 1, "bb_width": 1, "atr": 1,
+}
+
+
+def _round_for_output(result: dict) -> dict:
+    """Round analyze_timeframe() fields to their display precision, in place."""
+    for key, ndigits in _OUTPUT_DECIMALS.items():
+        val = result.get(key)
+        if val is not None:
+            result[key] = round(val, ndigits)
+    if result.get("fibonacci"):
+        result["fibonacci"] = {name: round(level, 1) for name, level in result["fibonacci"].items()}
+    return result
 
 
-def _last(lst: list) -> Optional[float]:
-    """Get last non-None value from a list."""
-    if not lst:
+def _latest(lst: list) -> Optional[float]:
+    """
+    Last value of an indicator series, or None if it is empty or a NaN/None
+    placeholder. Series here only carry placeholders in their warm-up prefix
+    and come back empty when history is too short, so checking the final
+    element is enough — no reverse scan.
+    """
+    val = lst[-1] if lst else None
+    if val is None or val != val:  # val != val only for NaN
         return None
-    for val in reversed(lst):
-        if val is not None:
-            return round(val, 2)
-    return None
+    return val
 
 
 def compute_atr(candles: list[dict], period: int = 14) -> float:
@@ -2498,16 +2285,17 @@ def compute_atr(candles: list[dict], period: int = 14) -> float:
     """
     if len(candles) < period + 1:
         return 0.0
+    # Only the last `period` valid True Ranges are averaged: walk back from the
+    # newest candle and stop once that many are collected.
     trs = []
-    for i in range(1, len(candles)):
+    for i in range(len(candles) - 1, 0, -1):
         h = candles[i].get("high", 0)
         l = candles[i].get("low", 0)
         pc = candles[i - 1].get("close", 0)
         if h == 0 or l == 0 or pc == 0:
             continue
-        tr = max(h - l, abs(h - pc), abs(l - pc))
-        trs.append(tr)
-    if len(trs) < period:
-        return 0.0
-    return sum(trs[-period:]) / period
+        trs.append(max(h - l, abs(h - pc), abs(l - pc)))
+        if len(trs) == period:
+            return sum(reversed(trs)) / period  # oldest-first, as before
+    return 0.0
 
@@ -30,6 +30,9 @@ TIER_MILD = "mild"
 TIER_MODERATE = "moderate"
 TIER_SEVERE = "severe"
 
+# Profit milestones (pts) announced once each per position
+MILESTONES = (150, 200, 250, 300, 400, 500)
+
 
 class MomentumTracker:
     """
@@ -46,22 +49,24 @@ class MomentumTracker:
         """
         self.direction = direction.upper()
         self.entry_price = entry_price
-        self._prices: deque = deque(maxlen=300)  # [{price, timestamp}]
+        # Parallel ring buffers (price floats + epoch-second timestamps) —
+        # O(1) append/evict, no per-reading dict or string formatting
+        self._prices: deque = deque(maxlen=300)
+        self._timestamps: deque = deque(maxlen=300)
         self._last_alerted_tier = TIER_NONE
         self._last_alert_time: float = 0.0  # epoch seconds
+        self._milestones_hit = 0  # bit i set once MILESTONES[i] has been announced
 
     def add_price(self, price: float):
         """Record a new price reading."""
-        self._prices.append({
-            "price": price,
-            "timestamp": datetime.now().isoformat(),
-        })
+        self._prices.append(price)
+        self._timestamps.append(time.time())
 
     def current_pnl_points(self) -> float:
         """P&L in points from the last recorded price."""
         if not self._prices:
             return 0.0
-        current = self._prices[-1]["price"]
+        current = self._prices[-1]
         if self.direction == "LONG":
             return current - self.entry_price
         else:
@@ -78,8 +83,8 @@ class MomentumTracker:
             return 0.0
 
         lookback = min(ADVERSE_LOOKBACK_READINGS, len(self._prices))
-        reference = self._prices[-lookback]["price"]
-        current = self._prices[-1]["price"]
+        reference = self._prices[-lookback]
+        current = self._prices[-1]
 
         if self.direction == "LONG":
             # Adverse for long = price dropping
@@ -117,7 +122,7 @@ class MomentumTracker:
         current_tier = self.get_adverse_tier()
         move = self.adverse_move_5min()
         pnl = self.current_pnl_points()
-        current = self._prices[-1]["price"] if self._prices else 0
+        current = self._prices[-1] if self._prices else 0
 
         tier_order = [TIER_NONE, TIER_MILD, TIER_MODERATE, TIER_SEVERE]
         current_rank = tier_order.index(current_tier)
@@ -168,8 +173,8 @@ class MomentumTracker:
         """
         if len(self._prices) < STALE_DATA_THRESHOLD:
             return False
-        recent = [p["price"] for p in list(self._prices)[-STALE_DATA_THRESHOLD:]]
-        return len(set(recent)) == 1
+        last = self._prices[-1]
+        return all(self._prices[-i] == last for i in range(2, STALE_DATA_THRESHOLD + 1))
 
     def reset_alert_state(self):
         """Reset alert tier tracking (e.g., after a position phase change)."""
@@ -182,13 +187,14 @@ class MomentumTracker:
         Returns None if no new milestone reached.
         """
         pnl = self.current_pnl_points()
-        milestones = [150, 200, 250, 300, 400, 500]
 
-        for milestone in milestones:
-            key = f"_milestone_{milestone}_alerted"
-            if pnl >= milestone and not getattr(self, key, False):
-                setattr(self, key, True)
-                current = self._prices[-1]["price"] if self._prices else 0
+        for i, milestone in enumerate(MILESTONES):
+            if pnl < milestone:
+                break  # ascending: no higher milestone can be reached either
+            bit = 1 << i
+            if not self._milestones_hit & bit:
+                self._milestones_hit |= bit
+                current = self._prices[-1] if self._prices else 0
                 return (
                     f"MILESTONE: +{milestone} pts\n"
                     f"Position P&L: {pnl:+.0f} pts | Price: {current:.0f}"
@@ -202,10 +208,11 @@ class MomentumTracker:
         return {
             "direction": self.direction,
             "entry": self.entry_price,
-            "current": self._prices[-1]["price"],
+            "current": self._prices[-1],
             "pnl_points": round(self.current_pnl_points(), 1),
             "adverse_5min": round(self.adverse_move_5min(), 1),
             "tier": self.get_adverse_tier(),
             "stale": self.is_stale(),
             "readings": len(self._prices),
+            "last_reading_at": datetime.fromtimestamp(self._timestamps[-1]).isoformat(),
         }
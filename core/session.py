@@ -12,6 +12,7 @@ Weekend: Saturday 21:00 UTC to Sunday 21:00 UTC (IG Japan 225 opens Sunday ~21:0
 """
 import calendar
 import logging
+import re
 from datetime import datetime, timezone, timedelta
 from typing import Optional
 
@@ -33,31 +34,23 @@ GAP_SESSIONS_UTC = {
 
 # High-impact event keywords that always trigger a no-trade on Friday
 FRIDAY_BLOCK_KEYWORDS = ["NFP", "Non-Farm", "CPI", "PPI", "BOJ", "FOMC", "Rate Decision"]
+_FRIDAY_BLOCK_RE = re.compile("|".join(map(re.escape, FRIDAY_BLOCK_KEYWORDS)), re.IGNORECASE)
 
 # Months where month-end rebalancing is strongest (all months, but especially quarter-end)
 MONTHEND_BLACKOUT_DAYS = 2  # Last 2 trading days of month
 
 
 def utcnow() -> datetime:
-    """Current time in UTC (timezone-aware)."""
-    return datetime.now(timezone.utc)
-
-
-def get_current_session() -> dict:
     """
-    Determine the current trading session based on UTC time.
-
-    Returns dict with:
-        name: str (tokyo / london / new_york / gap / off_hours)
-        priority: HIGH / MEDIUM / OFF
-        active: bool  (True if in a major session)
-        description: str
+    Current time in UTC (timezone-aware).
+    The session helpers below accept an optional `now` so a caller making
+    several checks can read the clock once and pass it to each.
     """
-    now = utcnow()
-    hour = now.hour
-    minute = now.minute
-    current_minutes = hour * 60 + minute
+    return datetime.now(timezone.utc)
 
+
+def _session_for_minute(current_minutes: int) -> dict:
+    """Session dict for a UTC minute of the day (0-1439). See get_current_session()."""
     # London/NY overlap (13:30-16:00 UTC) — check before individual sessions
     # because London is matched first in the loop and would mask the overlap.
     london_ny_start = 13 * 60 + 30  # 13:30
@@ -100,13 +93,49 @@ def get_current_session() -> dict:
     }
 
 
+def _minutes_until_next_open(current_minutes: int) -> int:
+    """Minutes from a UTC minute of the day until the next session open."""
+    # Next session opens: Tokyo at 00:00, London at 08:00, NY at 13:30
+    session_opens = [0 * 60, 8 * 60, 13 * 60 + 30]
+
+    for open_min in sorted(session_opens):
+        if open_min > current_minutes:
+            return open_min - current_minutes
+
+    # Past NY open — next is Tokyo tomorrow at 00:00
+    return 24 * 60 - current_minutes
+
+
+# Session and next-open lookups precomputed for every UTC minute of the day,
+# so the per-cycle calls are a single index instead of re-running the branches.
+_MINUTE_TABLE: tuple[dict, ...] = tuple(_session_for_minute(m) for m in range(24 * 60))
+_NEXT_OPEN_SECONDS: tuple[int, ...] = tuple(
+    _minutes_until_next_open(m) * 60 for m in range(24 * 60)
+)
+
 
-def is_weekend() -> bool:
+def get_current_session(now: Optional[datetime] = None) -> dict:
+    """
+    Determine the current trading session based on UTC time.
+
+    Returns dict with:
+        name: str (tokyo / london / new_york / gap / off_hours)
+        priority: HIGH / MEDIUM / OFF
+        active: bool  (True if in a major session)
+        description: str
+    """
+    if now is None:
+        now = utcnow()
+    return dict(_MINUTE_TABLE[now.hour * 60 + now.minute])
+
+
+def is_weekend(now: Optional[datetime] = None) -> bool:
     """
     Returns True if markets are closed for the weekend.
     Japan 225 on IG closes Friday 21:00 UTC and reopens Sunday ~21:00 UTC.
     """
-    now = utcnow()
+    if now is None:
+        now = utcnow()
     weekday = now.weekday()  # 0=Monday, 5=Saturday, 6=Sunday
     current_minutes = now.hour * 60 + now.minute
 
@@ -125,7 +154,9 @@ def is_weekend() -> bool:
     return False
 
 
-def is_friday_blackout(upcoming_events: list = None) -> tuple[bool, str]:
+def is_friday_blackout(
+    upcoming_events: list = None, now: Optional[datetime] = None
+) -> tuple[bool, str]:
     """
     Check if we're in the Friday high-impact blackout window.
 
@@ -135,7 +166,8 @@ def is_friday_blackout(upcoming_events: list = None) -> tuple[bool, str]:
 
     Returns (blocked: bool, reason: str)
     """
-    now = utcnow()
+    if now is None:
+        now = utcnow()
     if now.weekday() != 4:  # Not Friday
         return False, ""
 
@@ -149,28 +181,29 @@ def is_friday_blackout(upcoming_events: list = None) -> tuple[bool, str]:
     # Check calendar for keywords outside default window
     if upcoming_events:
         for event in upcoming_events:
-            name = event.get("name", "").upper()
-            if any(kw.upper() in name for kw in FRIDAY_BLOCK_KEYWORDS):
+            if _FRIDAY_BLOCK_RE.search(event.get("name", "")):
                 return True, f"Friday: {event.get('name', 'high-impact event')} scheduled"
 
     return False, ""
 
 
-def is_month_end_blackout() -> tuple[bool, str]:
+def is_month_end_blackout(now: Optional[datetime] = None) -> tuple[bool, str]:
     """
     Returns True if we're in the month-end rebalancing zone
     (last 2 trading days of the month).
     """
-    now = utcnow()
+    if now is None:
+        now = utcnow()
     last_day = calendar.monthrange(now.year, now.month)[1]
     days_left = last_day - now.day
 
-    # Count trading days remaining (rough: subtract weekends)
-    trading_days_left = 0
-    for i in range(1, days_left + 1):
-        check_date = now.date().replace(day=now.day + i)
-        if check_date.weekday() < 5:  # Not weekend
-            trading_days_left += 1
+    # Count trading days remaining (rough: subtract weekends).
+    # Whole weeks contribute 5 each; only the leftover <7 days need checking.
+    full_weeks, rem = divmod(days_left, 7)
+    weekday = now.weekday()
+    trading_days_left = full_weeks * 5 + sum(
+        1 for k in range(1, rem + 1) if (weekday + k) % 7 < 5
+    )
 
     if trading_days_left <= MONTHEND_BLACKOUT_DAYS:
         return True, f"Month-end rebalancing zone ({trading_days_left} trading days to EOM)"
@@ -178,21 +211,26 @@ def is_month_end_blackout() -> tuple[bool, str]:
     return False, ""
 
 
-def is_no_trade_day(upcoming_events: list = None) -> tuple[bool, str]:
+def is_no_trade_day(
+    upcoming_events: list = None, now: Optional[datetime] = None
+) -> tuple[bool, str]:
     """
     Master check: should we trade at all today?
 
     Returns (blocked: bool, reason: str)
     Checks: weekend, Friday blackout, month-end.
     """
-    if is_weekend():
+    if now is None:
+        now = utcnow()  # read the clock once for all three checks
+
+    if is_weekend(now):
         return True, "Weekend — market closed"
 
-    friday_blocked, friday_reason = is_friday_blackout(upcoming_events)
+    friday_blocked, friday_reason = is_friday_blackout(upcoming_events, now)
     if friday_blocked:
         return True, friday_reason
 
-    monthend_blocked, monthend_reason = is_month_end_blackout()
+    monthend_blocked, monthend_reason = is_month_end_blackout(now)
     if monthend_blocked:
         return True, monthend_reason
 
@@ -211,22 +249,11 @@ def get_scan_interval(session: dict = None) -> int:
     return SCAN_INTERVAL_SECONDS if session["active"] else OFFHOURS_INTERVAL_SECONDS
 
 
-def seconds_until_next_session() -> int:
+def seconds_until_next_session(now: Optional[datetime] = None) -> int:
     """
     How many seconds until the next active trading session opens.
     Used to calculate how long to sleep during off-hours.
     """
-    now = utcnow()
-    current_minutes = now.hour * 60 + now.minute
-
-    # Next session opens: Tokyo at 00:00, London at 08:00, NY at 13:30
-    session_opens = [0 * 60, 8 * 60, 13 * 60 + 30]
-
-    for open_min in sorted(session_opens):
-        if open_min > current_minutes:
-            minutes_to_wait = open_min - current_minutes
-            return minutes_to_wait * 60
-
-    # Past NY open — next is Tokyo tomorrow at 00:00
-    minutes_to_midnight = 24 * 60 - current_minutes
-    return minutes_to_midnight * 60
+    if now is None:
+        now = utcnow()
+    return _NEXT_OPEN_SECONDS[now.hour * 60 + now.minute]
@@ -8,11 +8,13 @@ import hmac
 import os
 import time
 from collections import defaultdict
-from fastapi import FastAPI, Request, HTTPException
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, ORJSONResponse
 from dotenv import load_dotenv
 
+from dashboard.services import file_cache
+
 load_dotenv()
 
 DASHBOARD_TOKEN = os.getenv("DASHBOARD_TOKEN", "")
@@ -23,7 +25,11 @@ _fail_counts: dict[str, list[float]] = defaultdict(list)  # ip -> [timestamps]
 _RATE_WINDOW = 60       # seconds
 _RATE_MAX_FAILS = 10    # max failures per window before blocking
 
-app = FastAPI(title="Japan 225 Dashboard API", docs_url=None, redoc_url=None)
+# ORJSONResponse needs orjson (optional); without it keep FastAPI's stdlib JSONResponse
+app = FastAPI(
+    title="Japan 225 Dashboard API", docs_url=None, redoc_url=None,
+    default_response_class=ORJSONResponse if file_cache.orjson else JSONResponse,
+)
 
 app.add_middleware(
     CORSMiddleware,
@@ -1,6 +1,7 @@
 """
 POST /api/chat               — start Claude chat job (returns job_id immediately)
-GET  /api/chat/status/{id}   — poll job status (cheap, no AI; 4-8 s interval from client)
+GET  /api/chat/status/{id}   — poll job status (cheap, no AI; fallback when streaming fails)
+GET  /api/chat/stream/{id}   — SSE: one `result` event as soon as the job finishes
 GET  /api/chat/history       — load shared chat history (cross-device sync)
 POST /api/chat/history       — save shared chat history
 """
@@ -13,126 +14,200 @@ from datetime import datetime, timezone
 from pathlib import Path
 from time import monotonic
 
-from fastapi import APIRouter, HTTPException
-from pydantic import BaseModel, field_validator
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import StreamingResponse
+
+from dashboard.services import chat_costs, file_cache, http_cache
+from dashboard.services.claude_client import _pick_tier, chat as _claude_chat, send_telegram_message
 
 router = APIRouter()
 
 _HISTORY_PATH = Path(__file__).parent.parent.parent / "storage" / "data" / "chat_history.json"
 
 # ── In-memory job store ────────────────────────────────────────────────────────
-# job_id → {"status": "pending"|"done"|"error", "response": str|None, "created": float}
+# job_id → {"status": "pending"|"done"|"error", "response": str|None, "created": float,
+#           "finished": asyncio.Event (set when status leaves "pending")}
+# Insertion order == creation order and every job has the same TTL, so expired
+# jobs are always at the front: pruning pops from there and stops at the first
+# live one (amortized O(1)). The store is capped at _JOB_MAX entries: at the cap
+# the oldest finished jobs make room; pending ones are never evicted early.
 _jobs: dict[str, dict] = {}
 _JOB_TTL = 600.0  # expire jobs after 10 minutes
+_JOB_MAX = 1024
+
+
+def _prune_jobs() -> bool:
+    """Drop expired jobs, then finished ones if still at the cap. False = no room."""
+    cutoff = monotonic() - _JOB_TTL
+    while _jobs:
+        oldest = next(iter(_jobs))
+        if _jobs[oldest]["created"] > cutoff:
+            break
+        del _jobs[oldest]
+    if len(_jobs) >= _JOB_MAX:
+        finished = [jid for jid, job in _jobs.items() if job["status"] != "pending"]
+        for jid in finished[:len(_jobs) - _JOB_MAX + 1]:
+            del _jobs[jid]
+    return len(_jobs) < _JOB_MAX
 
 
-def _prune_jobs() -> None:
-    now = monotonic()
-    stale = [j for j, v in _jobs.items() if now - v["created"] > _JOB_TTL]
-    for j in stale:
-        _jobs.pop(j, None)
+# Strong references to fire-and-forget tasks: the loop only holds weak ones,
+# so an unreferenced task can be garbage-collected mid-flight.
+_bg_tasks: set[asyncio.Task] = set()
+
+
+def _spawn(coro) -> asyncio.Task:
+    task = asyncio.create_task(coro)
+    _bg_tasks.add(task)
+    task.add_done_callback(_bg_tasks.discard)
+    return task
 
 
 # ── History helpers ────────────────────────────────────────────────────────────
 
+_EMPTY_HISTORY = {"messages": [], "updated_at": ""}
+
+
 def _read_history() -> dict:
+    """Shared chat history (cached until the file changes — do not mutate)."""
+    try:
+        return file_cache.read_json(_HISTORY_PATH)
+    except Exception:
+        return _EMPTY_HISTORY
+
+
+def _history_bytes() -> tuple[bytes, str]:
+    """chat_history.json exactly as stored (no parse/serialize round trip) + its updated_at."""
     try:
-        return json.loads(_HISTORY_PATH.read_text())
+        history, raw = file_cache.read_both(_HISTORY_PATH)
+        return raw, history.get("updated_at", "")
     except Exception:
-        return {"messages": [], "updated_at": ""}
+        return file_cache.dumps(_EMPTY_HISTORY), ""
 
 
-def _write_history(messages: list) -> str:
+def _write_history_now(messages: list) -> str:
     _HISTORY_PATH.parent.mkdir(parents=True, exist_ok=True)
     ts = datetime.now(timezone.utc).isoformat()
-    data = json.dumps({"messages": messages[-40:], "updated_at": ts})
-    tmp = _HISTORY_PATH.with_suffix(".tmp")
-    tmp.write_text(data)
-    tmp.replace(_HISTORY_PATH)  # atomic on Linux
+    history = {"messages": messages[-40:], "updated_at": ts}
+    file_cache.write_atomic(_HISTORY_PATH, history, file_cache.dumps(history))
+    return ts
+
+
+# Single-flight writer: saves that arrive while a write is queued or running only
+# replace the pending payload, so a burst from several tabs becomes one write of
+# the newest history. Every caller gets the updated_at of the write covering it.
+_pending_history: list | None = None
+_history_writer: asyncio.Task | None = None
+
+
+async def _drain_history_writes() -> str:
+    global _pending_history
+    ts = ""
+    while _pending_history is not None:
+        messages, _pending_history = _pending_history, None
+        ts = await asyncio.to_thread(_write_history_now, messages)
     return ts
 
 
+async def _write_history(messages: list) -> str:
+    global _pending_history, _history_writer
+    _pending_history = messages
+    if _history_writer is None or _history_writer.done():
+        _history_writer = asyncio.create_task(_drain_history_writes())
+    # shield: a client disconnecting must not cancel a write other callers share
+    return await asyncio.shield(_history_writer)
+
+
 # ── Chat history (cross-device sync) ──────────────────────────────────────────
 
 @router.get("/api/chat/history")
-async def get_chat_history():
-    return _read_history()
+async def get_chat_history(request: Request):
+    raw, updated_at = await asyncio.to_thread(_history_bytes)
+    return http_cache.json_response(request, raw, tag=updated_at or None)
 
 
-class HistorySaveRequest(BaseModel):
-    messages: list[dict]
+# Chat bodies are parsed straight from the request bytes instead of through a
+# Pydantic model: the only checks needed are a few shape/length ones, and these
+# POSTs fire on every message with up to 40-message histories.
 
+async def _json_body(request: Request) -> dict:
+    try:
+        data = file_cache.loads(await request.body())
+    except ValueError:
+        raise HTTPException(400, "body is not valid JSON")
+    if not isinstance(data, dict):
+        raise HTTPException(422, "body must be a JSON object")
+    return data
 
-@router.post("/api/chat/history")
-async def save_chat_history(body: HistorySaveRequest):
-    ts = _write_history(body.messages)
-    return {"ok": True, "updated_at": ts}
 
+def _dict_list(value, field: str) -> list[dict]:
+    if not isinstance(value, list) or not all(isinstance(m, dict) for m in value):
+        raise HTTPException(422, f"{field} must be a list of objects")
+    return value
 
-_COSTS_PATH = Path(__file__).parent.parent.parent / "storage" / "data" / "chat_costs.json"
+
+@router.post("/api/chat/history")
+async def save_chat_history(request: Request):
+    data = await _json_body(request)
+    # only the last 40 are stored, so only those are checked
+    messages = _dict_list(data.get("messages"), "messages")[-40:]
+    ts = await _write_history(messages)
+    return {"ok": True, "updated_at": ts}
 
 
 @router.get("/api/chat/costs")
-async def get_chat_costs():
+async def get_chat_costs(request: Request):
     """Return estimated chat costs from claude_client._log_chat_cost()."""
+    return http_cache.json_response(request, await asyncio.to_thread(_chat_costs))
+
+
+def _chat_costs() -> bytes:
     try:
-        if not _COSTS_PATH.exists():
-            return {"today_usd": 0.0, "total_usd": 0.0, "note": "estimate", "entries": []}
-        data = json.loads(_COSTS_PATH.read_text())
-        if not isinstance(data, list):
-            data = []
-        today = __import__("datetime").date.today().isoformat()
-        today_entries = [e for e in data if e.get("ts", "").startswith(today)]
-        today_usd  = round(sum(e["cost_usd"] for e in today_entries), 4)
-        total_usd  = round(sum(e["cost_usd"] for e in data), 4)
-        today_tokens = sum(e.get("est_tokens", (e.get("input_chars", 0) + e.get("output_chars", 0)) // 4) for e in today_entries)
-        return {
-            "today_usd": today_usd,
-            "total_usd": total_usd,
-            "today_tokens": today_tokens,
-            "note": "estimate (~±30%)",
-            "entries": today_entries[-20:],
-        }
+        return chat_costs.summary_json()
     except Exception as e:
-        return {"today_usd": 0.0, "total_usd": 0.0, "note": f"error: {e}", "entries": []}
+        return file_cache.dumps({"today_usd": 0.0, "total_usd": 0.0, "note": f"error: {e}", "entries": []})
 
 
 # ── Claude chat (async job system) ────────────────────────────────────────────
 
-class _Attachment(BaseModel):
-    b64: str
-    name: str
-
-class ChatRequest(BaseModel):
-    message: str
-    history: list[dict] = []
-    # Multi-file attachments (new format)
-    attachments: list[_Attachment] = []
-    # Legacy single-file attachment (backward compat)
-    attachment_b64: str | None = None
-    attachment_name: str | None = None
+_IMAGE_EXTS = frozenset({".png", ".jpg", ".jpeg", ".gif", ".webp", ".bmp"})
+_ATTACH_MAX_CHARS = 6000  # text attachments are inlined up to this many chars
 
-    @field_validator("message")
-    @classmethod
-    def message_not_too_long(cls, v):
-        if len(v) > 8000:
-            raise ValueError("message too long (max 8000 chars)")
-        return v.strip()
 
-    @field_validator("history")
-    @classmethod
-    def history_cap(cls, v):
-        return v[-20:]
+def _attachments(data: dict) -> list[tuple[str, str]]:
+    """(b64, name) pairs: multi-file `attachments` (max 5), else the legacy single-file fields."""
+    items = data.get("attachments") or []
+    if not isinstance(items, list):
+        raise HTTPException(422, "attachments must be a list")
+    pairs = []
+    for a in items[:5]:
+        if not (isinstance(a, dict) and isinstance(a.get("b64"), str) and isinstance(a.get("name"), str)):
+            raise HTTPException(422, "each attachment needs string b64 and name")
+        pairs.append((a["b64"], a["name"]))
+    if pairs:
+        return pairs
+    b64, name = data.get("attachment_b64"), data.get("attachment_name")  # legacy (backward compat)
+    if isinstance(b64, str) and isinstance(name, str) and b64 and name:
+        return [(b64, name)]
+    return []
 
 
 @router.post("/api/chat")
-async def chat(body: ChatRequest):
-    """Start a Claude chat job. Returns job_id immediately; client polls /api/chat/status/{id}."""
-    if not body.message.strip():
+async def chat(request: Request):
+    """Start a Claude chat job. Returns job_id immediately; client waits on /api/chat/stream/{id}."""
+    data = await _json_body(request)
+    message = data.get("message")
+    if not isinstance(message, str):
+        raise HTTPException(422, "message must be a string")
+    if len(message) > 8000:
+        raise HTTPException(422, "message too long (max 8000 chars)")
+    message = message.strip()
+    if not message:
         raise HTTPException(400, "message is empty")
+    history = _dict_list(data.get("history", []), "history")[-20:]
+    raw_attachments = _attachments(data)
 
-    from dashboard.services.claude_client import _pick_tier
-    model, effort, timeout = _pick_tier(body.message)
+    model, effort, timeout = _pick_tier(message)
     # Derive a short tier label for the frontend
     if "haiku" in model:
         tier = "haiku"
@@ -141,71 +216,70 @@ async def chat(body: ChatRequest):
     else:
         tier = "sonnet"
 
-    _prune_jobs()
+    if not _prune_jobs():
+        raise HTTPException(503, "too many chat jobs in progress, retry shortly",
+                            headers={"Retry-After": "30"})
     job_id = str(uuid.uuid4())
-    _jobs[job_id] = {"status": "pending", "response": None, "created": monotonic(), "tier": tier}
+    job = {
+        "status": "pending", "response": None, "created": monotonic(), "tier": tier,
+        "finished": asyncio.Event(),
+    }
+    _jobs[job_id] = job
 
-    # Resolve attachments before spawning task (save to temp files)
-    _IMAGE_EXTS = {".png", ".jpg", ".jpeg", ".gif", ".webp", ".bmp"}
-    attachment_paths: list[tuple[str, str, str]] = []  # (path, suffix, name)
-
-    # Build unified list: prefer new `attachments` array, fallback to legacy single
-    raw_attachments: list[tuple[str, str]] = []  # (b64, name)
-    if body.attachments:
-        raw_attachments = [(a.b64, a.name) for a in body.attachments[:5]]
-    elif body.attachment_b64 and body.attachment_name:
-        raw_attachments = [(body.attachment_b64, body.attachment_name)]
+    # Resolve attachments before spawning task. Images go to temp files for the
+    # CLI to open; text files are inlined straight from the decoded bytes.
+    attachment_paths: list[str] = []  # temp files to remove when the job ends
+    parts = [message]
 
     for att_b64, att_name in raw_attachments:
         try:
             raw = base64.b64decode(att_b64)
-            suffix = Path(att_name).suffix.lower() or ".bin"
-            tmp = tempfile.NamedTemporaryFile(
-                prefix="j225_attach_", suffix=suffix, delete=False
-            )
-            tmp.write(raw)
-            tmp.close()
-            attachment_paths.append((tmp.name, suffix, att_name))
         except Exception:
             continue
+        suffix = Path(att_name).suffix.lower() or ".bin"
+        if suffix in _IMAGE_EXTS:
+            try:
+                tmp = tempfile.NamedTemporaryFile(
+                    prefix="j225_attach_", suffix=suffix, delete=False
+                )
+                tmp.write(raw)
+                tmp.close()
+            except Exception:
+                continue
+            attachment_paths.append(tmp.name)
+            parts.append(f"\n[Attached image saved at: {tmp.name} — please read and analyse it]")
+        else:
+            # Only the head is used: decode just enough bytes for the char cap
+            content = raw[:_ATTACH_MAX_CHARS * 4].decode("utf-8", errors="replace")[:_ATTACH_MAX_CHARS]
+            parts.append(f"\n[Attached file: {att_name}]\n```\n{content}\n```")
 
-    effective_message = body.message
-    if attachment_paths:
-        parts = [body.message]
-        for att_path, att_suffix, att_name in attachment_paths:
-            if att_suffix in _IMAGE_EXTS:
-                parts.append(f"\n[Attached image saved at: {att_path} — please read and analyse it]")
-            else:
-                try:
-                    content = Path(att_path).read_text(errors="replace")[:6000]
-                    parts.append(f"\n[Attached file: {att_name}]\n```\n{content}\n```")
-                except Exception:
-                    pass
-        effective_message = "\n".join(parts)
+    effective_message = "\n".join(parts)
 
     async def _run() -> None:
-        from dashboard.services.claude_client import chat as _chat, send_telegram_message
         try:
-            reply = await asyncio.to_thread(_chat, effective_message, body.history)
-            _jobs[job_id].update({"status": "done", "response": reply, "acknowledged": False})
+            reply = await asyncio.to_thread(_claude_chat, effective_message, history)
+            # Updated here on the loop (not in the worker thread); `job` stays valid
+            # even if the entry was pruned from _jobs meanwhile.
+            job.update({"status": "done", "response": reply, "acknowledged": False})
         except Exception as e:
             reply = f"Claude error: {e}"
-            _jobs[job_id].update({"status": "error", "response": reply, "acknowledged": True})
+            job.update({"status": "error", "response": reply, "acknowledged": True})
+        job["finished"].set()  # wake /api/chat/stream waiters
         # Persist assistant reply to chat_history.json so it survives
         # client disconnect / refresh — user will see it when they reconnect.
         try:
-            h = _read_history()
-            msgs = h.get("messages", [])
+            h = await asyncio.to_thread(_read_history)
+            msgs = list(h.get("messages", []))  # copy: h is the shared cached object
             # Append the user message if not already present (client may have saved it)
             if not msgs or msgs[-1].get("content") != effective_message:
                 msgs.append({"role": "user", "content": effective_message})
             msgs.append({"role": "assistant", "content": reply, "tier": tier})
-            _write_history(msgs)
+            await _write_history(msgs)
         except Exception:
             pass  # non-fatal — client can still get response via poll
 
         # Clean up temp attachment files
-        for att_path, _, _ in attachment_paths:
+        for att_path in attachment_paths:
             try:
                 Path(att_path).unlink(missing_ok=True)
             except Exception:
@@ -216,7 +290,7 @@ async def chat(body: ChatRequest):
             await asyncio.sleep(120)  # 2 minutes
             job = _jobs.get(job_id)
             if job and not job.get("acknowledged", True) and job.get("response"):
-                short_q = body.message[:80] + ("..." if len(body.message) > 80 else "")
+                short_q = message[:80] + ("..." if len(message) > 80 else "")
                 tg_text = (
                     f"[Dashboard Chat]\n"
                     f"Q: {short_q}\n\n"
@@ -228,19 +302,60 @@ async def chat(body: ChatRequest):
                 if job_id in _jobs:
                     _jobs[job_id]["acknowledged"] = True
 
-        asyncio.create_task(_telegram_fallback())
+        _spawn(_telegram_fallback())
 
-    asyncio.create_task(_run())
+    _spawn(_run())
     return {"job_id": job_id, "status": "pending", "tier": tier}
 
 
+def _job_result(job: dict) -> dict:
+    """Client-facing job payload; marks a finished job as seen (prevents Telegram fallback)."""
+    if job["status"] in ("done", "error"):
+        job["acknowledged"] = True
+    return {"status": job["status"], "response": job["response"], "tier": job.get("tier", "sonnet")}
+
+
 @router.get("/api/chat/status/{job_id}")
 async def chat_status(job_id: str):
-    """Poll job status. Returns status + response when done. No AI calls — cheap to poll."""
+    """
+    Poll job status. Returns status + response when done. No AI calls — cheap to poll.
+    next_poll_after_ms backs off with job age (0.5 s doubling every 4 s, capped at 8 s):
+    quick replies are picked up fast, long Opus jobs are not hammered.
+    """
     job = _jobs.get(job_id)
     if not job:
         raise HTTPException(404, "job not found or expired")
-    # Mark as acknowledged once client sees the completed response (prevents Telegram fallback)
-    if job["status"] in ("done", "error"):
-        job["acknowledged"] = True
-    return {"status": job["status"], "response": job["response"], "tier": job.get("tier", "sonnet")}
+    age = monotonic() - job["created"]
+    return {**_job_result(job), "next_poll_after_ms": min(8000, 500 * 2 ** min(4, int(age // 4)))}
+
+
+_STREAM_PING_SECS = 15.0
+
+
+@router.get("/api/chat/stream/{job_id}")
+async def chat_stream(job_id: str, request: Request):
+    """
+    Server-Sent Events for one job: keep_alive pings while it runs, then a single
+    `result` event (same payload as /api/chat/status) the moment it finishes.
+    Replaces the 4 s status poll, so replies arrive without poll latency.
+    """
+    job = _jobs.get(job_id)
+    if not job:
+        raise HTTPException(404, "job not found or expired")
+
+    async def _events():
+        deadline = monotonic() + _JOB_TTL
+        while not job["finished"].is_set():
+            if monotonic() > deadline or await request.is_disconnected():
+                return
+            try:
+                await asyncio.wait_for(job["finished"].wait(), _STREAM_PING_SECS)
+            except asyncio.TimeoutError:
+                yield "event: keep_alive\ndata: {}\n\n"
+        yield f"event: result\ndata: {json.dumps(_job_result(job))}\n\n"
+
+    return StreamingResponse(
+        _events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
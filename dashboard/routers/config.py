@@ -3,9 +3,7 @@ GET  /api/config          — current config (defaults + overrides)
 POST /api/config          — update overrides (hot or restart tier)
 """
 from fastapi import APIRouter, HTTPException
-from fastapi.responses import JSONResponse
 from pydantic import BaseModel
-from typing import Any
 
 from dashboard.services import config_manager, db_reader
 
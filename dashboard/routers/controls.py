@@ -4,6 +4,7 @@ POST /api/controls/restart     — sudo systemctl restart japan225-bot
 POST /api/controls/stop        — sudo systemctl stop japan225-bot
 POST /api/apply-fix            — apply unified diff, commit, push
 """
+import asyncio
 import json
 import os
 import signal
@@ -24,12 +25,20 @@ FORCE_OPEN_TRIGGER   = Path(__file__).parent.parent.parent / "storage" / "data"
 POS_CHECK_TRIGGER    = Path(__file__).parent.parent.parent / "storage" / "data" / "pos_check.trigger"
 
 
+# argv built once. close_fds=False lets subprocess take the posix_spawn/vfork
+# fast path instead of closing every descriptor; safe because Python opens all
+# fds non-inheritable (PEP 446), so the child inherits only its stdio pipes.
+_MAIN_PID_ARGV = ("systemctl", "show", "japan225-bot", "-p", "MainPID", "--value")
+_SYSTEMCTL_ARGV = {
+    action: ("sudo", "/bin/systemctl", action, "japan225-bot") for action in ("restart", "stop")
+}
+
+
 def _signal_monitor():
     """Send SIGUSR1 to the monitor process to wake main loop immediately."""
     try:
         r = subprocess.run(
-            ["systemctl", "show", "japan225-bot", "-p", "MainPID", "--value"],
-            capture_output=True, text=True, timeout=5,
+            _MAIN_PID_ARGV, capture_output=True, text=True, timeout=5, close_fds=False,
         )
         pid = int(r.stdout.strip())
         if pid > 0:
@@ -41,8 +50,7 @@ def _signal_monitor():
 def _systemctl(action: str) -> tuple[bool, str]:
     try:
         r = subprocess.run(
-            ["sudo", "/bin/systemctl", action, "japan225-bot"],
-            capture_output=True, text=True, timeout=15,
+            _SYSTEMCTL_ARGV[action], capture_output=True, text=True, timeout=15, close_fds=False,
         )
         return r.returncode == 0, (r.stdout + r.stderr).strip()
     except Exception as e:
@@ -53,7 +61,7 @@ def _systemctl(action: str) -> tuple[bool, str]:
 async def force_scan():
     TRIGGER_PATH.parent.mkdir(parents=True, exist_ok=True)
     TRIGGER_PATH.touch()
-    _signal_monitor()
+    await asyncio.to_thread(_signal_monitor)
     return {"ok": True, "message": "Force scan triggered."}
 
 
@@ -64,7 +72,7 @@ async def pos_check():
         return {"ok": False, "warning": "No open position."}
     POS_CHECK_TRIGGER.parent.mkdir(parents=True, exist_ok=True)
     POS_CHECK_TRIGGER.touch()
-    _signal_monitor()
+    await asyncio.to_thread(_signal_monitor)
     return {"ok": True, "message": "Position check running — result sent to Telegram."}
 
 
@@ -74,7 +82,7 @@ async def clear_cooldown():
     CLEAR_CD_PATH.parent.mkdir(parents=True, exist_ok=True)
     CLEAR_CD_PATH.touch()
     TRIGGER_PATH.touch()   # also force-scan so it takes effect immediately
-    _signal_monitor()
+    await asyncio.to_thread(_signal_monitor)
     return {"ok": True, "message": "Cooldown cleared. Escalating to AI on next scan."}
 
 
@@ -86,7 +94,7 @@ async def restart(force: bool = False):
             "ok": False,
             "warning": f"{len(positions)} position(s) open. Pass force=true to restart anyway.",
         }
-    ok, msg = _systemctl("restart")
+    ok, msg = await asyncio.to_thread(_systemctl, "restart")
     if not ok:
         raise HTTPException(500, f"Restart failed: {msg}")
     return {"ok": True, "message": "Bot restarting…"}
@@ -100,7 +108,7 @@ async def stop():
             "ok": False,
             "warning": f"{len(positions)} position(s) open — stopping would leave them unmonitored. Close first.",
         }
-    ok, msg = _systemctl("stop")
+    ok, msg = await asyncio.to_thread(_systemctl, "stop")
     if not ok:
         raise HTTPException(500, f"Stop failed: {msg}")
     return {"ok": True, "message": "Bot stopped."}
@@ -2,40 +2,20 @@
 GET /api/health  — unauthenticated ping
 GET /api/status  — full bot state for Overview tab
 """
-import json
+import asyncio
 from datetime import datetime, timezone
 from pathlib import Path
-from fastapi import APIRouter
-from fastapi.responses import JSONResponse
+from time import monotonic
+from fastapi import APIRouter, Request
 
-from dashboard.services import db_reader
+from dashboard.services import chat_costs, db_reader, file_cache, http_cache
 
 router = APIRouter()
 
 STATE_PATH = Path(__file__).parent.parent.parent / "storage" / "data" / "bot_state.json"
-CHAT_COSTS_PATH = Path(__file__).parent.parent.parent / "storage" / "data" / "chat_costs.json"
 
 
-def _chat_tokens_today() -> int:
-    """Estimate chat tokens used today from chat_costs.json."""
-    try:
-        if not CHAT_COSTS_PATH.exists():
-            return 0
-        data = json.loads(CHAT_COSTS_PATH.read_text())
-        if not isinstance(data, list):
-            return 0
-        from datetime import date
-        today = date.today().isoformat()
-        total = 0
-        for e in data:
-            if e.get("ts", "").startswith(today):
-                total += e.get("est_tokens", (e.get("input_chars", 0) + e.get("output_chars", 0)) // 4)
-        return total
-    except Exception:
-        return 0
-
-
-def _next_scan_in(state: dict) -> int | None:
+def _next_scan_in(state: dict, now: datetime | None = None) -> int | None:
     """Compute live countdown (seconds) from next_scan_at ISO timestamp."""
     ts = state.get("next_scan_at")
     if not ts:
@@ -44,7 +24,7 @@ def _next_scan_in(state: dict) -> int | None:
         target = datetime.fromisoformat(ts)
         if target.tzinfo is None:
             target = target.replace(tzinfo=timezone.utc)
-        return max(0, int((target - datetime.now(timezone.utc)).total_seconds()))
+        return max(0, int((target - (now or datetime.now(timezone.utc))).total_seconds()))
     except Exception:
         return None
 
@@ -52,11 +32,9 @@ def _next_scan_in(state: dict) -> int | None:
 def _read_state() -> dict:
     """Read the state file written by monitor.py each cycle."""
     try:
-        if STATE_PATH.exists():
-            return json.loads(STATE_PATH.read_text())
-    except Exception:
-        pass
-    return {}
+        return file_cache.read_json(STATE_PATH)
+    except Exception:  # missing (not started yet) or mid-write garbage
+        return {}
 
 
 @router.get("/api/health")
@@ -87,10 +65,46 @@ def _enrich_position(position: dict, state: dict) -> dict:
     return position
 
 
+# DB reads for /api/status are shared by every poll within _DB_TTL seconds (the
+# monitor writes at most every few seconds; a second of staleness is invisible).
+# A miss runs every query in one threadpool call over a single connection, and
+# polls arriving while it runs await the same refresh instead of starting their own.
+_DB_TTL = 1.5
+_db_cache: dict = {"ts": 0.0, "today": None, "data": None}
+_db_refresh: asyncio.Task | None = None
+
+
+async def _read_db(today: str) -> dict:
+    data = await asyncio.to_thread(db_reader.snapshot, today)
+    _db_cache.update(ts=monotonic(), today=today, data=data)
+    return data
+
+
+async def _db_snapshot(today: str) -> dict:
+    """Cached DB reads (shared — copy positions before enriching them)."""
+    global _db_refresh
+    if (_db_cache["data"] is not None and _db_cache["today"] == today
+            and monotonic() - _db_cache["ts"] < _DB_TTL):
+        return _db_cache["data"]
+    if _db_refresh is None or _db_refresh.done():
+        _db_refresh = asyncio.create_task(_read_db(today))
+    return await asyncio.shield(_db_refresh)
+
+
 @router.get("/api/status")
-async def status():
-    state = _read_state()
-    positions = db_reader.get_positions()
+async def status(request: Request):
+    # One clock read per request, shared by every "now"/"today" below
+    now = datetime.now(timezone.utc)
+    local_now = now.astimezone().replace(tzinfo=None)
+    today = local_now.date().isoformat()
+    # File and DB reads run on the threadpool (concurrently) so a slow disk
+    # cannot stall the event loop
+    state, chat_tokens_today, db = await asyncio.gather(
+        asyncio.to_thread(_read_state),
+        asyncio.to_thread(chat_costs.today_tokens, today),
+        _db_snapshot(today),
+    )
+    positions = [dict(p) for p in db["positions"]]
 
     # Enrich each position with live price/pnl
     for pos in positions:
@@ -99,32 +113,31 @@ async def status():
     # Backward compat: first position or None
     position = positions[0] if positions else None
 
-    scans = db_reader.get_recent_scans(50)
-
     # Uptime from state or started_at
     uptime = state.get("uptime", "—")
     if not uptime and state.get("started_at"):
         try:
             started = datetime.fromisoformat(state["started_at"])
-            mins = int((datetime.now() - started).total_seconds() / 60)
+            mins = int((local_now - started).total_seconds() / 60)
             h, m = divmod(mins, 60)
             uptime = f"{h}h {m}m"
         except Exception:
             uptime = "—"
 
-    return {
+    # Returned pre-encoded: skips jsonable_encoder's deep walk of the (mostly scans) payload
+    return http_cache.json_response(request, file_cache.dumps({
         "session":          state.get("session", "—"),
         "phase":            state.get("phase", "SCANNING" if not position else "MONITORING"),
         "scanning_paused":  state.get("scanning_paused", False),
         "last_scan":        state.get("last_scan"),
-        "next_scan_in":     _next_scan_in(state),
+        "next_scan_in":     _next_scan_in(state, now),
         "last_scan_detail": state.get("last_scan_detail"),
-        "ai_calls_today":   db_reader.get_ai_calls_today(),
-        "tokens_today":     db_reader.get_tokens_today(),
-        "chat_tokens_today": _chat_tokens_today(),
+        "ai_calls_today":   db["ai_calls_today"],
+        "tokens_today":     db["tokens_today"],
+        "chat_tokens_today": chat_tokens_today,
         "uptime":           uptime,
         "position":         position,
         "positions":        positions,
-        "recent_scans":     scans,
-        "db_connected":     db_reader.db_exists(),
-    }
+        "recent_scans":     db["recent_scans"],
+        "db_connected":     db["db_connected"],
+    }))
@@ -13,55 +13,29 @@ Auth: Bearer token required (same as all other endpoints).
 import asyncio
 import json
 import logging
-import os
-import re
-import subprocess
 from datetime import datetime, timezone
 from pathlib import Path
 
 from fastapi import APIRouter, Request
 from fastapi.responses import StreamingResponse
 
-from dashboard.services import db_reader
+from dashboard.services import chat_costs, db_reader, file_cache, journal
 
 log = logging.getLogger(__name__)
 
 router = APIRouter()
 
 STATE_PATH = Path(__file__).parent.parent.parent / "storage" / "data" / "bot_state.json"
-CHAT_COSTS_PATH = Path(__file__).parent.parent.parent / "storage" / "data" / "chat_costs.json"
-ANSI_RE = re.compile(r"\x1b\[[0-9;]*m")
-SERVICE = "japan225-bot"
 
 
 def _read_state() -> dict:
     try:
-        if STATE_PATH.exists():
-            return json.loads(STATE_PATH.read_text())
-    except Exception:
-        pass
-    return {}
-
-
-def _chat_tokens_today() -> int:
-    try:
-        if not CHAT_COSTS_PATH.exists():
-            return 0
-        data = json.loads(CHAT_COSTS_PATH.read_text())
-        if not isinstance(data, list):
-            return 0
-        from datetime import date
-        today = date.today().isoformat()
-        total = 0
-        for e in data:
-            if e.get("ts", "").startswith(today):
-                total += e.get("est_tokens", (e.get("input_chars", 0) + e.get("output_chars", 0)) // 4)
-        return total
-    except Exception:
-        return 0
+        return file_cache.read_json(STATE_PATH)
+    except Exception:  # missing (not started yet) or mid-write garbage
+        return {}
 
 
-def _next_scan_in(state: dict):
+def _next_scan_in(state: dict, now: datetime | None = None):
     ts = state.get("next_scan_at")
     if not ts:
         return None
@@ -69,7 +43,7 @@ def _next_scan_in(state: dict):
         target = datetime.fromisoformat(ts)
         if target.tzinfo is None:
             target = target.replace(tzinfo=timezone.utc)
-        return max(0, int((target - datetime.now(timezone.utc)).total_seconds()))
+        return max(0, int((target - (now or datetime.now(timezone.utc))).total_seconds()))
     except Exception:
         return None
 
@@ -90,21 +64,24 @@ def _enrich_position_from_state(position: dict, state: dict) -> dict:
 
 def _build_status() -> dict:
     """Build the same status payload as /api/status (without live IG price call for perf)."""
+    # One clock read per request, shared by every "now"/"today" below
+    now = datetime.now(timezone.utc)
+    local_now = now.astimezone().replace(tzinfo=None)
+    today = local_now.date().isoformat()
     state = _read_state()
-    positions = db_reader.get_positions()
+    db = db_reader.snapshot(today)
+    positions = db["positions"]
 
     for pos in positions:
         _enrich_position_from_state(pos, state)
 
     position = positions[0] if positions else None
 
-    scans = db_reader.get_recent_scans(50)
-
     uptime = state.get("uptime", "—")
     if not uptime and state.get("started_at"):
         try:
             started = datetime.fromisoformat(state["started_at"])
-            mins = int((datetime.now() - started).total_seconds() / 60)
+            mins = int((local_now - started).total_seconds() / 60)
             h, m = divmod(mins, 60)
             uptime = f"{h}h {m}m"
         except Exception:
@@ -115,40 +92,25 @@ def _build_status() -> dict:
         "phase":            state.get("phase", "SCANNING" if not position else "MONITORING"),
         "scanning_paused":  state.get("scanning_paused", False),
         "last_scan":        state.get("last_scan"),
-        "next_scan_in":     _next_scan_in(state),
+        "next_scan_in":     _next_scan_in(state, now),
         "last_scan_detail": state.get("last_scan_detail"),
-        "ai_calls_today":   db_reader.get_ai_calls_today(),
-        "tokens_today":     db_reader.get_tokens_today(),
-        "chat_tokens_today": _chat_tokens_today(),
+        "ai_calls_today":   db["ai_calls_today"],
+        "tokens_today":     db["tokens_today"],
+        "chat_tokens_today": chat_costs.today_tokens(today),
         "uptime":           uptime,
         "position":         position,
         "positions":        positions,
-        "recent_scans":     scans,
-        "db_connected":     db_reader.db_exists(),
+        "recent_scans":     db["recent_scans"],
+        "db_connected":     db["db_connected"],
     }
 
 
 def _get_log_lines(log_type: str = "scan", lines: int = 70) -> list[str]:
-    """Fetch journal lines (same logic as logs router)."""
-    cmd = [
-        "journalctl", "-u", SERVICE,
-        f"-n{lines * 3 if log_type == 'scan' else lines}",
-        "--no-pager",
-        "--output=short-iso",
-    ]
+    """Fetch journal lines (shared with the logs router)."""
     try:
-        result = subprocess.run(cmd, capture_output=True, text=True, timeout=5)
-        raw = result.stdout or result.stderr or ""
-        out = [ANSI_RE.sub("", l) for l in raw.splitlines() if l.strip()]
         if log_type == "scan":
-            pattern = re.compile(
-                r"SCAN|SETUP|SIGNAL|TRADE|ALERT|CONFIRM|PHASE|MOMENTUM|ERROR|WARN|CONFIDENCE"
-                r"|HAIKU|SONNET|OPUS|REJECTED|APPROVED|COOLDOWN|ESCALAT|PRE-SCREEN|SCREEN:|BLOCK",
-                re.IGNORECASE,
-            )
-            out = [l for l in out if pattern.search(l)]
-            out = out[-lines:]
-        return out
+            return journal.read_journal(lines, journal.is_scan_line, lines * 3)
+        return journal.read_journal(lines)
     except Exception:
         return []
 
@@ -167,13 +129,13 @@ async def _event_generator(request: Request):
 
     # Send initial state immediately
     try:
-        status = _build_status()
+        status = await asyncio.to_thread(_build_status)
         yield _sse_event("state_update", status)
     except Exception as e:
         log.warning("SSE initial state_update failed: %s", e)
 
     try:
-        logs = _get_log_lines()
+        logs = await asyncio.to_thread(_get_log_lines)
         log_hash = str(hash(tuple(logs[-10:]))) if logs else ""
         last_log_hash = log_hash
         yield _sse_event("new_logs", {"lines": logs, "type": "scan"})
@@ -197,12 +159,12 @@ async def _event_generator(request: Request):
 
             if current_mtime != last_state_mtime:
                 last_state_mtime = current_mtime
-                status = _build_status()
+                status = await asyncio.to_thread(_build_status)
                 yield _sse_event("state_update", status)
 
             # Check for new log entries every ~9 seconds (tick % 3)
             if tick % 3 == 0:
-                logs = _get_log_lines()
+                logs = await asyncio.to_thread(_get_log_lines)
                 log_hash = str(hash(tuple(logs[-10:]))) if logs else ""
                 if log_hash != last_log_hash:
                     last_log_hash = log_hash
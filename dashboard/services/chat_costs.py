@@ -0,0 +1,122 @@
+"""
+Aggregates over chat_costs.json (appended by claude_client._log_chat_cost).
+The running total and per-day buckets are built once per file version and
+shared by /api/chat/costs, /api/status and /api/stream, so a poll is a dict
+lookup instead of a filter + sum over the whole log. record() folds a fresh
+append into the aggregate, so the writer never forces a full rebuild.
+"""
+import threading
+from datetime import date
+from pathlib import Path
+
+from dashboard.services import file_cache
+
+CHAT_COSTS_PATH = Path(__file__).parent.parent.parent / "storage" / "data" / "chat_costs.json"
+
+_lock = threading.Lock()
+# src: the cached list the aggregate describes (identity check against file_cache)
+# by_day: "YYYY-MM-DD" → [usd, tokens, entries]
+_agg: dict = {"src": None, "total_usd": 0.0, "by_day": {}}
+# Encoded /api/chat/costs body, reused until the aggregate's source or the day changes
+_encoded: dict = {"src": None, "day": None, "raw": b""}
+_EMPTY: list = []  # stands in for a missing log, so "missing" is one stable version
+
+NOTE = "estimate (~±30%)"
+
+
+def _tokens(e: dict) -> int:
+    return e.get("est_tokens", (e.get("input_chars", 0) + e.get("output_chars", 0)) // 4)
+
+
+def _add(by_day: dict, e: dict) -> float:
+    bucket = by_day.setdefault(e.get("ts", "")[:10], [0.0, 0, []])
+    bucket[0] += e["cost_usd"]
+    bucket[1] += _tokens(e)
+    bucket[2].append(e)
+    return e["cost_usd"]
+
+
+def _rebuild(data: list) -> None:
+    by_day: dict = {}
+    total = 0.0
+    for e in data:
+        total += _add(by_day, e)
+    _agg.update(src=data, total_usd=total, by_day=by_day)
+
+
+def load() -> list:
+    """Parsed cost log (shared cached list — do not mutate); [] if missing or malformed."""
+    try:
+        data = file_cache.read_json(CHAT_COSTS_PATH)
+    except FileNotFoundError:
+        return _EMPTY
+    return data if isinstance(data, list) else _EMPTY
+
+
+def summary(day: str | None = None) -> dict:
+    """
+    {"today_usd", "total_usd", "today_tokens", "entries"} for day (default: today).
+    entries is the last 20 of that day. Raises like file_cache.read_json.
+    """
+    day = day or date.today().isoformat()
+    data = load()
+    with _lock:
+        return _summary_locked(data, day)
+
+
+def _summary_locked(data: list, day: str) -> dict:
+    if data is not _agg["src"]:
+        _rebuild(data)
+    usd, tokens, entries = _agg["by_day"].get(day, (0.0, 0, []))
+    return {
+        "today_usd": round(usd, 4),
+        "total_usd": round(_agg["total_usd"], 4),
+        "today_tokens": tokens,
+        "entries": entries[-20:],
+    }
+
+
+def summary_json(day: str | None = None) -> bytes:
+    """
+    The /api/chat/costs body (summary + note) as JSON bytes. Encoded once per
+    log version and day; polls in between get the same bytes back.
+    Raises like summary().
+    """
+    day = day or date.today().isoformat()
+    data = load()
+    with _lock:
+        if _encoded["src"] is not data or _encoded["day"] != day:
+            body = {**_summary_locked(data, day), "note": NOTE}
+            _encoded.update(src=data, day=day, raw=file_cache.dumps(body))
+        return _encoded["raw"]
+
+
+def today_tokens(day: str | None = None) -> int:
+    """Estimated chat tokens used on day (default today; 0 if the log is missing or unreadable)."""
+    try:
+        return summary(day)["today_tokens"]
+    except Exception:
+        return 0
+
+
+def record(prev: list, data: list, entry: dict, dropped: list) -> None:
+    """
+    Called by the writer right after saving data (= prev + [entry] minus the
+    oldest `dropped`) with file_cache.write_atomic. Updates the aggregate in
+    place when it still describes prev; otherwise the next summary() rebuilds it.
+    """
+    with _lock:
+        if _agg["src"] is not prev:
+            return
+        by_day = _agg["by_day"]
+        total = _agg["total_usd"] + _add(by_day, entry)
+        for old in dropped:  # oldest overall, so always at the front of their day
+            day = old.get("ts", "")[:10]
+            bucket = by_day[day]
+            bucket[0] -= old["cost_usd"]
+            bucket[1] -= _tokens(old)
+            bucket[2].pop(0)
+            if not bucket[2]:
+                del by_day[day]
+            total -= old["cost_usd"]
+        _agg.update(src=data, total_usd=total)
@@ -23,12 +23,15 @@ Usage tracking:
 import json
 import logging
 import os
-import re
 import subprocess
 import urllib.request
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from datetime import date, datetime, timezone
 from pathlib import Path
 
+from dashboard.services import chat_costs, file_cache
+
 logger = logging.getLogger(__name__)
 
 PROJECT_ROOT = Path(__file__).parent.parent.parent.resolve()
@@ -37,7 +40,6 @@ CHAT_USAGE_FILE = PROJECT_ROOT / "storage" / "data" / "chat_usage.json"
 SKILLS_DIR = Path.home() / ".claude" / "skills"
 
 CLAUDE_BIN = "/home/ubuntu/.local/bin/claude"
-CHAT_COSTS_FILE = PROJECT_ROOT / "storage" / "data" / "chat_costs.json"
 DB_FILE = PROJECT_ROOT / "storage" / "data" / "trading.db"
 
 # Rough cost estimate: blended Sonnet/Opus average
@@ -48,15 +50,25 @@ _OUTPUT_PER_CHAR = 45.0 / 1_000_000 / 4   # $/char output (blended)
 # Rolling summary: keep last 2 raw turns + a compressed summary of everything older.
 # Summary is maintained as a single paragraph, updated after each assistant reply.
 MAX_RAW_TURNS = 2        # raw turns always kept
+_RAW_WINDOW = MAX_RAW_TURNS * 2  # history entries kept raw (user + assistant per pair)
+VERBATIM_BUDGET_TOKENS = 1500  # raw turns also stop here (~4 chars/token + 4 per turn)
 SUMMARY_MAX_CHARS = 600  # ~150 tokens for the rolling summary
 
 # Keywords that trigger Opus (deep/code-fix queries)
-_DEEP_KEYWORDS = [
+_DEEP_KEYWORDS = (
     "fix", "solve", "error", "bug", "crash", "broken", "push", "commit",
     "change code", "update code", "modify", "refactor", "implement", "add feature",
     "deploy", "restart", "debug", "traceback", "exception", "failing",
     "write code", "edit", "patch", "rewrite",
-]
+)
+
+# Keywords for Haiku (pure status/info queries) — only used when the message is short
+_HAIKU_KEYWORDS = (
+    "status", "balance", "position", "what's happening", "what is happening",
+    "is it running", "is the bot", "next scan", "what session", "are we in",
+    "time", "pnl", "p&l", "how much", "cost", "what was solved",
+    "what has been", "which session", "is ig", "is market",
+)
 
 # Query intent classification (keyword → type)
 QUERY_PATTERNS = {
@@ -75,6 +87,23 @@ QUERY_PATTERNS = {
 }
 
 
+# QUERY_PATTERNS flattened once for _classify_query. Pairs stay grouped in dict
+# order, so the first hit still belongs to the highest-priority matching intent.
+_QUERY_KEYWORDS = tuple((kw, intent) for intent, kws in QUERY_PATTERNS.items() for kw in kws)
+
+
+def _contains_any(text: str, keywords: tuple[str, ...]) -> bool:
+    """
+    Plain loop of C-level substring scans; beats both any(<genexpr>) and a
+    compiled regex alternation (CPython's backtracking engine retries every
+    branch at each offset) for keyword lists this size.
+    """
+    for kw in keywords:
+        if kw in text:
+            return True
+    return False
+
+
 def _pick_tier(message: str) -> tuple[str, str, int]:
     """
     Pick model tier based on query complexity.
@@ -86,17 +115,12 @@ def _pick_tier(message: str) -> tuple[str, str, int]:
     msg_lower = message.lower()
 
     # Tier 3: Opus — code changes, fixes, debugging
-    if any(kw in msg_lower for kw in _DEEP_KEYWORDS):
+    if _contains_any(msg_lower, _DEEP_KEYWORDS):
         return "opus", "high", 600
 
-    # Tier 1: Haiku — pure status/info queries (short, no analysis needed)
-    haiku_patterns = [
-        "status", "balance", "position", "what's happening", "what is happening",
-        "is it running", "is the bot", "next scan", "what session", "are we in",
-        "time", "pnl", "p&l", "how much", "cost", "what was solved",
-        "what has been", "which session", "is ig", "is market",
-    ]
-    if any(kw in msg_lower for kw in haiku_patterns) and len(message) < 200:
+    # Tier 1: Haiku — pure status/info queries (short, no analysis needed);
+    # length first: long messages never need the keyword scan
+    if len(message) < 200 and _contains_any(msg_lower, _HAIKU_KEYWORDS):
         return "haiku", "low", 120
 
     # Tier 2: Sonnet — everything else (analysis, trade review, questions)
@@ -157,7 +181,11 @@ def chat(message: str, history: list[dict]) -> str:
 
 def compress_history(history: list[dict]) -> list[dict]:
     """
-    Compress history to: [optional summary turn] + last MAX_RAW_TURNS pairs.
+    Compress history to: [optional summary turn] + last MAX_RAW_TURNS pairs,
+    fewer if those would exceed VERBATIM_BUDGET_TOKENS (one long reply can't
+    blow up the prompt; older turns still reach the summary as snippets).
+    The latest pair is always kept raw — clipped to the budget if it is
+    oversized on its own — so the turn being answered never becomes a snippet.
     Call this after receiving an assistant reply, before saving to chat_history.json.
     Returns the new compressed history list.
     """
@@ -170,11 +198,20 @@ def compress_history(history: list[dict]) -> list[dict]:
         else:
             raw_turns.append(h)
 
-    # If we have more raw turns than the keep limit, absorb oldest into summary
-    pairs_to_keep = MAX_RAW_TURNS * 2  # user + assistant per pair
-    if len(raw_turns) > pairs_to_keep:
-        to_absorb = raw_turns[:-pairs_to_keep]
-        raw_turns = raw_turns[-pairs_to_keep:]
+    # Newest-first walk: keep turns until the count or token budget runs out;
+    # anything older is absorbed into the summary
+    keep, budget = 0, VERBATIM_BUDGET_TOKENS
+    for h in reversed(raw_turns[-_RAW_WINDOW:]):
+        budget -= len(str(h.get("content", ""))) // 4 + 4
+        if budget < 0:
+            break
+        keep += 1
+    clip = keep < min(2, len(raw_turns))
+    if clip:
+        keep = min(2, len(raw_turns))
+    if keep < len(raw_turns):
+        to_absorb = raw_turns[:len(raw_turns) - keep]
+        raw_turns = raw_turns[len(raw_turns) - keep:]
 
         existing_summary = summary_entry["content"] if summary_entry else ""
         new_summary = _absorb_into_summary(existing_summary, to_absorb)
@@ -183,12 +220,21 @@ def compress_history(history: list[dict]) -> list[dict]:
     result = []
     if summary_entry:
         result.append(summary_entry)
-    result.extend(raw_turns)
+    result.extend(_clip_to_budget(raw_turns) if clip else raw_turns)
     return result
 
 
 # ── Internal helpers ──────────────────────────────────────────────────────────
 
+_SAFETY_RULE = (
+    "--- CRITICAL RULE ---\n"
+    "You are running INSIDE the japan225-dashboard uvicorn process as a subprocess.\n"
+    "NEVER run `systemctl restart japan225-dashboard` — it will kill you mid-response.\n"
+    "If code changes require a dashboard restart, say so in your response and the user will restart it.\n"
+    "You MAY restart japan225-bot (the monitor) if needed — that is a separate process."
+)
+
+
 def _build_prompt(message: str, history: list[dict]) -> str:
     """Build the full prompt: state snapshot + live context + compressed history + new message."""
     parts = []
@@ -210,25 +256,32 @@ def _build_prompt(message: str, history: list[dict]) -> str:
             parts.append(history_block)
 
     # 4. Safety constraint — prevent subprocess from killing its own parent
-    parts.append(
-        "--- CRITICAL RULE ---\n"
-        "You are running INSIDE the japan225-dashboard uvicorn process as a subprocess.\n"
-        "NEVER run `systemctl restart japan225-dashboard` — it will kill you mid-response.\n"
-        "If code changes require a dashboard restart, say so in your response and the user will restart it.\n"
-        "You MAY restart japan225-bot (the monitor) if needed — that is a separate process."
-    )
+    parts.append(_SAFETY_RULE)
 
     # 5. New message
     parts.append(f"Human: {message}")
     return "\n\n".join(parts)
 
 
+# Rendered state block for the last bot_state.json version seen (file_cache hands
+# back the same object until the file changes, so identity is the version check)
+_state_block: dict = {"src": None, "text": ""}
+
+
 def _load_bot_state_block() -> str:
     """Load bot_state.json as a compact status block (~300 tokens max)."""
     try:
-        if not BOT_STATE_FILE.exists():
-            return ""
-        state = json.loads(BOT_STATE_FILE.read_text())
+        # shared file_cache copy: re-parsed only when the monitor rewrites the file
+        state = file_cache.read_json(BOT_STATE_FILE)
+    except Exception:
+        return ""
+    if state is not _state_block["src"]:
+        _state_block.update(src=state, text=_render_state_block(state))
+    return _state_block["text"]
+
+
+def _render_state_block(state: dict) -> str:
+    try:
         pos = state.get("position", {})
         scan = state.get("last_scan", {})
         acct = state.get("account", {})
@@ -273,85 +326,113 @@ def _load_bot_state_block() -> str:
         return ""
 
 
+# Live-context probe argv/keyword constants (fixed for the process lifetime)
+_SERVICE_LABELS = ("bot", "dashboard", "ngrok")
+_SERVICES_ARGV = ("systemctl", "is-active", "japan225-bot", "japan225-dashboard", "japan225-ngrok")
+_ERRORS_ARGV = ("journalctl", "-u", "japan225-bot", "--no-pager", "-n", "200",
+                "--since", "30 min ago", "-q")
+_SCANS_ARGV = ("journalctl", "-u", "japan225-bot", "--no-pager", "-n", "50",
+               "--since", "1 hour ago", "-q")
+_TRADES_ARGV = ("sqlite3", str(DB_FILE),
+                "SELECT trade_number,direction,setup_type,confidence,pnl,result "
+                "FROM trades ORDER BY id DESC LIMIT 3")
+_ERROR_MARKERS = ("ERROR", "CRITICAL", "Traceback")
+_SCAN_KEYWORDS = ("SCAN", "SETUP", "CONFIDENCE", "SONNET", "OPUS",
+                  "APPROVED", "REJECTED", "TRADE", "POSITION", "SESSION")
+
+
+def _ops_services() -> list[str]:
+    """Service status (bot, dashboard, ngrok)."""
+    svc = subprocess.run(_SERVICES_ARGV, capture_output=True, text=True, timeout=3)
+    statuses = svc.stdout.strip().split("\n")
+    svc_line = " | ".join(f"{n}={s}" for n, s in zip(_SERVICE_LABELS, statuses))
+    return [f"Services: {svc_line}"]
+
+
+def _ops_errors() -> list[str]:
+    """Recent errors from bot journal (last 5 ERROR lines)."""
+    jctl = subprocess.run(_ERRORS_ARGV, capture_output=True, text=True, timeout=3)
+    if not jctl.stdout:
+        return []
+    count, err_lines = 0, deque(maxlen=5)  # only the last 5 are shown
+    for l in jctl.stdout.splitlines():
+        if _contains_any(l, _ERROR_MARKERS):
+            count += 1
+            err_lines.append(l)
+    if not count:
+        return ["Recent errors: none in last 30 min"]
+    return [f"Recent errors ({count}):"] + [f"  {el.strip()[:200]}" for el in err_lines]
+
+
+def _ops_scans() -> list[str]:
+    """Recent scan log lines (last 8 meaningful lines)."""
+    jctl2 = subprocess.run(_SCANS_ARGV, capture_output=True, text=True, timeout=3)
+    if not jctl2.stdout:
+        return []
+    # upper() once per line, not once per keyword as any(kw in l.upper() ...) did
+    scan_lines = deque(
+        (l for l in jctl2.stdout.splitlines() if _contains_any(l.upper(), _SCAN_KEYWORDS)),
+        maxlen=8,
+    )
+    if not scan_lines:
+        return []
+    return ["Recent scan activity:"] + [f"  {sl.strip()[:200]}" for sl in scan_lines]
+
+
+def _ops_trades() -> list[str]:
+    """Recent trades from DB (last 3)."""
+    if not DB_FILE.exists():
+        return []
+    db_result = subprocess.run(_TRADES_ARGV, capture_output=True, text=True, timeout=3)
+    if db_result.stdout.strip():
+        return [f"Recent trades: {db_result.stdout.strip()}"]
+    return ["Recent trades: none yet"]
+
+
+# Output order of the live-context sections
+_OPS_PROBES = (_ops_services, _ops_errors, _ops_scans, _ops_trades)
+
+
 def _load_ops_context() -> str:
     """
     Pre-compute operational context so the AI doesn't need tool calls for common questions.
     Includes: service status, recent log errors, recent trade summary.
-    Runs quickly (~100ms total) — all local calls.
+    The probes are independent local subprocesses, so they run side by side:
+    wall time is the slowest probe (~50ms) rather than the sum. A failed probe
+    just leaves its section out.
     """
     lines = ["--- LIVE CONTEXT (pre-computed) ---"]
-    try:
-        # Service status
-        try:
-            svc = subprocess.run(
-                ["systemctl", "is-active", "japan225-bot", "japan225-dashboard", "japan225-ngrok"],
-                capture_output=True, text=True, timeout=3
-            )
-            statuses = svc.stdout.strip().split("\n")
-            names = ["bot", "dashboard", "ngrok"]
-            svc_line = " | ".join(f"{n}={s}" for n, s in zip(names, statuses))
-            lines.append(f"Services: {svc_line}")
-        except Exception:
-            pass
+    with ThreadPoolExecutor(max_workers=len(_OPS_PROBES)) as pool:
+        futures = [pool.submit(probe) for probe in _OPS_PROBES]
+        for fut in futures:
+            try:
+                lines.extend(fut.result())
+            except Exception:
+                pass
 
-        # Recent errors from bot journal (last 5 ERROR lines)
-        try:
-            jctl = subprocess.run(
-                ["journalctl", "-u", "japan225-bot", "--no-pager", "-n", "200",
-                 "--since", "30 min ago", "-q"],
-                capture_output=True, text=True, timeout=3
-            )
-            if jctl.stdout:
-                err_lines = [l.strip() for l in jctl.stdout.splitlines()
-                             if "ERROR" in l or "CRITICAL" in l or "Traceback" in l]
-                if err_lines:
-                    lines.append(f"Recent errors ({len(err_lines)}):")
-                    for el in err_lines[-5:]:
-                        lines.append(f"  {el[:200]}")
-                else:
-                    lines.append("Recent errors: none in last 30 min")
-        except Exception:
-            pass
+    return "\n".join(lines) if len(lines) > 1 else ""
 
-        # Recent scan log lines (last 8 meaningful lines)
-        try:
-            jctl2 = subprocess.run(
-                ["journalctl", "-u", "japan225-bot", "--no-pager", "-n", "50",
-                 "--since", "1 hour ago", "-q"],
-                capture_output=True, text=True, timeout=3
-            )
-            if jctl2.stdout:
-                scan_keywords = ["SCAN", "SETUP", "CONFIDENCE", "SONNET", "OPUS",
-                                 "APPROVED", "REJECTED", "TRADE", "POSITION", "SESSION"]
-                scan_lines = [l.strip() for l in jctl2.stdout.splitlines()
-                              if any(kw in l.upper() for kw in scan_keywords)]
-                if scan_lines:
-                    lines.append("Recent scan activity:")
-                    for sl in scan_lines[-8:]:
-                        lines.append(f"  {sl[:200]}")
-        except Exception:
-            pass
 
-        # Recent trades from DB (last 3)
-        try:
-            if DB_FILE.exists():
-                db_result = subprocess.run(
-                    ["sqlite3", str(DB_FILE),
-                     "SELECT trade_number,direction,setup_type,confidence,pnl,result "
-                     "FROM trades ORDER BY id DESC LIMIT 3"],
-                    capture_output=True, text=True, timeout=3
-                )
-                if db_result.stdout.strip():
-                    lines.append(f"Recent trades: {db_result.stdout.strip()}")
-                else:
-                    lines.append("Recent trades: none yet")
-        except Exception:
-            pass
+_CLIP_MARK = " …[truncated]"
 
-    except Exception:
-        pass
 
-    return "\n".join(lines) if len(lines) > 1 else ""
+def _clip_to_budget(turns: list[dict]) -> list[dict]:
+    """
+    Copies of turns with contents cut (tail dropped) so that together they fit
+    VERBATIM_BUDGET_TOKENS. Shortest first: a short question stays whole and
+    the long reply gets the rest of the room.
+    """
+    room = (VERBATIM_BUDGET_TOKENS - 4 * len(turns)) * 4  # chars, same len//4 + 4 estimate
+    out = list(turns)
+    order = sorted(range(len(turns)), key=lambda i: len(str(turns[i].get("content", ""))))
+    for left, i in zip(range(len(turns), 0, -1), order):
+        content = str(turns[i].get("content", ""))
+        share = room // left
+        if len(content) > share:
+            content = content[:max(0, share - len(_CLIP_MARK))] + _CLIP_MARK
+            out[i] = {**turns[i], "content": content}
+        room -= len(content)
+    return out
 
 
 def _format_history(history: list[dict]) -> str:
@@ -415,18 +496,17 @@ def _log_chat_cost(prompt: str, response: str) -> None:
             "output_chars": len(response),
             "est_tokens": est_tokens,
         }
-        data: list = []
-        if CHAT_COSTS_FILE.exists():
-            try:
-                data = json.loads(CHAT_COSTS_FILE.read_text())
-                if not isinstance(data, list):
-                    data = []
-            except Exception:
-                data = []
-        data.append(entry)
-        if len(data) > 500:
+        try:
+            prev = chat_costs.load()
+        except Exception:
+            prev = []
+        data = prev + [entry]  # copy: prev is the shared cached list
+        dropped = data[:-500]
+        if dropped:
             data = data[-500:]
-        CHAT_COSTS_FILE.write_text(json.dumps(data))
+        raw = file_cache.dumps(data)
+        file_cache.write_atomic(chat_costs.CHAT_COSTS_PATH, data, raw)
+        chat_costs.record(prev, data, entry, dropped)
     except Exception as e:
         logger.debug(f"_log_chat_cost failed (non-fatal): {e}")
 
@@ -435,23 +515,23 @@ def _track_usage(message: str) -> None:
     """Classify query intent and log to chat_usage.json. Auto-drafts skills at threshold."""
     try:
         intent = _classify_query(message)
-        today = date.today().isoformat()
 
-        usage: dict = {}
-        if CHAT_USAGE_FILE.exists():
-            usage = json.loads(CHAT_USAGE_FILE.read_text())
+        try:
+            # file_cache copy is shared: rebuild the touched week instead of mutating it
+            usage = dict(file_cache.read_json(CHAT_USAGE_FILE))
+        except FileNotFoundError:
+            usage = {}
 
         week_key = _iso_week()
-        usage.setdefault(week_key, {})
-        usage[week_key].setdefault(intent, 0)
-        usage[week_key][intent] += 1
+        usage[week_key] = week = dict(usage.get(week_key, {}))
+        week[intent] = week.get(intent, 0) + 1
 
         # Auto-draft skill if threshold hit
-        count = usage[week_key][intent]
+        count = week[intent]
         if count in (5, 10, 20):  # trigger at 5, then log again at 10/20
             _maybe_draft_skill(intent, count)
 
-        CHAT_USAGE_FILE.write_text(json.dumps(usage, indent=2))
+        file_cache.write_atomic(CHAT_USAGE_FILE, usage, file_cache.dumps(usage))
     except Exception as e:
         logger.debug(f"Usage tracking failed (non-fatal): {e}")
 
@@ -459,16 +539,22 @@ def _track_usage(message: str) -> None:
 def _classify_query(message: str) -> str:
     """Return intent type string for a message."""
     msg_lower = message.lower()
-    for intent, keywords in QUERY_PATTERNS.items():
-        if any(kw in msg_lower for kw in keywords):
+    for kw, intent in _QUERY_KEYWORDS:
+        if kw in msg_lower:
             return intent
     return "other"
 
 
+_week_key: dict = {"day": None, "key": ""}  # _iso_week() result for the current day
+
+
 def _iso_week() -> str:
     """Return ISO week key like '2026-W09'."""
     today = date.today()
-    return f"{today.year}-W{today.isocalendar()[1]:02d}"
+    if today != _week_key["day"]:
+        year, week, _ = today.isocalendar()  # ISO year: Dec 29-31 can be week 1 of next year
+        _week_key.update(day=today, key=f"{year}-W{week:02d}")
+    return _week_key["key"]
 
 
 def _maybe_draft_skill(intent: str, count: int) -> None:
@@ -5,9 +5,9 @@ Two-tier system:
   restart → requires bot restart (blocked if position open)
 """
 import json
-import os
 from pathlib import Path
 from config import settings as S
+from dashboard.services import file_cache
 
 OVERRIDES_PATH = Path(__file__).parent.parent.parent / "storage" / "data" / "dashboard_overrides.json"
 
@@ -25,7 +25,7 @@ RESTART_KEYS = {
 
 
 def _defaults() -> dict:
-    """Read baseline values live from settings.py — never a stale hardcoded copy."""
+    """Read baseline values from settings.py — never a stale hardcoded copy."""
     return {
         "MIN_CONFIDENCE":         S.MIN_CONFIDENCE,
         "MIN_CONFIDENCE_SHORT":   S.MIN_CONFIDENCE_SHORT,
@@ -42,16 +42,20 @@ def _defaults() -> dict:
     }
 
 
+# settings.py is imported once per process, so its values can't change under us:
+# snapshot them instead of re-reading 10 attributes on every read_overrides()
+_DEFAULTS = _defaults()
+
+
 def read_overrides() -> dict:
     """Return settings.py values as base, with dashboard_overrides.json on top."""
     overrides = {}
     try:
-        if OVERRIDES_PATH.exists():
-            with open(OVERRIDES_PATH) as f:
-                overrides = json.load(f)
+        # parsed once per file version (file_cache); merged into a fresh dict below
+        overrides = file_cache.read_json(OVERRIDES_PATH)
     except Exception:
         pass
-    return {**_defaults(), **overrides}
+    return {**_DEFAULTS, **overrides}
 
 
 def write_overrides(updates: dict, tier: str) -> dict:
@@ -68,11 +72,8 @@ def write_overrides(updates: dict, tier: str) -> dict:
     current = read_overrides()
     current.update(updates)
 
-    # Atomic write via temp file
+    # Atomic write (unbuffered tmp + fdatasync + replace); also primes the read cache
     OVERRIDES_PATH.parent.mkdir(parents=True, exist_ok=True)
-    tmp = OVERRIDES_PATH.with_suffix(".tmp")
-    with open(tmp, "w") as f:
-        json.dump(current, f, indent=2)
-    os.replace(tmp, OVERRIDES_PATH)
+    file_cache.write_atomic(OVERRIDES_PATH, current, json.dumps(current, indent=2).encode())
 
     return current
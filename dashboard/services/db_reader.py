@@ -4,7 +4,6 @@ Opens the DB in WAL read-only mode — safe to run alongside monitor.py.
 """
 import sqlite3
 import json
-import os
 from datetime import datetime, date
 from config.settings import DB_PATH
 
@@ -55,10 +54,10 @@ def _format_position(row) -> dict:
     }
 
 
-def get_positions() -> list[dict]:
+def get_positions(conn: sqlite3.Connection | None = None) -> list[dict]:
     """Return all open positions from trades table."""
     try:
-        with _conn() as conn:
+        with conn or _conn() as conn:
             rows = conn.execute(
                 "SELECT deal_id, direction, lots, entry_price, stop_loss, take_profit, "
                 "opened_at, phase, confidence FROM trades WHERE closed_at IS NULL ORDER BY id ASC"
@@ -76,10 +75,11 @@ def get_position() -> dict | None:
 
 # ── Scans ─────────────────────────────────────────────────────────────────────
 
-def get_recent_scans(limit: int = 50, date: str = None, include_no_setup: bool = False) -> list[dict]:
+def get_recent_scans(limit: int = 50, date: str = None, include_no_setup: bool = False,
+                     conn: sqlite3.Connection | None = None) -> list[dict]:
     """Fetch recent scans. Optional date filter (YYYY-MM-DD). Optional include_no_setup."""
     try:
-        with _conn() as conn:
+        with conn or _conn() as conn:
             where_parts = []
             params: list = []
             if not include_no_setup:
@@ -142,14 +142,14 @@ def get_trade_history(limit: int = 50) -> list[dict]:
 
 # ── Cost / AI stats ───────────────────────────────────────────────────────────
 
-def get_tokens_today() -> dict:
-    """Estimate token usage today from scan action_taken values."""
-    today = date.today().isoformat()
+def get_tokens_today(today: str | None = None, conn: sqlite3.Connection | None = None) -> dict:
+    """Estimate token usage today (YYYY-MM-DD, default local today) from scan action_taken values."""
+    today = today or date.today().isoformat()
     # Token estimates per AI tier (input+output combined)
     SONNET_TOKENS = 1200
     OPUS_TOKENS = 1500
     try:
-        with _conn() as conn:
+        with conn or _conn() as conn:
             rows = conn.execute(
                 "SELECT action_taken FROM scans WHERE timestamp LIKE ?",
                 (f"{today}%",)
@@ -165,12 +165,12 @@ def get_tokens_today() -> dict:
         return {"tokens": 0, "scans": 0}
 
 
-def get_ai_calls_today() -> int:
+def get_ai_calls_today(today: str | None = None, conn: sqlite3.Connection | None = None) -> int:
     """Count scans that went through AI evaluation (Sonnet/Opus/Haiku) today.
     Subscription = $0 cost, so we check action_taken instead of api_cost."""
-    today = date.today().isoformat()
+    today = today or date.today().isoformat()
     try:
-        with _conn() as conn:
+        with conn or _conn() as conn:
             r = conn.execute(
                 "SELECT COUNT(*) as c FROM scans WHERE timestamp LIKE ? "
                 "AND (action_taken LIKE 'ai_rejected%' OR action_taken LIKE 'haiku_rejected%' "
@@ -194,3 +194,26 @@ def get_account_state() -> dict:
 
 def db_exists() -> bool:
     return DB_PATH.exists()
+
+
+def snapshot(today: str | None = None, scans: int = 50) -> dict:
+    """
+    Everything /api/status reads from the DB, over ONE read-only connection
+    (one file open instead of one per query). Each field falls back like its getter.
+    """
+    today = today or date.today().isoformat()
+    try:
+        conn = _conn()
+    except Exception:
+        conn = None  # getters retry on their own and return their empty defaults
+    try:
+        return {
+            "positions":      get_positions(conn=conn),
+            "recent_scans":   get_recent_scans(scans, conn=conn),
+            "ai_calls_today": get_ai_calls_today(today, conn=conn),
+            "tokens_today":   get_tokens_today(today, conn=conn),
+            "db_connected":   db_exists(),
+        }
+    finally:
+        if conn is not None:
+            conn.close()
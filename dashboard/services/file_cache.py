@@ -0,0 +1,127 @@
+"""
+Parsed-JSON cache for the small state files the dashboard polls
+(bot_state.json, chat_history.json, chat_costs.json, chat_usage.json,
+dashboard_overrides.json).
+A file is re-read only when its (mtime_ns, size) stamp changes, and the stamp
+itself is re-checked at most every STAT_TTL seconds: a burst of polls from
+several tabs costs a dict lookup each, and a quiet poll costs one stat()
+instead of a read + parse. Missing files are remembered the same way.
+Writes made through this module are visible immediately (write_atomic/remember);
+the monitor's bot_state.json writes show up within STAT_TTL.
+Returned objects are shared between callers — treat them as read-only.
+Uses orjson when installed (several times faster both ways), stdlib json otherwise.
+"""
+import json
+import os
+import tempfile
+from pathlib import Path
+from time import monotonic
+
+try:
+    import orjson
+except ImportError:  # optional speed-up
+    orjson = None
+
+STAT_TTL = 0.5
+
+# path → (stamp, parsed, raw bytes as on disk, monotonic time of the last stat);
+# stamp None = file was missing at that stat
+_cache: dict[Path, tuple] = {}
+
+
+def loads(raw: bytes):
+    return orjson.loads(raw) if orjson else json.loads(raw)
+
+
+def dumps(obj) -> bytes:
+    """Compact UTF-8 JSON bytes, ready for write_bytes() or a Response body."""
+    if orjson:
+        return orjson.dumps(obj)
+    # same compact, non-ASCII-escaping output as orjson
+    return json.dumps(obj, separators=(",", ":"), ensure_ascii=False).encode()
+
+
+def _stamp(path: Path) -> tuple[int, int]:
+    st = path.stat()
+    return st.st_mtime_ns, st.st_size
+
+
+def _entry(path: Path) -> tuple:
+    now = monotonic()
+    hit = _cache.get(path)
+    if hit is None or now - hit[3] >= STAT_TTL:
+        try:
+            stamp = _stamp(path)
+        except FileNotFoundError:
+            stamp = None
+        if hit is not None and hit[0] == stamp:
+            hit = _cache[path] = (stamp, hit[1], hit[2], now)
+        elif stamp is None:
+            hit = _cache[path] = (None, None, None, now)
+        else:
+            raw = path.read_bytes()
+            hit = _cache[path] = (stamp, loads(raw), raw, now)
+    if hit[0] is None:
+        raise FileNotFoundError(2, "No such file or directory", str(path))
+    return hit
+
+
+def read_json(path: Path):
+    """
+    Parsed contents of path, from cache while the file is unchanged.
+    Raises like json.loads(path.read_text()) (FileNotFoundError/OSError, ValueError).
+    """
+    return _entry(path)[1]
+
+
+def read_both(path: Path) -> tuple[object, bytes]:
+    """
+    (parsed, raw bytes) from the same version of the file — raw can be served
+    as-is, with no re-serialization.
+    """
+    _, data, raw, _ = _entry(path)
+    return data, raw
+
+
+_fdatasync = getattr(os, "fdatasync", os.fsync)  # fdatasync is Linux-only
+
+
+def write_atomic(path: Path, data, raw: bytes) -> None:
+    """
+    Replace path with raw (the encoding of data) and prime the cache.
+    Unique tmp (mkstemp) + fdatasync + os.replace + directory fsync: concurrent
+    writers never share a tmp file, readers see the old or the new file, and
+    after a crash the file is never torn or 0-byte. fdatasync skips the metadata
+    flush a full fsync does; the directory fsync makes the new entry durable.
+    """
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=path.name + ".", suffix=".tmp")
+    try:
+        try:
+            view = memoryview(raw)
+            while view:  # os.write may write less than asked
+                view = view[os.write(fd, view):]
+            _fdatasync(fd)
+        finally:
+            os.close(fd)
+        os.chmod(tmp, 0o644)  # mkstemp creates 0600
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+        raise
+    dfd = os.open(path.parent, os.O_RDONLY)
+    try:
+        os.fsync(dfd)
+    finally:
+        os.close(dfd)
+    remember(path, data, raw)
+
+
+def remember(path: Path, data, raw: bytes) -> None:
+    """Prime the cache with data/raw just written to path, so the next read skips the parse."""
+    try:
+        _cache[path] = (_stamp(path), data, raw, monotonic())
+    except OSError:
+        _cache.pop(path, None)
@@ -31,7 +31,9 @@ def apply_fix(target: str, diff: str) -> dict:
     """
     # ── Validate path ─────────────────────────────────────────────────────────
     target_path = (PROJECT_ROOT / target).resolve()
-    if not str(target_path).startswith(str(PROJECT_ROOT)):
+    # Component-wise: a prefix check on strings would let a sibling like
+    # /root/japan225-bot-old through
+    if not target_path.is_relative_to(PROJECT_ROOT):
         raise RuntimeError("Path traversal rejected")
     if target_path.suffix not in ALLOWED_EXTS:
         raise RuntimeError(f"Extension '{target_path.suffix}' not allowed (only .py .json .md)")
@@ -39,6 +41,7 @@ def apply_fix(target: str, diff: str) -> dict:
         raise RuntimeError("Blocked file")
     if not target_path.exists():
         raise RuntimeError(f"File not found: {target}")
+    rel = str(target_path.relative_to(PROJECT_ROOT))
 
     # ── Write diff to temp file ───────────────────────────────────────────────
     with tempfile.NamedTemporaryFile(mode="w", suffix=".patch", delete=False) as f:
@@ -55,7 +58,7 @@ def apply_fix(target: str, diff: str) -> dict:
             raise RuntimeError(f"Patch dry-run failed:\n{dry.stdout}\n{dry.stderr}")
 
         # ── Stash the file for rollback ───────────────────────────────────────
-        _run(["git", "stash", "push", "--", str(target_path.relative_to(PROJECT_ROOT))], check=False)
+        _run(["git", "stash", "push", "--", rel], check=False)
 
         # ── Apply patch ───────────────────────────────────────────────────────
         apply = _run(["patch", "-p1", "-i", patch_file], check=False)
@@ -65,7 +68,6 @@ def apply_fix(target: str, diff: str) -> dict:
             raise RuntimeError(f"Patch apply failed:\n{apply.stdout}\n{apply.stderr}")
 
         # ── Git add + commit + push ───────────────────────────────────────────
-        rel = str(target_path.relative_to(PROJECT_ROOT))
         _run(["git", "add", rel])
         _run(["git", "commit", "-m", f"fix: apply dashboard patch to {rel}"])
         push = _run(["git", "push", "origin", "main"], check=False)
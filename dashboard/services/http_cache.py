@@ -0,0 +1,19 @@
+"""
+ETag revalidation for the JSON GETs the dashboard polls.
+Responses carry a strong ETag plus Cache-Control: no-cache, so the browser
+revalidates every poll with If-None-Match and an unchanged payload comes back
+as a bodyless 304 (fetch() still sees the cached 200 body).
+"""
+import hashlib
+
+from fastapi import Request
+from fastapi.responses import Response
+
+
+def json_response(request: Request, raw: bytes, tag: str | None = None) -> Response:
+    """raw JSON bytes as a revalidatable response; tag defaults to a hash of raw."""
+    etag = f'"{tag or hashlib.blake2b(raw, digest_size=8).hexdigest()}"'
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if etag in request.headers.get("if-none-match", ""):
+        return Response(status_code=304, headers=headers)
+    return Response(raw, media_type="application/json", headers=headers)
@@ -5,7 +5,6 @@ Reuses a single IG session (never logs out — avoids kicking user off IG web).
 Caches results for 1 min with a lock to prevent concurrent fetches.
 """
 import os
-import json
 import time
 import logging
 import threading
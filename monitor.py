@@ -44,8 +44,10 @@ from config.settings import (
     CONTRADICTORY_SIGNAL_MIN_SCORE, CONTRADICTORY_SIGNAL_MAX_GAP,
 )
 from core.ig_client import IGClient, POSITIONS_API_ERROR
-from core.indicators import analyze_timeframe, detect_setup, compute_session_context
-from core.session import get_current_session, is_no_trade_day
+from core.indicators import (
+    analyze_timeframe, detect_setup, compute_session_context, rsi,
+)
+from core.session import get_current_session, is_no_trade_day, utcnow
 from core.momentum import MomentumTracker, TIER_SEVERE
 from core.confidence import compute_confidence
 from trading.exit_manager import ExitManager, ExitPhase
@@ -657,7 +659,8 @@ class TradingMonitor:
 
         Returns: seconds to sleep before next cycle.
         """
-        session = get_current_session()
+        now = utcnow()  # one clock read shared by the session checks below
+        session = get_current_session(now)
         logger.info(f"Scan cycle | Session: {session['name']} | Active: {session['active']}")
         self._last_scan_time = datetime.now(timezone.utc)
         self._write_state(session_name=session["name"])
@@ -666,7 +669,7 @@ class TradingMonitor:
         force_scan = self._check_force_scan_trigger()
 
         # --- Weekend / No-trade day check ---
-        no_trade, reason = is_no_trade_day()
+        no_trade, reason = is_no_trade_day(now=now)
         if no_trade:
             logger.info(f"No-trade: {reason}")
             return OFFHOURS_INTERVAL_SECONDS
@@ -738,10 +741,10 @@ class TradingMonitor:
             logger.warning("Failed to fetch 15M candles")
             return SCAN_INTERVAL_SECONDS
 
-        tf_15m = analyze_timeframe(candles_15m)
-        tf_daily = analyze_timeframe(candles_daily) if candles_daily else {}
-        tf_5m = analyze_timeframe(candles_5m) if candles_5m else {}
-        tf_4h = analyze_timeframe(candles_4h) if candles_4h else {}
+        tf_15m = analyze_timeframe(candles_15m, ema_key="15m")
+        tf_daily = analyze_timeframe(candles_daily, ema_key="daily") if candles_daily else {}
+        tf_5m = analyze_timeframe(candles_5m, ema_key="5m") if candles_5m else {}
+        tf_4h = analyze_timeframe(candles_4h, ema_key="4h") if candles_4h else {}
 
         # Crash day detection logging
         daily_range = tf_daily.get("high", 0) - tf_daily.get("low", 0) if tf_daily else 0
@@ -1628,7 +1631,7 @@ class TradingMonitor:
         pos_tracker = self._position_trackers.get(deal_id, {})
         mt = pos_tracker.get("momentum_tracker") or self.momentum_tracker
         if mt and mt._prices:
-            last_price = mt._prices[-1]["price"]
+            last_price = mt._prices[-1]
         if not last_price and pnl_dollars:
             lots = float(pos_state.get("lots") or 1)
             if lots and CONTRACT_SIZE:
@@ -2258,13 +2261,13 @@ class TradingMonitor:
                 asyncio.get_event_loop().run_in_executor(None, lambda: self.ig.get_prices("HOUR_4", 30)),
             )
             tf_15m = analyze_timeframe(candles_15m) if candles_15m else {}
-            tf_4h  = analyze_timeframe(candles_4h)  if candles_4h  else {}
+            rsi_4h = rsi([c["close"] for c in candles_4h], 14) if candles_4h else []  # only RSI is read
             price  = tf_15m.get("price", 0) or 0
             ema9   = tf_15m.get("ema9",  0) or 0
             ema50  = tf_15m.get("ema50", 0) or 0
             return {
                 "rsi_15m":     tf_15m.get("rsi"),
-                "rsi_4h":      tf_4h.get("rsi"),
+                "rsi_4h":      round(rsi_4h[-1], 2) if rsi_4h else None,
                 "ema9_dist":   round(price - ema9,  1) if price and ema9  else None,
                 "ema50_dist":  round(price - ema50, 1) if price and ema50 else None,
                 "above_vwap":  tf_15m.get("above_vwap"),
@@ -0,0 +1,99 @@
+"""
+Tests for dashboard/services/chat_costs.py — incremental cost-log aggregates.
+Entries are appended exactly as claude_client._log_chat_cost does, then every
+summary() is checked against a full recompute over the file on disk.
+"""
+import json
+
+import pytest
+
+from dashboard.services import chat_costs, file_cache
+
+
+@pytest.fixture
+def costs_path(tmp_path, monkeypatch):
+    path = tmp_path / "chat_costs.json"
+    monkeypatch.setattr(chat_costs, "CHAT_COSTS_PATH", path)
+    monkeypatch.setattr(file_cache, "_cache", {})
+    monkeypatch.setattr(chat_costs, "_agg", {"src": None, "total_usd": 0.0, "by_day": {}})
+    monkeypatch.setattr(chat_costs, "_encoded", {"src": None, "day": None, "raw": b""})
+    return path
+
+
+def _append(entry: dict) -> None:
+    """Same steps as claude_client._log_chat_cost after building the entry."""
+    prev = chat_costs.load()
+    data = prev + [entry]
+    dropped = data[:-500]
+    if dropped:
+        data = data[-500:]
+    file_cache.write_atomic(chat_costs.CHAT_COSTS_PATH, data, file_cache.dumps(data))
+    chat_costs.record(prev, data, entry, dropped)
+
+
+def _entry(i: int, day: str) -> dict:
+    return {
+        "ts": f"{day}T{i % 24:02d}:00:00+00:00",
+        "cost_usd": round(0.001 * (i % 7 + 1), 6),
+        "input_chars": 400 + i,
+        "output_chars": 200 + i % 11,
+        "est_tokens": (600 + i + i % 11) // 4,
+    }
+
+
+def _recompute(path, day: str) -> dict:
+    data = json.loads(path.read_bytes())
+    today = [e for e in data if e["ts"][:10] == day]
+    return {
+        "today_usd": round(sum(e["cost_usd"] for e in today), 4),
+        "total_usd": round(sum(e["cost_usd"] for e in data), 4),
+        "today_tokens": sum(e["est_tokens"] for e in today),
+        "entries": today[-20:],
+    }
+
+
+def _check(path, day: str) -> None:
+    got = chat_costs.summary(day)
+    want = _recompute(path, day)
+    assert got["today_usd"] == pytest.approx(want["today_usd"], abs=1e-4)
+    assert got["total_usd"] == pytest.approx(want["total_usd"], abs=1e-4)
+    assert got["today_tokens"] == want["today_tokens"]
+    assert got["entries"] == want["entries"]
+
+
+class TestChatCostsRecord:
+    def test_missing_log_is_empty(self, costs_path):
+        assert chat_costs.summary("2026-03-01") == {
+            "today_usd": 0.0, "total_usd": 0.0, "today_tokens": 0, "entries": [],
+        }
+
+    def test_appends_match_full_recompute(self, costs_path):
+        for i in range(30):
+            _append(_entry(i, "2026-03-01"))
+            _check(costs_path, "2026-03-01")
+
+    def test_record_updates_in_place(self, costs_path):
+        _append(_entry(0, "2026-03-01"))
+        chat_costs.summary("2026-03-01")  # build the aggregate
+        _append(_entry(1, "2026-03-01"))
+        assert chat_costs._agg["src"] is chat_costs.load()  # folded in, no rebuild needed
+
+    def test_trim_past_500_across_midnight(self, costs_path):
+        days = ("2026-03-01", "2026-03-02", "2026-03-03")
+        for i in range(800):
+            day = days[min(i // 250, 2)]  # 250 on day 1, 250 on day 2, the rest on day 3
+            _append(_entry(i, day))
+            if i % 50 == 0 or i > 495:
+                for d in days:
+                    _check(costs_path, d)
+        assert len(chat_costs.load()) == 500
+        # the trim emptied day 1 completely: its bucket is gone, not left at zero
+        assert "2026-03-01" not in chat_costs._agg["by_day"]
+
+    def test_summary_json_tracks_appends(self, costs_path):
+        _append(_entry(0, "2026-03-01"))
+        first = json.loads(chat_costs.summary_json("2026-03-01"))
+        _append(_entry(1, "2026-03-01"))
+        second = json.loads(chat_costs.summary_json("2026-03-01"))
+        assert len(second["entries"]) == len(first["entries"]) + 1
+        assert second["note"] == chat_costs.NOTE
@@ -0,0 +1,63 @@
+"""
+Tests for dashboard/services/claude_client.py — history compression.
+Pure text handling: no Claude Code subprocess is spawned.
+"""
+from dashboard.services.claude_client import (
+    VERBATIM_BUDGET_TOKENS, compress_history,
+)
+
+
+def _turn(role, content):
+    return {"role": role, "content": content}
+
+
+def _tokens(turns):
+    return sum(len(t["content"]) // 4 + 4 for t in turns)
+
+
+# ── compress_history ──────────────────────────────────────────────────────────
+
+class TestCompressHistory:
+    def test_short_history_unchanged(self):
+        history = [_turn("user", "status?"), _turn("assistant", "FLAT")]
+        assert compress_history(history) == history
+
+    def test_older_turns_go_to_summary(self):
+        history = [_turn("user", f"q{i}") for i in range(7)]
+        result = compress_history(history)
+        assert result[0]["role"] == "summary"
+        assert "q0" in result[0]["content"]
+        assert [t["content"] for t in result[1:]] == ["q3", "q4", "q5", "q6"]
+
+    def test_budget_drops_older_pair_first(self):
+        long_reply = "x" * (VERBATIM_BUDGET_TOKENS * 5)
+        history = [
+            _turn("user", "q1"), _turn("assistant", long_reply),
+            _turn("user", "q2"), _turn("assistant", "a2"),
+        ]
+        result = compress_history(history)
+        assert result[0]["role"] == "summary"
+        assert result[1:] == history[2:]
+
+    def test_oversized_latest_pair_kept_and_clipped(self):
+        huge = "y" * (VERBATIM_BUDGET_TOKENS * 8)
+        history = [
+            _turn("user", "q1"), _turn("assistant", "a1"),
+            _turn("user", "explain this"), _turn("assistant", huge),
+        ]
+        result = compress_history(history)
+        assert result[0]["role"] == "summary"
+        latest = result[1:]
+        assert [t["role"] for t in latest] == ["user", "assistant"]
+        assert latest[0]["content"] == "explain this"  # short side stays whole
+        assert latest[1]["content"].startswith("yyy")
+        assert latest[1]["content"].endswith("[truncated]")
+        assert _tokens(latest) <= VERBATIM_BUDGET_TOKENS
+        assert history[3]["content"] == huge  # caller's entries are not mutated
+
+    def test_single_oversized_turn_kept(self):
+        huge = "z" * (VERBATIM_BUDGET_TOKENS * 8)
+        result = compress_history([_turn("user", huge)])
+        assert len(result) == 1
+        assert result[0]["role"] == "user"
+        assert _tokens(result) <= VERBATIM_BUDGET_TOKENS
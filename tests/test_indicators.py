@@ -6,9 +6,10 @@ No API credentials needed - tests pure math and logic.
 import pytest
 import math
 from core.indicators import (
-    ema, sma, bollinger_bands, rsi, vwap, heiken_ashi,
+    ema, ema_last, ema_update, sma, bollinger_bands, rsi, vwap, heiken_ashi,
     analyze_timeframe, detect_setup,
     pivot_points, detect_candlestick_patterns, analyze_body_trend,
+    detect_higher_lows,
 )
 
 
@@ -26,6 +27,12 @@ class TestSMA:
         result = sma([1, 2], 5)
         assert result == []
 
+    def test_rolling_matches_window_mean(self):
+        prices = [38000 + (i * 37 % 101) - 50 for i in range(120)]
+        result = sma(prices, 20)
+        for i in range(19, len(prices)):
+            assert result[i] == pytest.approx(sum(prices[i - 19:i + 1]) / 20)
+
 
 class TestEMA:
     def test_basic(self):
@@ -44,6 +51,65 @@ class TestEMA:
         assert ema([1, 2], 5) == []
 
 
+class TestEMALast:
+    def test_matches_full_series(self):
+        prices = [38000 + (i % 37) * 13.5 - (i % 11) * 7 for i in range(260)]
+        latest = ema_last(prices, 9, 50, 200)
+        for period in (9, 50, 200):
+            assert latest[period] == ema(prices, period)[-1]
+
+    def test_insufficient_history_is_none(self):
+        latest = ema_last([1.0] * 60, 9, 50, 200)
+        assert latest[9] == pytest.approx(1.0)
+        assert latest[50] == pytest.approx(1.0)
+        assert latest[200] is None
+
+    def test_empty(self):
+        assert ema_last([], 9) == {9: None}
+
+
+class TestEMAUpdate:
+    def setup_method(self):
+        from core import indicators
+        indicators._EMA_CACHE.clear()
+
+    def test_first_call_matches_full_series(self):
+        prices = [38000 + (i % 37) * 13.5 - (i % 11) * 7 for i in range(120)]
+        ts = list(range(120))
+        assert ema_update(("15m", 50), prices, ts, 50) == ema(prices, 50)[-1]
+
+    def test_forming_candle_updates_do_not_advance_state(self):
+        prices = [38000 + (i % 37) * 13.5 for i in range(120)]
+        ts = list(range(120))
+        ema_update(("15m", 9), prices, ts, 9)
+        prices[-1] += 25
+        assert ema_update(("15m", 9), prices, ts, 9) == pytest.approx(ema(prices, 9)[-1])
+
+    def test_new_candle_matches_window_ema(self):
+        prices = [38000 + (i % 37) * 13.5 for i in range(121)]
+        ts = list(range(121))
+        ema_update(("15m", 50), prices[:120], ts[:120], 50)
+        # Window slides by one candle: result is the EMA of the new window only
+        value = ema_update(("15m", 50), prices[1:], ts[1:], 50)
+        assert value == pytest.approx(ema(prices[1:], 50)[-1])
+        from core import indicators
+        assert indicators._EMA_CACHE[("15m", 50)].last_ts == 119
+
+    def test_long_running_state_matches_fresh_start(self):
+        prices = [38000 + (i % 37) * 13.5 - (i % 11) * 7 for i in range(400)]
+        ts = list(range(400))
+        for start in range(0, 180):
+            ema_update(("15m", 200), prices[start:start + 220], ts[start:start + 220], 200)
+        window = prices[180:400]
+        value = ema_update(("15m", 200), window, ts[180:400], 200)
+        assert value == ema(window, 200)[-1]
+
+    def test_insufficient_history_not_cached(self):
+        assert ema_update(("15m", 200), [1.0] * 60, list(range(60)), 200) is None
+        from core import indicators
+        assert ("15m", 200) not in indicators._EMA_CACHE
+
+
 class TestBollingerBands:
     def test_basic(self):
         # 25 data points
@@ -69,6 +135,20 @@ class TestBollingerBands:
         # All bands should be equal (zero std dev)
         assert abs(bb["upper"][-1] - bb["lower"][-1]) < 0.01
 
+    def test_rolling_matches_window_std(self):
+        """Rolling sums must agree with a per-window population std at index price levels."""
+        prices = [38000 + i * 35 + ((i * 37) % 101) - 50 for i in range(120)]
+        bb = bollinger_bands(prices, 20, 2.0)
+        for i in range(19, len(prices)):
+            window = prices[i - 19 : i + 1]
+            mean = sum(window) / 20
+            std = math.sqrt(sum((x - mean) ** 2 for x in window) / 20)
+            assert bb["mid"][i] == pytest.approx(mean, abs=1e-6)
+            assert bb["upper"][i] == pytest.approx(mean + 2 * std, abs=1e-6)
+
+    def test_too_few_prices(self):
+        assert bollinger_bands([1.0, 2.0], 20) == {"upper": [], "mid": [], "lower": []}
+
 
 class TestRSI:
     def test_uptrend(self):
@@ -346,6 +426,50 @@ class TestAnalyzeTimeframe:
             assert result[key] is not None
             assert isinstance(result[key], (int, float))
 
+    def test_output_rounded_once_at_boundary(self):
+        """Indicator values keep full precision internally but leave rounded."""
+        candles = [
+            {"open": 38000 + i * 1.37, "high": 38050 + i * 1.37, "low": 37950 + i * 1.37,
+             "close": 38020 + i * 1.37 + (i % 7) / 3, "volume": 1000 + i,
+             "timestamp": f"2026-02-27T{i:04d}"}
+            for i in range(220)
+        ]
+        result = analyze_timeframe(candles)
+        for key in ("bollinger_upper", "bollinger_mid", "ema9", "ema50", "ema200", "rsi", "volume_ratio"):
+            assert result[key] == round(result[key], 2)
+        for key in ("atr", "bb_width", "pullback_depth", "avg_candle_range"):
+            assert result[key] == round(result[key], 1)
+
+
+class TestVolumeSignal:
+    """volume_signal classifies the last COMPLETED candle against the 20-bar average."""
+
+    def _candles(self, completed_vol):
+        candles = [
+            {"open": 38000, "high": 38050, "low": 37950, "close": 38020,
+             "volume": 1000, "timestamp": f"2026-02-27T{i:04d}"}
+            for i in range(30)
+        ]
+        candles[-2]["volume"] = completed_vol
+        return candles
+
+    def test_high(self):
+        assert analyze_timeframe(self._candles(3000))["volume_signal"] == "HIGH"
+
+    def test_low(self):
+        assert analyze_timeframe(self._candles(300))["volume_signal"] == "LOW"
+
+    def test_normal(self):
+        assert analyze_timeframe(self._candles(1000))["volume_signal"] == "NORMAL"
+
+    def test_zero_completed_volume_is_normal(self):
+        assert analyze_timeframe(self._candles(0))["volume_signal"] == "NORMAL"
+
+    def test_no_volume_data(self):
+        result = analyze_timeframe([{**c, "volume": 0} for c in self._candles(0)])
+        assert result["volume_signal"] is None
+        assert result["volume_ratio"] is None
+
 
 # --- Risk Manager Tests ---
 class TestRiskManager:
@@ -478,6 +602,24 @@ class TestCandlestickPatterns:
         assert result["pattern_direction"] == "bearish"
 
 
+class TestHigherLows:
+    def test_ascending_swing_lows(self):
+        prices = [10, 8, 5, 8, 10, 9, 6, 9, 10, 9, 7, 9, 10]
+        assert detect_higher_lows(prices) is True
+
+    def test_lower_latest_swing_low(self):
+        prices = [10, 8, 5, 8, 10, 9, 7, 9, 10, 9, 6, 9, 10]
+        assert detect_higher_lows(prices) is False
+
+    def test_only_last_three_lows_count(self):
+        # An early deep low followed by a higher one, then three ascending lows
+        prices = [10, 8, 2, 8, 10, 9, 6, 9, 10, 9, 4, 9, 10, 9, 5, 9, 10, 9, 7, 9, 10]
+        assert detect_higher_lows(prices) is True
+
+    def test_too_short(self):
+        assert detect_higher_lows([1, 2, 3]) is False
+
+
 class TestBodyTrend:
     def test_expanding(self):
         candles = [
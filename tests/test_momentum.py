@@ -3,6 +3,7 @@ Tests for core/momentum.py — tiered adverse move detection, milestone alerts,
 stale data detection.
 """
 import pytest
+from datetime import datetime
 from core.momentum import (
     MomentumTracker,
     TIER_NONE, TIER_MILD, TIER_MODERATE, TIER_SEVERE,
@@ -273,3 +274,24 @@ class TestMaxPriceBuffer:
         for i in range(310):
             t.add_price(38000 + i)
         assert len(t._prices) == 300
+
+    def test_buffers_evict_oldest_together(self):
+        t = MomentumTracker("LONG", 38000)
+        for i in range(310):
+            t.add_price(38000 + i)
+        assert len(t._timestamps) == 300
+        assert t._prices[0] == 38010
+        assert t._prices[-1] == 38309
+
+
+class TestSummary:
+    def test_timestamp_formatted_on_demand(self):
+        t = MomentumTracker("LONG", 38000)
+        t.add_price(38010)
+        assert isinstance(t._timestamps[-1], float)
+        summary = t.get_summary()
+        assert summary["current"] == 38010
+        assert datetime.fromisoformat(summary["last_reading_at"])
+
+    def test_empty_summary(self):
+        assert MomentumTracker("SHORT", 38000).get_summary() == {}
@@ -96,6 +96,12 @@ class TestGetCurrentSession:
             from core.session import get_current_session
             assert get_current_session()["active"] is False
 
+    def test_returned_dict_does_not_alias_table(self):
+        with patch("core.session.utcnow", return_value=_utc(0, 10)):
+            from core.session import get_current_session
+            get_current_session()["active"] = False
+            assert get_current_session()["active"] is True
+
 
 # ── is_friday_blackout ────────────────────────────────────────────────────────
 
@@ -126,6 +132,12 @@ class TestIsFridayBlackout:
         blocked, reason = self._check(_utc(4, 9), events)
         assert blocked is True
 
+    def test_keyword_match_is_case_insensitive(self):
+        events = [{"name": "US core cpi m/m", "impact": "HIGH"}]
+        blocked, reason = self._check(_utc(4, 9), events)
+        assert blocked is True
+        assert "core cpi" in reason
+
     def test_friday_with_low_impact_event_no_block(self):
         events = [{"name": "Some minor data", "impact": "LOW"}]
         blocked, reason = self._check(_utc(4, 9), events)
@@ -142,6 +154,36 @@ class TestIsFridayBlackout:
         assert blocked is False
 
 
+# ── is_month_end_blackout ─────────────────────────────────────────────────────
+
+class TestIsMonthEndBlackout:
+    def _check(self, dt):
+        with patch("core.session.utcnow", return_value=dt):
+            from core.session import is_month_end_blackout
+            return is_month_end_blackout()
+
+    def test_mid_month_not_blocked(self):
+        blocked, _ = self._check(datetime(2025, 1, 15, 10, tzinfo=timezone.utc))
+        assert blocked is False
+
+    def test_last_two_trading_days_blocked(self):
+        # Wed 2025-01-29: Thu 30 + Fri 31 left
+        blocked, reason = self._check(datetime(2025, 1, 29, 10, tzinfo=timezone.utc))
+        assert blocked is True
+        assert "2 trading days" in reason
+
+    def test_weekend_days_not_counted(self):
+        # Thu 2025-05-29: Fri 30, Sat 31 -> one trading day left
+        blocked, reason = self._check(datetime(2025, 5, 29, 10, tzinfo=timezone.utc))
+        assert blocked is True
+        assert "1 trading days" in reason
+
+    def test_three_trading_days_left_not_blocked(self):
+        # Wed 2025-03-26: Thu 27, Fri 28, Mon 31 -> three trading days left
+        blocked, _ = self._check(datetime(2025, 3, 26, 10, tzinfo=timezone.utc))
+        assert blocked is False
+
+
 # ── is_no_trade_day ───────────────────────────────────────────────────────────
 
 class TestIsNoTradeDay:
@@ -161,6 +203,12 @@ class TestIsNoTradeDay:
             # We test logic path, not exact date
             assert isinstance(blocked, bool)
 
+    def test_explicit_now_skips_clock(self):
+        from core.session import is_no_trade_day
+        with patch("core.session.utcnow", side_effect=AssertionError("clock read")):
+            blocked, reason = is_no_trade_day(now=_utc(5, 12))  # Saturday
+        assert blocked is True
+
     def test_friday_blackout_propagates(self):
         with patch("core.session.utcnow", return_value=_utc(4, 14)):  # Friday 14:00
             from core.session import is_no_trade_day
@@ -282,9 +282,10 @@ class RiskManager:
             rejection = rejection or f"High-impact event within {EVENT_BLACKOUT_MINUTES} minutes. Standing aside."
         
         # --- CHECK 9: Friday / Month-End (delegates to session.py) ---
-        from core.session import is_friday_blackout, is_month_end_blackout
-        fri_blocked, fri_reason = is_friday_blackout(upcoming_events)
-        me_blocked, me_reason = is_month_end_blackout()
+        from core.session import is_friday_blackout, is_month_end_blackout, utcnow
+        now_utc = utcnow()
+        fri_blocked, fri_reason = is_friday_blackout(upcoming_events, now_utc)
+        me_blocked, me_reason = is_month_end_blackout(now_utc)
         cal_blocked = fri_blocked or me_blocked
         cal_reason = fri_reason or me_reason
 